@@ -0,0 +1,202 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import threading
+from typing import Callable, Iterable, Optional
+
+from sqlalchemy import case, func, literal, select, union_all
+from sqlalchemy.orm import Session
+
+from .models import (
+    AuthorityToIncurRequest,
+    CashReimbursementRequest,
+    CashRequisitionRequest,
+    PayrollRun,
+    SalaryAdvanceRequest,
+)
+from .schemas import FinanceAttentionOut, PayrollAdminAttentionOut, PayrollAttentionOut
+from .ws_manager import TOPIC_FINANCE, role_topic, user_topic
+
+logger = logging.getLogger(__name__)
+
+FINANCE_ATTENTION_ROLES = ("finance", "admin", "ceo")
+
+Publish = Callable[..., object]
+
+
+# Statuses each finance view is waiting on, per request table. The reviewer
+# view is the finance role's; admin and CEO share the approver view.
+_REVIEWER_STATUSES = {
+    "cash_requisition": ("pending_finance_review",),
+    "authority_to_incur": ("pending_finance_review", "pending_parallel_approval"),
+    "salary_advance": ("pending_finance_review", "pending_parallel_approval"),
+}
+_APPROVER_STATUSES = {
+    "cash_requisition": ("pending_finance_review", "pending_ceo_approval"),
+    "authority_to_incur": ("pending_ceo_approval", "pending_parallel_approval"),
+    "salary_advance": ("pending_ceo_approval", "pending_parallel_approval"),
+}
+_STATUS_MODELS = {
+    "cash_requisition": CashRequisitionRequest,
+    "authority_to_incur": AuthorityToIncurRequest,
+    "salary_advance": SalaryAdvanceRequest,
+}
+
+
+def _count_where(condition):
+    return func.coalesce(func.sum(case((condition, 1), else_=0)), 0)
+
+
+def finance_attention_counts(db: Session) -> dict[str, FinanceAttentionOut]:
+    """Both finance views' counts in one round trip: ``{"finance": ..., "approver": ...}``.
+
+    Each request table contributes one row of conditional counts over its
+    pending rows only, which the partial ``ix_*_pending`` indexes cover.
+    """
+    reimbursement = CashReimbursementRequest
+    parts = [
+        select(
+            literal("cash_reimbursement").label("kind"),
+            _count_where(reimbursement.finance_decision.is_(None)).label("reviewer"),
+            _count_where(reimbursement.ceo_decision.is_(None)).label("approver"),
+        ).where(reimbursement.status == "pending_approval")
+    ]
+    for kind, model in _STATUS_MODELS.items():
+        reviewer, approver = _REVIEWER_STATUSES[kind], _APPROVER_STATUSES[kind]
+        parts.append(
+            select(
+                literal(kind).label("kind"),
+                _count_where(model.status.in_(reviewer)).label("reviewer"),
+                _count_where(model.status.in_(approver)).label("approver"),
+            ).where(model.status.in_(sorted(set(reviewer) | set(approver))))
+        )
+    rows = db.execute(union_all(*parts)).all()
+
+    views = {"finance": {}, "approver": {}}
+    for kind, reviewer_count, approver_count in rows:
+        views["finance"][kind] = int(reviewer_count or 0)
+        views["approver"][kind] = int(approver_count or 0)
+    return {view: FinanceAttentionOut(**counts, total=sum(counts.values())) for view, counts in views.items()}
+
+
+def finance_attention(db: Session, role: str) -> FinanceAttentionOut:
+    """Finance requests waiting on ``role``: finance reviews, admin and CEO approve."""
+    role = (role or "").strip().lower()
+    if role not in FINANCE_ATTENTION_ROLES:
+        return FinanceAttentionOut()
+    return finance_attention_counts(db)["finance" if role == "finance" else "approver"]
+
+
+def payroll_attention(db: Session, user_id: int) -> PayrollAttentionOut:
+    pending = db.query(PayrollRun.id).filter(
+        PayrollRun.status == "approved",
+        PayrollRun.employee_confirmed == False,
+        PayrollRun.employee_id == user_id,
+    ).count()
+    return PayrollAttentionOut(pending_confirmation=pending)
+
+
+def payroll_admin_attention(db: Session) -> PayrollAdminAttentionOut:
+    confirmed_pending = db.query(PayrollRun.id).filter(
+        PayrollRun.status == "approved",
+        PayrollRun.employee_confirmed == True,
+    ).count()
+    return PayrollAdminAttentionOut(confirmed_pending_payment=confirmed_pending)
+
+
+class AttentionNotifier:
+    """Recomputes the attention badges after workflow changes and pushes them.
+
+    Handlers call ``mark`` once their change is committed. Marks within
+    ``window_seconds`` are merged, then the affected counters are counted
+    once on a worker thread with their own session and published:
+    ``finance_attention`` to each finance role's topic,
+    ``payroll_admin_attention`` to the finance topic and
+    ``payroll_attention`` to each affected employee. Before ``start`` has
+    been given the event loop (and with a zero window) marks are
+    recomputed at once in the calling thread.
+    """
+
+    def __init__(self, publish: Publish, session_factory: Callable[[], Session], window_seconds: float) -> None:
+        self._publish = publish
+        self._session_factory = session_factory
+        self.window_seconds = max(0.0, window_seconds)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._finance = False
+        self._payroll_users: set[int] = set()
+        self._scheduled = False
+        self._marks_total = 0
+        self._recomputes_total = 0
+        self._errors_total = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def stop(self) -> None:
+        self._loop = None
+
+    def mark(self, finance: bool = False, payroll_users: Iterable[int] = ()) -> None:
+        """Record that finance requests and/or these employees' payroll runs changed."""
+        with self._lock:
+            self._marks_total += 1
+            self._finance = self._finance or finance
+            self._payroll_users.update(user_id for user_id in payroll_users if user_id is not None)
+            if self._scheduled:
+                return
+            self._scheduled = True
+        loop = self._loop
+        if loop is None or self.window_seconds == 0 or loop.is_closed():
+            self.flush()
+        else:
+            loop.call_soon_threadsafe(loop.call_later, self.window_seconds, self._flush_in_thread)
+
+    def _flush_in_thread(self) -> None:
+        asyncio.get_running_loop().run_in_executor(None, self.flush)
+
+    def flush(self) -> None:
+        with self._lock:
+            finance, payroll_users = self._finance, sorted(self._payroll_users)
+            self._finance, self._payroll_users, self._scheduled = False, set(), False
+        if not finance and not payroll_users:
+            return
+        db = self._session_factory()
+        try:
+            messages = self._messages(db, finance, payroll_users)
+        except Exception:
+            with self._lock:
+                self._errors_total += 1
+            logger.warning("Could not recompute attention counters", exc_info=True)
+            return
+        finally:
+            db.close()
+        with self._lock:
+            self._recomputes_total += 1
+        for message, topics in messages:
+            self._publish(message, topics)
+
+    def _messages(self, db: Session, finance: bool, payroll_users: list[int]) -> list[tuple[dict, list[str]]]:
+        messages: list[tuple[dict, list[str]]] = []
+        if finance:
+            counts = finance_attention_counts(db)
+            reviewer, approver = counts["finance"].model_dump(), counts["approver"].model_dump()
+            messages.append((dict(reviewer, type="finance_attention"), [role_topic("finance")]))
+            messages.append((dict(approver, type="finance_attention"), [role_topic("admin"), role_topic("ceo")]))
+        if payroll_users:
+            admin = payroll_admin_attention(db).model_dump()
+            messages.append((dict(admin, type="payroll_admin_attention"), [TOPIC_FINANCE]))
+            for user_id in payroll_users:
+                own = payroll_attention(db, user_id).model_dump()
+                messages.append((dict(own, type="payroll_attention"), [user_topic(user_id)]))
+        return messages
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {
+                "window_seconds": self.window_seconds,
+                "pending": self._scheduled,
+                "marks_total": self._marks_total,
+                "recomputes_total": self._recomputes_total,
+                "errors_total": self._errors_total,
+            }
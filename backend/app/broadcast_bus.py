@@ -0,0 +1,263 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import queue
+import re
+import select
+import threading
+import time
+from typing import Callable, Iterable, Optional
+from uuid import uuid4
+
+from sqlalchemy import text
+
+from .config import settings
+from .db import engine
+
+logger = logging.getLogger(__name__)
+
+# PostgreSQL rejects NOTIFY payloads of 8000 bytes or more.
+NOTIFY_MAX_PAYLOAD_BYTES = 7999
+_CHANNEL_NAME = re.compile(r"^[a-z_][a-z0-9_]{0,62}$")
+
+Deliver = Callable[[dict, Optional[list[str]], Optional[list[str]]], object]
+
+
+def _encoded_size(value) -> int:
+    return len(json.dumps(value, separators=(",", ":"), default=str).encode())
+
+
+def _shrink_for_notify(envelope: dict) -> dict:
+    # Drop the payload's largest structured fields (event bodies first) until it
+    # fits; the scalars left (type, action, ids) still tell receivers to refetch.
+    payload = dict(envelope["p"], truncated=True)
+    structured = sorted(
+        (key for key, value in payload.items() if isinstance(value, (dict, list))),
+        key=lambda key: _encoded_size(payload[key]),
+        reverse=True,
+    )
+    slim = dict(envelope, p=payload)
+    for key in structured:
+        if _encoded_size(slim) <= NOTIFY_MAX_PAYLOAD_BYTES:
+            break
+        del payload[key]
+    return slim
+
+
+class BroadcastBus:
+    """Delivers WebSocket messages to this process's sockets.
+
+    ``deliver(payload, topics)`` is the connection manager's ``publish``.
+    Once ``start`` has been given the event loop, calls from worker threads
+    are handed to the loop instead of touching the sockets directly.
+    """
+
+    backend = "memory"
+
+    def __init__(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+        self._published_total = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+
+    def stop(self) -> None:
+        self._loop = None
+
+    def publish(
+        self,
+        payload: dict,
+        topics: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> None:
+        topic_list = list(topics) if topics is not None else None
+        exclude_list = list(exclude) if exclude else None
+        with self._lock:
+            self._published_total += 1
+        self._deliver_local(payload, topic_list, exclude_list)
+
+    def _deliver_local(self, payload: dict, topics: Optional[list[str]], exclude: Optional[list[str]]) -> None:
+        loop = self._loop
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if loop is not None and running is not loop:
+            loop.call_soon_threadsafe(self._deliver, payload, topics, exclude)
+        else:
+            self._deliver(payload, topics, exclude)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            return {"backend": self.backend, "published_total": self._published_total}
+
+
+class PostgresBroadcastBus(BroadcastBus):
+    """Shares WebSocket messages between workers and replicas through LISTEN/NOTIFY.
+
+    Messages are delivered to local sockets immediately and then queued for a
+    sender thread that issues ``pg_notify``; a listener thread holds one
+    dedicated connection on ``LISTEN`` and hands other processes' messages to
+    the event loop. Each process tags its messages with an origin id and
+    skips its own echoes. NOTIFY is best effort: if PostgreSQL is unreachable
+    other workers miss the message, and clients catch up on their next
+    refetch or reconnect. Payloads over the NOTIFY limit lose their largest
+    structured fields until they fit.
+    """
+
+    backend = "postgres"
+
+    def __init__(self, deliver: Deliver, channel: str, reconnect_seconds: float = 2.0) -> None:
+        super().__init__(deliver)
+        if not _CHANNEL_NAME.match(channel):
+            raise RuntimeError(f"Invalid broadcast channel name: {channel!r}")
+        self.channel = channel
+        self.origin = uuid4().hex
+        self.reconnect_seconds = max(0.1, reconnect_seconds)
+        self._outbox: "queue.Queue[Optional[str]]" = queue.Queue()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._listening = False
+        self._sent_total = 0
+        self._received_total = 0
+        self._send_errors_total = 0
+        self._listen_errors_total = 0
+        self._oversized_total = 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        super().start(loop)
+        if self._threads:
+            return
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self._send_loop, name="broadcast-notify", daemon=True),
+            threading.Thread(target=self._listen_loop, name="broadcast-listen", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._outbox.put(None)
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads = []
+        super().stop()
+
+    def publish(
+        self,
+        payload: dict,
+        topics: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> None:
+        topic_list = list(topics) if topics is not None else None
+        exclude_list = list(exclude) if exclude else None
+        super().publish(payload, topic_list, exclude_list)
+        if self._threads:
+            self._outbox.put(self._encode(payload, topic_list, exclude_list))
+
+    def _encode(self, payload: dict, topics: Optional[list[str]], exclude: Optional[list[str]] = None) -> str:
+        envelope = {"o": self.origin, "t": topics, "x": exclude, "p": payload}
+        message = json.dumps(envelope, separators=(",", ":"), default=str)
+        if len(message.encode()) <= NOTIFY_MAX_PAYLOAD_BYTES:
+            return message
+        with self._lock:
+            self._oversized_total += 1
+        return json.dumps(_shrink_for_notify(envelope), separators=(",", ":"), default=str)
+
+    def _handle_notification(self, raw: str) -> None:
+        try:
+            message = json.loads(raw)
+        except ValueError:
+            logger.warning("Ignoring malformed broadcast notification")
+            return
+        if message.get("o") == self.origin:
+            return
+        with self._lock:
+            self._received_total += 1
+        self._deliver_local(message.get("p") or {}, message.get("t"), message.get("x"))
+
+    def _send_loop(self) -> None:
+        while not self._stop.is_set():
+            first = self._outbox.get()
+            if first is None:
+                return
+            batch = [first]
+            while len(batch) < 100:
+                try:
+                    item = self._outbox.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    self._stop.set()
+                    break
+                batch.append(item)
+            try:
+                with engine.begin() as conn:
+                    for message in batch:
+                        conn.execute(
+                            text("SELECT pg_notify(:channel, :payload)"),
+                            {"channel": self.channel, "payload": message},
+                        )
+                with self._lock:
+                    self._sent_total += len(batch)
+            except Exception:
+                with self._lock:
+                    self._send_errors_total += len(batch)
+                logger.warning("Could not relay %s broadcast message(s) to other workers", len(batch), exc_info=True)
+
+    def _listen_loop(self) -> None:
+        while not self._stop.is_set():
+            raw = None
+            try:
+                raw = engine.raw_connection()
+                raw.detach()
+                connection = raw.driver_connection
+                connection.autocommit = True
+                with connection.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                self._listening = True
+                while not self._stop.is_set():
+                    if select.select([connection], [], [], 1.0)[0]:
+                        connection.poll()
+                        while connection.notifies:
+                            self._handle_notification(connection.notifies.pop(0).payload)
+            except Exception:
+                with self._lock:
+                    self._listen_errors_total += 1
+                logger.warning("Broadcast listener lost its connection; reconnecting", exc_info=True)
+                time.sleep(self.reconnect_seconds)
+            finally:
+                self._listening = False
+                if raw is not None:
+                    try:
+                        raw.close()
+                    except Exception:
+                        pass
+
+    def stats(self) -> dict[str, object]:
+        stats = super().stats()
+        with self._lock:
+            stats.update(
+                {
+                    "channel": self.channel,
+                    "listening": self._listening,
+                    "outbox": self._outbox.qsize(),
+                    "sent_total": self._sent_total,
+                    "received_total": self._received_total,
+                    "send_errors_total": self._send_errors_total,
+                    "listen_errors_total": self._listen_errors_total,
+                    "oversized_total": self._oversized_total,
+                }
+            )
+        return stats
+
+
+def build_broadcast_bus(deliver: Deliver) -> BroadcastBus:
+    if settings.broadcast_backend == "postgres":
+        return PostgresBroadcastBus(deliver, settings.BROADCAST_CHANNEL)
+    return BroadcastBus(deliver)
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import datetime
+from typing import Callable, Iterable, Optional
+
+from .ws_manager import user_topic
+
+Publish = Callable[..., object]
+
+
+class EventChangeNotifier:
+    """Batches ``events_changed`` notifications into one message per ``window_seconds``.
+
+    The first change opens a window; every change recorded before it closes
+    is folded into a single message listing the affected ids and the date
+    range they span, sent to the union of their topics. A 52-week recurring
+    series or a run of approvals therefore costs clients one message.
+    Outside an event loop (or with a zero window) changes go out at once.
+
+    Changes may carry the serialized event as every recipient may see it,
+    plus per-user ``overrides`` (e.g. approval permissions). When every
+    created or updated event in a batch has a body and there are at most
+    ``max_events`` of them, the message includes ``events`` so clients can
+    apply it without refetching; users with overrides are sent their own
+    copy on their user topic instead of the shared one.
+    """
+
+    message_type = "events_changed"
+
+    def __init__(self, publish: Publish, window_seconds: float, max_ids: int = 500, max_events: int = 50) -> None:
+        self._publish = publish
+        self.window_seconds = max(0.0, window_seconds)
+        self.max_ids = max(1, max_ids)
+        self.max_events = max(0, max_events)
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._timer_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._reset()
+        self._changes_total = 0
+        self._messages_total = 0
+
+    def _reset(self) -> None:
+        self._changes: dict[int, str] = {}
+        self._bodies: dict[int, dict] = {}
+        self._overrides: dict[int, dict[int, dict]] = {}
+        self._actions: list[str] = []
+        self._topics: set[str] = set()
+        self._start: Optional[datetime] = None
+        self._end: Optional[datetime] = None
+        self._truncated = False
+
+    def add(
+        self,
+        action: str,
+        item_id: int,
+        start: Optional[datetime],
+        end: Optional[datetime],
+        topics: Iterable[str],
+        body: Optional[dict] = None,
+        overrides: Optional[dict[int, dict]] = None,
+    ) -> None:
+        self._changes_total += 1
+        if item_id in self._changes or len(self._changes) < self.max_ids:
+            self._changes[item_id] = action
+            self._bodies.pop(item_id, None)
+            self._overrides.pop(item_id, None)
+            if body is not None and action != "deleted":
+                self._bodies[item_id] = body
+            if overrides:
+                self._overrides[item_id] = overrides
+        else:
+            self._truncated = True
+        if action not in self._actions:
+            self._actions.append(action)
+        self._topics.update(topics)
+        if start is not None and (self._start is None or start < self._start):
+            self._start = start
+        if end is not None and (self._end is None or end > self._end):
+            self._end = end
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        if self._timer is not None and self._timer_loop is loop:
+            return
+        if loop is None or self.window_seconds == 0 or self._timer is not None:
+            # No loop to wait on, or the window was opened on a loop that is gone.
+            self.flush()
+        else:
+            self._timer_loop = loop
+            self._timer = loop.call_later(self.window_seconds, self.flush)
+
+    def flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = self._timer_loop = None
+        if not self._changes and not self._truncated:
+            return
+        ids = list(self._changes)
+        message = {
+            "type": self.message_type,
+            "action": self._actions[0] if len(self._actions) == 1 else "batch",
+            "event_id": ids[0] if ids else None,
+            "event_ids": ids,
+            "changes": {action: [i for i, a in self._changes.items() if a == action] for action in self._actions},
+            "start": self._start.isoformat() if self._start else None,
+            "end": self._end.isoformat() if self._end else None,
+            "truncated": self._truncated,
+        }
+        changed = [i for i, action in self._changes.items() if action != "deleted"]
+        bodies, overrides = self._bodies, self._overrides
+        topics = sorted(self._topics)
+        truncated = self._truncated
+        self._reset()
+        self._messages_total += 1
+
+        if truncated or len(changed) > self.max_events or any(i not in bodies for i in changed):
+            self._publish(message, topics)
+            return
+
+        message["events"] = [bodies[i] for i in changed]
+        recipients = sorted({user_id for per_event in overrides.values() for user_id in per_event})
+        if not recipients:
+            self._publish(message, topics)
+            return
+        self._publish(message, topics, [user_topic(user_id) for user_id in recipients])
+        for user_id in recipients:
+            events = [dict(bodies[i], **overrides.get(i, {}).get(user_id, {})) for i in changed]
+            self._publish(dict(message, events=events), [user_topic(user_id)])
+
+    def stats(self) -> dict[str, object]:
+        return {
+            "window_seconds": self.window_seconds,
+            "pending": len(self._changes),
+            "changes_total": self._changes_total,
+            "messages_total": self._messages_total,
+        }
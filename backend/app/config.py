@@ -21,6 +21,32 @@ class Settings(BaseSettings):
     LOGIN_THROTTLE_WINDOW_SECONDS: int = 300
     LOGIN_THROTTLE_MAX_ATTEMPTS: int = 5
     LOGIN_THROTTLE_BLOCK_SECONDS: int = 900
+    # memory | database; empty picks database in production so every worker shares one count.
+    LOGIN_THROTTLE_BACKEND: str = ""
+    LOGIN_THROTTLE_SWEEP_SECONDS: int = 300
+    # Per-process cache of the authenticated user row; 0 disables it.
+    AUTH_USER_CACHE_TTL_SECONDS: int = 30
+    AUTH_USER_CACHE_MAX_ENTRIES: int = 2048
+    # bcrypt runs on its own pool so login bursts cannot starve other sync endpoints.
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    PASSWORD_BCRYPT_ROUNDS: int = 12
+    # Outgoing WebSocket messages queue per connection; clients that fall behind are coalesced, then closed.
+    WS_SEND_QUEUE_SIZE: int = 64
+    WS_SEND_TIMEOUT_SECONDS: float = 10.0
+    # Sockets are pinged on this interval and closed after WS_IDLE_TIMEOUT_SECONDS without a reply;
+    # 0 turns heartbeats off. A user may hold WS_MAX_CONNECTIONS_PER_USER sockets (0 = no cap).
+    WS_HEARTBEAT_SECONDS: float = 25.0
+    WS_IDLE_TIMEOUT_SECONDS: float = 60.0
+    WS_MAX_CONNECTIONS_PER_USER: int = 12
+    # memory | postgres; empty picks postgres (LISTEN/NOTIFY) when DATABASE_URL is PostgreSQL,
+    # so a change made on one worker reaches sockets held by every worker.
+    BROADCAST_BACKEND: str = ""
+    BROADCAST_CHANNEL: str = "spc_ws_broadcast"
+    # events_changed messages within this window are merged into one; 0 sends each at once.
+    WS_CHANGE_COALESCE_SECONDS: float = 0.25
+    # Finance and payroll badge counters are recomputed at most once per window after a change.
+    WS_ATTENTION_COALESCE_SECONDS: float = 0.5
 
     CORS_ORIGINS: str = "http://localhost:1420,http://127.0.0.1:1420,http://localhost:5173,http://127.0.0.1:5173"
     TRUSTED_HOSTS: str = "localhost,127.0.0.1"
@@ -32,6 +58,8 @@ class Settings(BaseSettings):
     AVATAR_MAX_BYTES: int = 5 * 1024 * 1024
     PROFILE_DOC_MAX_BYTES: int = 10 * 1024 * 1024
     LIBRARY_DOC_MAX_BYTES: int = 20 * 1024 * 1024
+    # Whole request bodies, multipart overhead included; 0 disables the check.
+    REQUEST_BODY_MAX_BYTES: int = 21 * 1024 * 1024
 
     # Optional S3-compatible object storage (Cloudflare R2, AWS S3, etc.)
     R2_ENDPOINT: str = ""
@@ -39,6 +67,20 @@ class Settings(BaseSettings):
     R2_ACCESS_KEY_ID: str = ""
     R2_SECRET_ACCESS_KEY: str = ""
     R2_REGION: str = "auto"
+    # boto3 connection pool size; async handlers run storage calls on a pool of the same size.
+    R2_MAX_POOL_CONNECTIONS: int = 16
+    R2_CONNECT_TIMEOUT_SECONDS: int = 5
+    R2_READ_TIMEOUT_SECONDS: int = 60
+    # Replaced and orphaned objects are deleted in the background, retried with backoff.
+    R2_DELETE_MAX_ATTEMPTS: int = 5
+    R2_DELETE_RETRY_SECONDS: float = 1.0
+    # Redirect file downloads to short-lived presigned URLs instead of proxying the bytes.
+    R2_PRESIGNED_DOWNLOADS: bool = False
+    R2_PRESIGNED_URL_TTL_SECONDS: int = 300
+    # Per-worker disk cache of object bodies; 0 disables it. Empty dir means the system temp dir.
+    OBJECT_CACHE_DIR: str = ""
+    OBJECT_CACHE_MAX_BYTES: int = 256 * 1024 * 1024
+    OBJECT_CACHE_FRESH_SECONDS: int = 300
 
     # SMTP + password reset
     EMAIL_PROVIDER: str = "smtp"  # smtp | brevo
@@ -76,6 +118,20 @@ class Settings(BaseSettings):
     def is_production(self) -> bool:
         return self.APP_ENV.lower() == "production"
 
+    @property
+    def login_throttle_backend(self) -> str:
+        value = (self.LOGIN_THROTTLE_BACKEND or "").strip().lower()
+        if value in {"memory", "database"}:
+            return value
+        return "database" if self.is_production else "memory"
+
+    @property
+    def broadcast_backend(self) -> str:
+        value = (self.BROADCAST_BACKEND or "").strip().lower()
+        if value in {"memory", "postgres"}:
+            return value
+        return "postgres" if self.DATABASE_URL.startswith("postgresql") else "memory"
+
     @property
     def auth_cookie_samesite(self) -> str:
         value = (self.AUTH_COOKIE_SAMESITE or "").strip().lower()
@@ -8,6 +8,16 @@ SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 class Base(DeclarativeBase):
     pass
 
+def dialect_insert(table):
+    """INSERT supporting ON CONFLICT upserts on the configured database."""
+    if engine.dialect.name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif engine.dialect.name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise RuntimeError(f"Upserts are not supported on the {engine.dialect.name} dialect.")
+    return insert(table)
+
 def get_db():
     db = SessionLocal()
     try:
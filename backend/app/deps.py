@@ -1,11 +1,113 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+from typing import Optional
+
 from fastapi import Depends, HTTPException, Request
 from jose import jwt
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect as sa_inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from .config import settings
 from .db import get_db
 from .models import User
 
 SAFE_METHODS = {"GET", "HEAD", "OPTIONS", "TRACE"}
+USER_COLUMN_KEYS = tuple(attr.key for attr in sa_inspect(User).column_attrs)
+
+
+class AuthUserCache:
+    # Maps token subject -> (expires_at, column snapshot). Entries are per
+    # process, so the TTL bounds how stale another worker can be. Every
+    # invalidation bumps the generation, and a load that began under an older
+    # generation is not cached, so it cannot put a stale row back.
+    def __init__(self, ttl_seconds: int, max_entries: int) -> None:
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[float, dict]] = OrderedDict()
+        self._generation = 0
+        self._lock = Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_seconds > 0 and self.max_entries > 0
+
+    @property
+    def generation(self) -> int:
+        with self._lock:
+            return self._generation
+
+    def get(self, subject: str) -> Optional[dict]:
+        if not self.enabled:
+            return None
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(subject)
+            if entry is None:
+                return None
+            expires_at, snapshot = entry
+            if expires_at <= now:
+                self._entries.pop(subject, None)
+                return None
+            self._entries.move_to_end(subject)
+            return snapshot
+
+    def put(self, subject: str, user: User, generation: int) -> None:
+        if not self.enabled:
+            return
+        snapshot = {key: getattr(user, key) for key in USER_COLUMN_KEYS}
+        with self._lock:
+            if generation != self._generation:
+                return
+            self._entries[subject] = (time.monotonic() + self.ttl_seconds, snapshot)
+            self._entries.move_to_end(subject)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_user(self, user_id: int) -> None:
+        with self._lock:
+            self._generation += 1
+            stale = [subject for subject, (_, snapshot) in self._entries.items() if snapshot.get("id") == user_id]
+            for subject in stale:
+                self._entries.pop(subject, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+
+
+auth_user_cache = AuthUserCache(
+    ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_entries=settings.AUTH_USER_CACHE_MAX_ENTRIES,
+)
+
+
+def invalidate_cached_user(user_id: Optional[int]) -> None:
+    if user_id is not None:
+        auth_user_cache.invalidate_user(user_id)
+
+
+def clear_cached_users() -> None:
+    auth_user_cache.clear()
+
+
+def _attach_cached_user(db: Session, snapshot: dict) -> User:
+    # Rebuild a clean persistent instance without a SELECT, so handlers can
+    # still modify, refresh and lazy-load through it as if it were queried.
+    user = User(**snapshot)
+    make_transient_to_detached(user)
+    return db.merge(user, load=False)
+
+
+def _load_user_for_subject(db: Session, email: str) -> Optional[User]:
+    snapshot = auth_user_cache.get(email)
+    if snapshot is not None:
+        return _attach_cached_user(db, snapshot)
+    generation = auth_user_cache.generation
+    user = db.query(User).filter(User.email == email).first()
+    if user:
+        auth_user_cache.put(email, user, generation)
+    return user
 
 
 def _extract_bearer_token(request: Request) -> tuple[str | None, str | None]:
@@ -41,7 +143,7 @@ def get_current_user(
         if not csrf_expected or csrf_provided != csrf_expected:
             raise HTTPException(status_code=403, detail="Missing or invalid CSRF token")
 
-    user = db.query(User).filter(User.email == email).first()
+    user = _load_user_for_subject(db, email)
     if not user:
         raise HTTPException(status_code=401, detail="User not found")
     return user
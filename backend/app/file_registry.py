@@ -0,0 +1,315 @@
+from __future__ import annotations
+
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional
+
+from fastapi import UploadFile
+from sqlalchemy import delete, or_, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from .db import SessionLocal, dialect_insert
+from .models import CompanyDocument, Event, StoredBlob, StoredFile, User
+from .storage import object_storage
+from .uploads import StoredUpload, spool_upload
+
+FILE_KIND_PROFILE_DOCUMENT = "profile_document"
+FILE_KIND_LIBRARY = "library"
+FILE_KIND_SICK_NOTE = "sick_note"
+FILE_KIND_AVATAR = "avatar"
+
+FILE_ACL_PUBLIC = "public"
+FILE_ACL_AUTHENTICATED = "authenticated"
+FILE_ACL_OWNER = "owner"
+FILE_ACL_ADMIN = "admin"
+
+# URL path segments each kind has been served under, current and legacy.
+FILE_URL_SEGMENTS = {
+    FILE_KIND_PROFILE_DOCUMENT: ("/files/documents/", "/uploads/documents/"),
+    FILE_KIND_LIBRARY: ("/files/library/", "/uploads/library/"),
+    FILE_KIND_SICK_NOTE: ("/files/sick-notes/", "/uploads/sick_notes/"),
+    FILE_KIND_AVATAR: ("/avatars/", "/uploads/avatars/"),
+}
+
+PROFILE_DOCUMENT_COLUMNS = (
+    "id_copy_url",
+    "kra_copy_url",
+    "offer_letter_url",
+    "employment_contract_url",
+    "disciplinary_records_url",
+    "bio_data_form_url",
+    "bank_details_form_url",
+)
+
+
+def file_name_from_url(url: Optional[str], kind: str) -> Optional[str]:
+    for segment in FILE_URL_SEGMENTS[kind]:
+        if url and segment in url:
+            name = url.split(segment, 1)[1].split("?", 1)[0]
+            return name or None
+    return None
+
+
+def find_stored_file(db: Session, kind: str, file_name: str) -> Optional[StoredFile]:
+    return (
+        db.query(StoredFile)
+        .filter(StoredFile.kind == kind, StoredFile.file_name == file_name)
+        .first()
+    )
+
+
+def register_stored_file(
+    db: Session,
+    kind: str,
+    file_name: str,
+    acl: str,
+    owner_user_id: Optional[int] = None,
+    upload: Optional[StoredUpload] = None,
+    content_type: Optional[str] = None,
+) -> StoredFile:
+    """Add a registry row in the caller's transaction; the caller commits."""
+    row = StoredFile(
+        kind=kind,
+        file_name=file_name,
+        acl=acl,
+        owner_user_id=owner_user_id,
+        content_type=content_type,
+        size_bytes=upload.size if upload else None,
+        sha256=upload.sha256 if upload else None,
+        storage_key=upload.storage_key if upload else None,
+    )
+    db.add(row)
+    return row
+
+
+def forget_stored_file(db: Session, kind: str, file_name: Optional[str]) -> Optional[str]:
+    """Remove a registry row in the caller's transaction.
+
+    For a content-addressed file this also drops its blob reference and
+    returns the blob's storage key when nothing references it any more; pass
+    that to ``delete_orphaned_blob`` after committing.
+    """
+    if not file_name:
+        return None
+    row = find_stored_file(db, kind, file_name)
+    if row is None:
+        return None
+    sha256, storage_key = row.sha256, row.storage_key
+    db.delete(row)
+    if storage_key and sha256:
+        return release_blob(db, sha256)
+    return None
+
+
+def blob_storage_key(sha256: str) -> str:
+    return f"blobs/{sha256[:2]}/{sha256}"
+
+
+def acquire_blob(db: Session, sha256: str, storage_key: str, size: int) -> int:
+    """Add a reference to a blob, creating its row if needed; returns the new count."""
+    table = StoredBlob.__table__
+    stmt = (
+        dialect_insert(table)
+        .values(sha256=sha256, storage_key=storage_key, size_bytes=size, ref_count=1)
+        .on_conflict_do_update(index_elements=[table.c.sha256], set_={"ref_count": table.c.ref_count + 1})
+        .returning(table.c.ref_count)
+    )
+    return int(db.execute(stmt).scalar_one())
+
+
+def release_blob(db: Session, sha256: str) -> Optional[str]:
+    """Drop a reference; returns the blob's storage key once nothing references it.
+
+    The row is kept at zero references as a tombstone, so ``delete_orphaned_blob``
+    has a row to lock while it deletes the bytes.
+    """
+    row = db.execute(
+        update(StoredBlob)
+        .where(StoredBlob.sha256 == sha256)
+        .values(ref_count=StoredBlob.ref_count - 1)
+        .returning(StoredBlob.ref_count, StoredBlob.storage_key)
+    ).first()
+    if row is None or row.ref_count > 0:
+        return None
+    return row.storage_key
+
+
+@contextmanager
+def _orphaned_blob(sha256: str) -> Iterator[bool]:
+    """Hold a released blob's row for the length of a delete; yields whether it is still unreferenced.
+
+    The conditional UPDATE takes the row lock (the write lock on SQLite) and
+    re-checks the count in the same transaction. A concurrent ``acquire_blob``
+    waits for the delete to finish and then sees itself as the first
+    reference, which makes the uploader put the bytes back.
+    """
+    db = SessionLocal()
+    try:
+        claimed = db.execute(
+            update(StoredBlob)
+            .where(StoredBlob.sha256 == sha256, StoredBlob.ref_count <= 0)
+            .values(ref_count=StoredBlob.ref_count)
+        ).rowcount
+        yield bool(claimed)
+        if claimed:
+            db.execute(delete(StoredBlob).where(StoredBlob.sha256 == sha256))
+            db.commit()
+    finally:
+        db.close()
+
+
+def delete_orphaned_blob(storage_key: Optional[str], local_root: Path) -> None:
+    """Delete a released blob's bytes unless it is referenced again by the time the delete runs.
+
+    Call after committing the release. The bucket delete is queued; the local
+    file is removed right away. Both run under ``_orphaned_blob``.
+    """
+    if not storage_key:
+        return
+    sha256 = storage_key.rsplit("/", 1)[-1]
+    if object_storage.enabled:
+        object_storage.delete_later(storage_key, guard=lambda: _orphaned_blob(sha256))
+        return
+    with _orphaned_blob(sha256) as orphaned:
+        if orphaned:
+            (local_root / storage_key).unlink(missing_ok=True)
+
+
+def _blob_in_use(sha256: str) -> bool:
+    db = SessionLocal()
+    try:
+        row = db.query(StoredBlob.sha256).filter(StoredBlob.sha256 == sha256, StoredBlob.ref_count > 0).first()
+        return row is not None
+    finally:
+        db.close()
+
+
+def _reference_blob(sha256: str, storage_key: str, size: int) -> int:
+    db = SessionLocal()
+    try:
+        count = acquire_blob(db, sha256, storage_key, size)
+        db.commit()
+        return count
+    finally:
+        db.close()
+
+
+def _unreference_blob(sha256: str) -> None:
+    db = SessionLocal()
+    try:
+        release_blob(db, sha256)
+        db.commit()
+    finally:
+        db.close()
+
+
+def _write_local_blob(source: Path, destination: Path) -> None:
+    # Copied under a temporary name and renamed, so readers never see a partial blob.
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(dir=destination.parent, suffix=".part", delete=False) as partial:
+        with source.open("rb") as body:
+            shutil.copyfileobj(body, partial)
+    os.replace(partial.name, destination)
+
+
+async def _put_blob(stored: StoredUpload, spooled: BinaryIO, local_root: Path, content_type: Optional[str]) -> None:
+    if object_storage.enabled:
+        spooled.seek(0)
+        await object_storage.upload_fileobj_async(stored.storage_key, spooled, content_type, {"sha256": stored.sha256})
+    else:
+        await run_in_threadpool(_write_local_blob, Path(spooled.name), local_root / stored.storage_key)
+
+
+async def _blob_present(storage_key: str, local_root: Path) -> bool:
+    if object_storage.enabled:
+        return await object_storage.run(object_storage.object_exists, storage_key)
+    return (local_root / storage_key).is_file()
+
+
+async def store_content_addressed_upload(
+    file: UploadFile,
+    local_root: Path,
+    max_bytes: int,
+    too_large_detail: str,
+) -> StoredUpload:
+    """Store an upload once per distinct content and commit a reference to it.
+
+    The bytes are spooled and hashed first. Content nobody references yet is
+    uploaded (to ``blobs/<xx>/<sha256>``, in the bucket or under
+    ``local_root``) before the reference is taken, and the reference is an
+    upsert committed on its own in the thread pool, so no row lock is ever
+    held across an ``await``. Identical files afterwards just bump the blob's
+    reference count. The caller registers the file with the returned upload;
+    should its transaction fail, the extra reference only keeps the bytes alive.
+    """
+    spooled, stored = await spool_upload(file, max_bytes, too_large_detail)
+    stored.storage_key = blob_storage_key(stored.sha256)
+    try:
+        uploaded = False
+        if not await run_in_threadpool(_blob_in_use, stored.sha256):
+            await _put_blob(stored, spooled, local_root, file.content_type)
+            uploaded = True
+        if await run_in_threadpool(_reference_blob, stored.sha256, stored.storage_key, stored.size) == 1:
+            # First reference: an orphan delete may have removed the bytes before our row landed.
+            try:
+                if not (uploaded and await _blob_present(stored.storage_key, local_root)):
+                    await _put_blob(stored, spooled, local_root, file.content_type)
+            except BaseException:
+                await run_in_threadpool(_unreference_blob, stored.sha256)
+                raise
+    finally:
+        spooled.close()
+        Path(spooled.name).unlink(missing_ok=True)
+    return stored
+
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_stored_files(db: Session) -> int:
+    """Register files referenced by existing URL columns. Safe to run repeatedly.
+
+    Every worker runs this at startup, possibly at the same moment, so rows
+    another worker registered in the meantime are skipped rather than
+    failing on the ``(kind, file_name)`` constraint.
+    """
+    known = {(kind, name) for kind, name in db.query(StoredFile.kind, StoredFile.file_name).all()}
+    rows: list[dict] = []
+
+    def add(kind: str, url: Optional[str], acl: str, owner_user_id: Optional[int]) -> None:
+        name = file_name_from_url(url, kind)
+        if not name or (kind, name) in known:
+            return
+        known.add((kind, name))
+        rows.append({"kind": kind, "file_name": name, "acl": acl, "owner_user_id": owner_user_id})
+
+    user_columns = [User.id, User.avatar_url] + [getattr(User, column) for column in PROFILE_DOCUMENT_COLUMNS]
+    users = db.query(*user_columns).filter(or_(*(column.isnot(None) for column in user_columns[1:])))
+    for user_id, avatar_url, *document_urls in users.all():
+        add(FILE_KIND_AVATAR, avatar_url, FILE_ACL_PUBLIC, user_id)
+        for url in document_urls:
+            add(FILE_KIND_PROFILE_DOCUMENT, url, FILE_ACL_OWNER, user_id)
+
+    for file_url, uploaded_by_id in db.query(CompanyDocument.file_url, CompanyDocument.uploaded_by_id).all():
+        add(FILE_KIND_LIBRARY, file_url, FILE_ACL_AUTHENTICATED, uploaded_by_id)
+
+    sick_notes = db.query(Event.sick_note_url, Event.user_id).filter(Event.sick_note_url.isnot(None))
+    for sick_note_url, user_id in sick_notes.all():
+        add(FILE_KIND_SICK_NOTE, sick_note_url, FILE_ACL_ADMIN, user_id)
+
+    table = StoredFile.__table__
+    registered = 0
+    for start in range(0, len(rows), BACKFILL_BATCH_SIZE):
+        stmt = (
+            dialect_insert(table)
+            .values(rows[start:start + BACKFILL_BATCH_SIZE])
+            .on_conflict_do_nothing(index_elements=[table.c.kind, table.c.file_name])
+        )
+        registered += max(0, db.execute(stmt).rowcount or 0)
+    if rows:
+        db.commit()
+    return registered
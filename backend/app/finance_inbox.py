@@ -0,0 +1,161 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, Optional
+
+from sqlalchemy import literal, null, select, tuple_, union_all
+from sqlalchemy.orm import Session
+
+from .models import (
+    AuthorityToIncurRequest,
+    CashReimbursementRequest,
+    CashRequisitionRequest,
+    SalaryAdvanceRequest,
+    User,
+)
+
+INBOX_KINDS = ("cash_reimbursement", "cash_requisition", "authority_to_incur", "salary_advance")
+INBOX_SORTS = ("age", "amount")
+INBOX_MAX_LIMIT = 200
+
+_PENDING_ALL = ("pending_parallel_approval", "pending_ceo_approval", "pending_finance_review")
+
+# What each role's inbox holds, the same rows as the per-workflow /pending lists.
+_PENDING_STATUSES = {
+    "finance": {
+        "cash_reimbursement": ("pending_approval",),
+        "cash_requisition": ("pending_finance_review",),
+        "authority_to_incur": _PENDING_ALL,
+        "salary_advance": _PENDING_ALL,
+    },
+    "approver": {
+        "cash_reimbursement": ("pending_approval",),
+        "cash_requisition": ("pending_finance_review", "pending_ceo_approval"),
+        "authority_to_incur": _PENDING_ALL,
+        "salary_advance": _PENDING_ALL,
+    },
+}
+
+
+class InboxQueryError(ValueError):
+    """A filter, sort or cursor the inbox cannot apply."""
+
+
+def _sources():
+    return {
+        "cash_reimbursement": (CashReimbursementRequest, CashReimbursementRequest.total_amount, null()),
+        "cash_requisition": (CashRequisitionRequest, CashRequisitionRequest.amount, CashRequisitionRequest.purpose),
+        "authority_to_incur": (AuthorityToIncurRequest, AuthorityToIncurRequest.amount, AuthorityToIncurRequest.title),
+        "salary_advance": (SalaryAdvanceRequest, SalaryAdvanceRequest.amount, SalaryAdvanceRequest.reason),
+    }
+
+
+def encode_cursor(sort: str, value, kind: str, item_id: int) -> str:
+    raw = json.dumps([sort, str(value), kind, item_id], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        cursor_sort, value, kind, item_id = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if cursor_sort != sort or kind not in INBOX_KINDS:
+            raise ValueError(cursor_sort)
+        key = datetime.fromisoformat(value) if sort == "age" else Decimal(value)
+        return key, kind, int(item_id)
+    except (ValueError, TypeError, binascii.Error, ArithmeticError) as exc:
+        raise InboxQueryError("Invalid cursor") from exc
+
+
+def inbox_page(
+    db: Session,
+    role: str,
+    kinds: Optional[Iterable[str]] = None,
+    sort: str = "age",
+    descending: bool = False,
+    limit: int = 50,
+    cursor: Optional[str] = None,
+    user_id: Optional[int] = None,
+    department: Optional[str] = None,
+    min_amount: Optional[float] = None,
+    max_amount: Optional[float] = None,
+) -> tuple[list, Optional[str]]:
+    """One page of the pending finance requests ``role`` reviews, across all four workflows.
+
+    Rows are ordered by ``(submitted_at | amount, kind, id)`` and paged by
+    keyset: the cursor holds the last row's key, so every page costs the
+    same however deep the backlog is. Each workflow's branch applies the
+    filters, the cursor and the limit itself (served by the partial
+    pending indexes) before the branches are merged.
+    """
+    if sort not in INBOX_SORTS:
+        raise InboxQueryError(f"sort must be one of: {', '.join(INBOX_SORTS)}")
+    wanted = list(dict.fromkeys(kinds or INBOX_KINDS))
+    unknown = [kind for kind in wanted if kind not in INBOX_KINDS]
+    if unknown:
+        raise InboxQueryError(f"Unknown kind: {', '.join(unknown)}")
+    limit = max(1, min(int(limit), INBOX_MAX_LIMIT))
+    after = decode_cursor(cursor, sort) if cursor else None
+    statuses = _PENDING_STATUSES["finance" if (role or "").strip().lower() == "finance" else "approver"]
+
+    branches = []
+    for kind, (model, amount, summary) in _sources().items():
+        if kind not in wanted:
+            continue
+        sort_column = model.submitted_at if sort == "age" else amount
+        kind_value = literal(kind)
+        branch = (
+            select(
+                kind_value.label("kind"),
+                model.id.label("id"),
+                model.user_id.label("user_id"),
+                User.name.label("user_name"),
+                User.department.label("user_department"),
+                amount.label("amount"),
+                model.status.label("status"),
+                summary.label("summary"),
+                model.submitted_at.label("submitted_at"),
+                sort_column.label("sort_key"),
+            )
+            .join(User, User.id == model.user_id)
+            .where(model.status.in_(statuses[kind]))
+        )
+        if user_id is not None:
+            branch = branch.where(model.user_id == user_id)
+        if department:
+            branch = branch.where(User.department == department)
+        if min_amount is not None:
+            branch = branch.where(amount >= min_amount)
+        if max_amount is not None:
+            branch = branch.where(amount <= max_amount)
+        if after is not None:
+            key = tuple_(sort_column, kind_value, model.id)
+            bound = tuple_(literal(after[0]), literal(after[1]), literal(after[2]))
+            branch = branch.where(key < bound if descending else key > bound)
+        order = (sort_column.desc(), model.id.desc()) if descending else (sort_column.asc(), model.id.asc())
+        branches.append(select(*branch.order_by(*order).limit(limit + 1).subquery().c))
+
+    if not branches:
+        return [], None
+    merged = (union_all(*branches) if len(branches) > 1 else branches[0]).subquery()
+    columns = (merged.c.sort_key, merged.c.kind, merged.c.id)
+    rows = (
+        db.execute(
+            select(merged)
+            .order_by(*(column.desc() if descending else column.asc() for column in columns))
+            .limit(limit + 1)
+        )
+        .mappings()
+        .all()
+    )
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        value = last["sort_key"]
+        next_cursor = encode_cursor(sort, value.isoformat() if isinstance(value, datetime) else value, last["kind"], last["id"])
+    return rows, next_cursor
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Callable, Optional
+
+from sqlalchemy import case, delete, null, select
+from sqlalchemy.orm import Session
+
+from .config import settings
+from .db import SessionLocal, dialect_insert
+from .models import LoginThrottleEntry
+
+
+class LoginThrottle(ABC):
+    """Counts failed logins per key and blocks a key once it hits the limit.
+
+    A key's counting window starts at its first failure. Reaching
+    ``max_attempts`` failures inside the window blocks the key for
+    ``block_seconds``. Entries whose window and block have both lapsed are
+    removed by ``sweep``, which ``retry_after`` runs at most every
+    ``sweep_seconds``.
+    """
+
+    def __init__(
+        self,
+        window_seconds: int,
+        max_attempts: int,
+        block_seconds: int,
+        sweep_seconds: int,
+    ) -> None:
+        self.window = timedelta(seconds=max(1, int(window_seconds)))
+        self.max_attempts = max(1, int(max_attempts))
+        self.block = timedelta(seconds=max(1, int(block_seconds)))
+        self.sweep_seconds = max(0, int(sweep_seconds))
+        self._sweep_lock = Lock()
+        self._last_sweep = time.monotonic()
+
+    def retry_after(self, keys: list[str], now: Optional[datetime] = None) -> int:
+        """Seconds until the first blocked key is released, or 0 if none is blocked."""
+        now = now or datetime.utcnow()
+        self._maybe_sweep(now)
+        return self._retry_after(keys, now)
+
+    @abstractmethod
+    def record_failure(self, keys: list[str], now: Optional[datetime] = None) -> None:
+        """Count one failed login against each key, blocking those that reach the limit."""
+
+    @abstractmethod
+    def clear(self, keys: list[str]) -> None:
+        """Forget the failures and any block recorded for these keys."""
+
+    @abstractmethod
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        """Drop expired entries and return how many were removed."""
+
+    @abstractmethod
+    def _retry_after(self, keys: list[str], now: datetime) -> int:
+        """``retry_after`` for the store, without the periodic sweep."""
+
+    def _maybe_sweep(self, now: datetime) -> None:
+        if not self.sweep_seconds:
+            return
+        current = time.monotonic()
+        if current - self._last_sweep < self.sweep_seconds:
+            return
+        # Only one request per process pays for the sweep; others skip it.
+        if not self._sweep_lock.acquire(blocking=False):
+            return
+        try:
+            if current - self._last_sweep < self.sweep_seconds:
+                return
+            self._last_sweep = current
+            self.sweep(now)
+        finally:
+            self._sweep_lock.release()
+
+
+class InMemoryLoginThrottle(LoginThrottle):
+    """Per-process state. Fine for development and single-worker deployments."""
+
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._lock = Lock()
+        self._state: dict[str, dict[str, object]] = {}
+
+    def __len__(self) -> int:
+        return len(self._state)
+
+    def _retry_after(self, keys: list[str], now: datetime) -> int:
+        with self._lock:
+            for key in keys:
+                state = self._state.get(key)
+                if not state:
+                    continue
+                blocked_until = state.get("blocked_until")
+                if isinstance(blocked_until, datetime) and blocked_until > now:
+                    return max(1, int((blocked_until - now).total_seconds()))
+                if isinstance(blocked_until, datetime):
+                    self._state.pop(key, None)
+        return 0
+
+    def record_failure(self, keys: list[str], now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        with self._lock:
+            for key in keys:
+                state = self._state.get(key)
+                if not state or state["window_expires_at"] <= now:
+                    self._state[key] = {"count": 1, "window_expires_at": now + self.window}
+                    continue
+                state["count"] = int(state["count"]) + 1
+                if state["count"] >= self.max_attempts:
+                    state["blocked_until"] = now + self.block
+
+    def clear(self, keys: list[str]) -> None:
+        with self._lock:
+            for key in keys:
+                self._state.pop(key, None)
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        with self._lock:
+            expired = [
+                key
+                for key, state in self._state.items()
+                if state["window_expires_at"] <= now
+                and not (isinstance(state.get("blocked_until"), datetime) and state["blocked_until"] > now)
+            ]
+            for key in expired:
+                del self._state[key]
+        return len(expired)
+
+
+class DatabaseLoginThrottle(LoginThrottle):
+    """State in the ``login_throttle_entries`` table, shared by every worker.
+
+    Checks are primary-key lookups and failures are a single atomic upsert,
+    so concurrent workers cannot lose increments.
+    """
+
+    def __init__(self, *args, session_factory: Callable[[], Session] = SessionLocal, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._session_factory = session_factory
+
+    def _retry_after(self, keys: list[str], now: datetime) -> int:
+        with self._session_factory() as db:
+            rows = db.execute(
+                select(LoginThrottleEntry.key, LoginThrottleEntry.blocked_until).where(
+                    LoginThrottleEntry.key.in_(keys),
+                    LoginThrottleEntry.blocked_until.is_not(None),
+                )
+            ).all()
+            lapsed = [key for key, blocked_until in rows if blocked_until <= now]
+            if lapsed:
+                db.execute(delete(LoginThrottleEntry).where(LoginThrottleEntry.key.in_(lapsed)))
+                db.commit()
+        blocked = {key: blocked_until for key, blocked_until in rows if blocked_until > now}
+        for key in keys:
+            if key in blocked:
+                return max(1, int((blocked[key] - now).total_seconds()))
+        return 0
+
+    def record_failure(self, keys: list[str], now: Optional[datetime] = None) -> None:
+        now = now or datetime.utcnow()
+        table = LoginThrottleEntry.__table__
+        window_lapsed = table.c.window_expires_at <= now
+        stmt = dialect_insert(table).values(
+            [{"key": key, "attempts": 1, "window_expires_at": now + self.window, "blocked_until": None} for key in keys]
+        )
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[table.c.key],
+            set_={
+                "attempts": case((window_lapsed, 1), else_=table.c.attempts + 1),
+                "window_expires_at": case((window_lapsed, now + self.window), else_=table.c.window_expires_at),
+                "blocked_until": case(
+                    (window_lapsed, null()),
+                    (table.c.attempts + 1 >= self.max_attempts, now + self.block),
+                    else_=table.c.blocked_until,
+                ),
+            },
+        )
+        with self._session_factory() as db:
+            db.execute(stmt)
+            db.commit()
+
+    def clear(self, keys: list[str]) -> None:
+        with self._session_factory() as db:
+            db.execute(delete(LoginThrottleEntry).where(LoginThrottleEntry.key.in_(keys)))
+            db.commit()
+
+    def sweep(self, now: Optional[datetime] = None) -> int:
+        now = now or datetime.utcnow()
+        with self._session_factory() as db:
+            result = db.execute(
+                delete(LoginThrottleEntry).where(
+                    LoginThrottleEntry.window_expires_at <= now,
+                    (LoginThrottleEntry.blocked_until.is_(None)) | (LoginThrottleEntry.blocked_until <= now),
+                )
+            )
+            db.commit()
+        return int(result.rowcount or 0)
+
+
+def build_login_throttle() -> LoginThrottle:
+    kwargs = dict(
+        window_seconds=settings.LOGIN_THROTTLE_WINDOW_SECONDS,
+        max_attempts=settings.LOGIN_THROTTLE_MAX_ATTEMPTS,
+        block_seconds=settings.LOGIN_THROTTLE_BLOCK_SECONDS,
+        sweep_seconds=settings.LOGIN_THROTTLE_SWEEP_SECONDS,
+    )
+    if settings.login_throttle_backend == "database":
+        return DatabaseLoginThrottle(**kwargs)
+    return InMemoryLoginThrottle(**kwargs)
+
+
+login_throttle = build_login_throttle()
@@ -1,26 +1,29 @@
 from calendar import monthrange
 from datetime import datetime, date, timedelta
 from decimal import Decimal
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import List, Optional
 from pathlib import Path
 from uuid import uuid4
+import asyncio
 import json
 import hashlib
 import secrets
 import logging
-from threading import Lock
 
 from fastapi import FastAPI, Depends, HTTPException, WebSocket, WebSocketDisconnect, Query, UploadFile, File, Request, Form, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
-from fastapi.responses import FileResponse, Response
+from fastapi.responses import FileResponse, RedirectResponse, Response, StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
+from starlette.concurrency import run_in_threadpool
 from starlette.middleware.base import BaseHTTPMiddleware
 from jose import jwt
-from sqlalchemy import func, or_, and_, text
+from sqlalchemy import case, exists, func, or_, and_, select, text, update
 from sqlalchemy.orm import Session
 
-from .db import Base, engine, get_db
+from .db import Base, SessionLocal, engine, get_db
 from .models import (
     User,
     Event,
@@ -49,6 +52,7 @@ from .models import (
     PerformanceEmployeeGoal,
     PerformanceAppraisal,
     PasswordResetToken,
+    StoredFile,
 )
 from .schemas import (
     TokenResponse,
@@ -112,6 +116,11 @@ from .schemas import (
     CashReimbursementSubmitIn,
     CashReimbursementRequestOut,
     FinanceAttentionOut,
+    FinanceBulkDecisionIn,
+    FinanceBulkDecisionItemOut,
+    FinanceBulkDecisionOut,
+    FinanceInboxItemOut,
+    FinanceInboxPageOut,
     CashReimbursementDecisionIn,
     CashReimbursementDraftSaveIn,
     CashReimbursementDraftManualItemOut,
@@ -155,13 +164,68 @@ from .schemas import (
     PerformanceAppraisalSupervisorIn,
     PerformanceAppraisalOut,
 )
-from .security import verify_password, create_access_token, hash_password
-from .deps import get_current_user, require_admin, require_leave_approver
+from .security import (
+    PasswordHashingBusyError,
+    create_access_token,
+    hash_password,
+    password_hash_pool,
+    verify_and_update_password,
+)
+from .deps import (
+    get_current_user,
+    require_admin,
+    require_leave_approver,
+    invalidate_cached_user,
+    clear_cached_users,
+)
 from .config import settings
 
-from .ws_manager import ConnectionManager
+from .attention import (
+    AttentionNotifier,
+    finance_attention,
+    payroll_admin_attention,
+    payroll_attention,
+)
+from .broadcast_bus import build_broadcast_bus
+from .finance_inbox import INBOX_MAX_LIMIT, InboxQueryError, inbox_page
+from .change_notifier import EventChangeNotifier
+from .ws_manager import (
+    TOPIC_APPROVERS,
+    TOPIC_CALENDAR,
+    TOPIC_FINANCE,
+    ConnectionManager,
+    department_topic,
+    role_topic,
+    user_topic,
+)
 from .leave_service import compute_leave_balance, validate_leave_request
 from .storage import object_storage
+from .uploads import RequestBodyLimitMiddleware, store_upload
+from .thumbnails import (
+    AVATAR_THUMBNAIL_CONTENT_TYPE,
+    AVATAR_THUMBNAIL_SIZES,
+    avatar_thumbnail_name,
+    avatar_thumbnail_size_for,
+    render_avatar_thumbnails,
+)
+from .file_registry import (
+    FILE_ACL_ADMIN,
+    FILE_ACL_AUTHENTICATED,
+    FILE_ACL_OWNER,
+    FILE_ACL_PUBLIC,
+    FILE_KIND_AVATAR,
+    FILE_KIND_LIBRARY,
+    FILE_KIND_PROFILE_DOCUMENT,
+    FILE_KIND_SICK_NOTE,
+    backfill_stored_files,
+    delete_orphaned_blob,
+    file_name_from_url,
+    find_stored_file,
+    forget_stored_file,
+    register_stored_file,
+    store_content_addressed_upload,
+)
+from .login_throttle import login_throttle
 from .email_service import (
     send_email,
     password_reset_delivery_ready,
@@ -170,13 +234,21 @@ from .email_service import (
 from .ai_service import GeminiReportTemporarilyUnavailableError, build_client_workplan_ai_report
 
 logger = logging.getLogger(__name__)
-LOGIN_THROTTLE_LOCK = Lock()
-LOGIN_THROTTLE_STATE: dict[str, dict[str, object]] = {}
 
 app = FastAPI(title="SustainFlow API")
-ws_manager = ConnectionManager()
+ws_manager = ConnectionManager(
+    queue_size=settings.WS_SEND_QUEUE_SIZE,
+    send_timeout=settings.WS_SEND_TIMEOUT_SECONDS,
+    heartbeat_seconds=settings.WS_HEARTBEAT_SECONDS,
+    idle_timeout=settings.WS_IDLE_TIMEOUT_SECONDS,
+    max_per_user=settings.WS_MAX_CONNECTIONS_PER_USER,
+)
+broadcast_bus = build_broadcast_bus(ws_manager.publish)
+event_changes = EventChangeNotifier(broadcast_bus.publish, window_seconds=settings.WS_CHANGE_COALESCE_SECONDS)
+attention = AttentionNotifier(broadcast_bus.publish, SessionLocal, window_seconds=settings.WS_ATTENTION_COALESCE_SECONDS)
 UPLOADS_DIR = Path(__file__).resolve().parents[1] / "uploads"
 AVATARS_DIR = UPLOADS_DIR / "avatars"
+AVATAR_CACHE_CONTROL = "public, max-age=31536000, immutable"
 DOCUMENTS_DIR = UPLOADS_DIR / "documents"
 LIBRARY_DIR = UPLOADS_DIR / "library"
 SICK_NOTES_DIR = UPLOADS_DIR / "sick_notes"
@@ -235,6 +307,8 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             response.headers["Cross-Origin-Resource-Policy"] = "same-site"
         return response
 
+# Innermost, so 413 answers still carry the CORS and security headers.
+app.add_middleware(RequestBodyLimitMiddleware, max_bytes=settings.REQUEST_BODY_MAX_BYTES)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins_list,
@@ -274,6 +348,27 @@ def startup():
     if settings.ENABLE_AUTO_SCHEMA_CREATE:
         Base.metadata.create_all(bind=engine)
     _run_startup_migrations()
+    db = SessionLocal()
+    try:
+        registered = backfill_stored_files(db)
+        if registered:
+            logger.info("Registered %s previously uploaded file(s) in stored_files", registered)
+    finally:
+        db.close()
+
+
+@app.on_event("startup")
+async def start_broadcast_bus():
+    loop = asyncio.get_running_loop()
+    broadcast_bus.start(loop)
+    attention.start(loop)
+
+
+@app.on_event("shutdown")
+def shutdown():
+    attention.stop()
+    broadcast_bus.stop()
+    object_storage.shutdown(timeout=10)
 
 
 def _run_startup_migrations():
@@ -333,6 +428,64 @@ def _run_startup_migrations():
             conn.execute(text("CREATE INDEX IF NOT EXISTS ix_library_subcategories_created_at ON library_subcategories(created_at)"))
         except Exception:
             pass
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS login_throttle_entries (
+                    key VARCHAR(400) PRIMARY KEY,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    window_expires_at TIMESTAMP NOT NULL,
+                    blocked_until TIMESTAMP
+                )
+            """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_login_throttle_entries_window_expires_at ON login_throttle_entries(window_expires_at)"))
+        except Exception:
+            pass
+        try:
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS stored_files (
+                    id SERIAL PRIMARY KEY,
+                    kind VARCHAR(30) NOT NULL,
+                    file_name VARCHAR(255) NOT NULL,
+                    owner_user_id INTEGER REFERENCES users(id),
+                    acl VARCHAR(20) NOT NULL DEFAULT 'owner',
+                    content_type VARCHAR(120),
+                    size_bytes INTEGER,
+                    sha256 VARCHAR(64),
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    CONSTRAINT uq_stored_files_kind_file_name UNIQUE (kind, file_name)
+                )
+            """))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stored_files_file_name ON stored_files(file_name)"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_stored_files_owner_user_id ON stored_files(owner_user_id)"))
+        except Exception:
+            pass
+        try:
+            conn.execute(text("ALTER TABLE stored_files ADD COLUMN IF NOT EXISTS storage_key VARCHAR(300)"))
+            conn.execute(text("""
+                CREATE TABLE IF NOT EXISTS stored_blobs (
+                    sha256 VARCHAR(64) PRIMARY KEY,
+                    storage_key VARCHAR(300) NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    ref_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+                )
+            """))
+        except Exception:
+            pass
+        try:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cash_reimbursement_requests_pending ON cash_reimbursement_requests(finance_decision, ceo_decision) WHERE status = 'pending_approval'"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cash_requisition_requests_pending ON cash_requisition_requests(status) WHERE status IN ('pending_finance_review', 'pending_ceo_approval')"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_authority_to_incur_requests_pending ON authority_to_incur_requests(status) WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_salary_advance_requests_pending ON salary_advance_requests(status) WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"))
+        except Exception:
+            pass
+        try:
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cash_reimbursement_requests_pending_submitted ON cash_reimbursement_requests(submitted_at, id) WHERE status = 'pending_approval'"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_cash_requisition_requests_pending_submitted ON cash_requisition_requests(submitted_at, id) WHERE status IN ('pending_finance_review', 'pending_ceo_approval')"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_authority_to_incur_requests_pending_submitted ON authority_to_incur_requests(submitted_at, id) WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"))
+            conn.execute(text("CREATE INDEX IF NOT EXISTS ix_salary_advance_requests_pending_submitted ON salary_advance_requests(submitted_at, id) WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"))
+        except Exception:
+            pass
         try:
             conn.execute(text("ALTER TABLE daily_activities ADD COLUMN IF NOT EXISTS source_client_task_id INTEGER"))
             conn.execute(text("ALTER TABLE daily_activities ADD COLUMN IF NOT EXISTS continued_from_activity_id INTEGER"))
@@ -371,6 +524,56 @@ def healthz():
     return {"status": "ok"}
 
 
+@app.get("/admin/metrics")
+def get_runtime_metrics(_: User = Depends(require_admin)):
+    return {
+        "password_hashing": password_hash_pool.stats(),
+        "object_cache": object_storage.cache.stats() if object_storage.cache else None,
+        "object_storage": object_storage.stats(),
+        "websockets": ws_manager.stats(),
+        "broadcast": broadcast_bus.stats(),
+        "event_changes": event_changes.stats(),
+        "attention": attention.stats(),
+    }
+
+
+def _password_busy_http_error(exc: PasswordHashingBusyError) -> HTTPException:
+    return HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": "1"})
+
+
+# The password handlers are async so a burst of them waits on the hash pool,
+# not on threadpool tokens. Their database and throttle work goes through
+# run_in_threadpool around the awaited hash, and the phase before the hash
+# closes the session so no pooled connection is held while it waits; the
+# loaded rows stay usable detached and are re-added by the phase after it.
+async def _hash_password_or_503(password: str) -> str:
+    try:
+        return await password_hash_pool.run(hash_password, password)
+    except PasswordHashingBusyError as exc:
+        raise _password_busy_http_error(exc) from exc
+
+
+async def _verify_password_or_503(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    try:
+        return await password_hash_pool.run(verify_and_update_password, password, hashed)
+    except PasswordHashingBusyError as exc:
+        raise _password_busy_http_error(exc) from exc
+
+
+def _save_new_user(db: Session, user: User) -> User:
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _store_password_hash(db: Session, user: User, password_hash: str) -> None:
+    db.add(user)
+    user.password_hash = password_hash
+    db.commit()
+    invalidate_cached_user(user.id)
+
+
 def _password_reset_token_hash(raw_token: str) -> str:
     return hashlib.sha256(raw_token.encode("utf-8")).hexdigest()
 
@@ -419,51 +622,21 @@ def _login_throttle_keys(email: str, request: Request) -> list[str]:
 
 
 def _enforce_login_throttle(email: str, request: Request) -> None:
-    now = datetime.utcnow()
-    with LOGIN_THROTTLE_LOCK:
-        for key in _login_throttle_keys(email, request):
-            state = LOGIN_THROTTLE_STATE.get(key)
-            if not state:
-                continue
-            blocked_until = state.get("blocked_until")
-            if isinstance(blocked_until, datetime) and blocked_until > now:
-                retry_after = max(1, int((blocked_until - now).total_seconds()))
-                raise HTTPException(
-                    status_code=429,
-                    detail=f"Too many login attempts. Try again in {retry_after} seconds.",
-                    headers={"Retry-After": str(retry_after)},
-                )
-            if isinstance(blocked_until, datetime) and blocked_until <= now:
-                LOGIN_THROTTLE_STATE.pop(key, None)
+    retry_after = login_throttle.retry_after(_login_throttle_keys(email, request))
+    if retry_after:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many login attempts. Try again in {retry_after} seconds.",
+            headers={"Retry-After": str(retry_after)},
+        )
 
 
 def _record_login_failure(email: str, request: Request) -> None:
-    now = datetime.utcnow()
-    with LOGIN_THROTTLE_LOCK:
-        for key in _login_throttle_keys(email, request):
-            state = LOGIN_THROTTLE_STATE.get(key)
-            if not state:
-                LOGIN_THROTTLE_STATE[key] = {"count": 1, "window_start": now}
-                continue
-
-            window_start = state.get("window_start")
-            count = int(state.get("count") or 0)
-            if not isinstance(window_start, datetime) or (now - window_start).total_seconds() > settings.LOGIN_THROTTLE_WINDOW_SECONDS:
-                state["count"] = 1
-                state["window_start"] = now
-                state.pop("blocked_until", None)
-                continue
-
-            count += 1
-            state["count"] = count
-            if count >= settings.LOGIN_THROTTLE_MAX_ATTEMPTS:
-                state["blocked_until"] = now + timedelta(seconds=settings.LOGIN_THROTTLE_BLOCK_SECONDS)
+    login_throttle.record_failure(_login_throttle_keys(email, request))
 
 
 def _clear_login_throttle(email: str, request: Request) -> None:
-    with LOGIN_THROTTLE_LOCK:
-        for key in _login_throttle_keys(email, request):
-            LOGIN_THROTTLE_STATE.pop(key, None)
+    login_throttle.clear(_login_throttle_keys(email, request))
 
 
 def _csrf_from_auth_cookie(request: Request) -> Optional[str]:
@@ -481,80 +654,100 @@ def _csrf_from_auth_cookie(request: Request) -> Optional[str]:
 @app.get("/files/documents/{file_name}")
 def get_profile_document_file(
     file_name: str,
+    request: Request,
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    profile_fields = [getattr(User, f) for f in PROFILE_DOCUMENT_FIELDS.values()]
-    like_filters = [
-        field.like(f"%/uploads/documents/{file_name}") | field.like(f"%/files/documents/{file_name}")
-        for field in profile_fields
-    ]
-    owner = db.query(User).filter(or_(*like_filters)).first()
-    if not owner:
-        raise HTTPException(status_code=404, detail="File not found")
-    if not _is_admin_like(current.role) and current.id != owner.id:
-        raise HTTPException(status_code=403, detail="Not allowed")
+    stored = _authorize_stored_file(db, FILE_KIND_PROFILE_DOCUMENT, file_name, current)
+    if stored.storage_key:
+        return _serve_stored_blob(stored, request)
 
     path = DOCUMENTS_DIR / file_name
-    return _serve_local_or_object(path, _document_key(file_name))
+    return _serve_local_or_object(path, _document_key(file_name), request)
 
 
 @app.get("/files/library/{file_name}")
 def get_library_document_file(
     file_name: str,
+    request: Request,
     db: Session = Depends(get_db),
-    _: User = Depends(get_current_user),
+    current: User = Depends(get_current_user),
 ):
-    exists = (
-        db.query(CompanyDocument)
-        .filter(
-            CompanyDocument.file_url.like(f"%/uploads/library/{file_name}")
-            | CompanyDocument.file_url.like(f"%/files/library/{file_name}")
-        )
-        .first()
-        is not None
-    )
-    if not exists:
-        raise HTTPException(status_code=404, detail="File not found")
+    stored = _authorize_stored_file(db, FILE_KIND_LIBRARY, file_name, current)
+    if stored.storage_key:
+        return _serve_stored_blob(stored, request)
 
     path = LIBRARY_DIR / file_name
-    return _serve_local_or_object(path, _library_key(file_name))
+    return _serve_local_or_object(path, _library_key(file_name), request)
 
 
 @app.get("/files/sick-notes/{file_name}")
 def get_sick_note_file(
     file_name: str,
+    request: Request,
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    e = (
-        db.query(Event)
-        .filter(
-            Event.sick_note_url.like(f"%/uploads/sick_notes/{file_name}")
-            | Event.sick_note_url.like(f"%/files/sick-notes/{file_name}")
-        )
-        .first()
+    _authorize_stored_file(
+        db, FILE_KIND_SICK_NOTE, file_name, current, denied_detail="Only admin/ceo can view sick notes"
     )
-    if not e:
-        raise HTTPException(status_code=404, detail="File not found")
-    if not _is_admin_like(current.role):
-        raise HTTPException(status_code=403, detail="Only admin/ceo can view sick notes")
 
     path = SICK_NOTES_DIR / file_name
-    return _serve_local_or_object(path, _sick_note_key(file_name))
+    return _serve_local_or_object(path, _sick_note_key(file_name), request)
+
+
+def _avatar_variant_exists(db: Session, file_name: str) -> bool:
+    # Thumbnails are requested on every page; the registry is only asked when
+    # neither the disk nor the object cache already has the file.
+    if (AVATARS_DIR / file_name).is_file() or object_storage.is_cached(_avatar_key(file_name)):
+        return True
+    return find_stored_file(db, FILE_KIND_AVATAR, file_name) is not None
 
 
 @app.get("/avatars/{file_name}")
-def get_avatar_file(file_name: str):
+def get_avatar_file(
+    file_name: str,
+    request: Request,
+    size: Optional[int] = Query(default=None, ge=1),
+    db: Session = Depends(get_db),
+):
+    if size is not None:
+        variant = avatar_thumbnail_size_for(size)
+        thumbnail_name = avatar_thumbnail_name(file_name, variant) if variant else None
+        if thumbnail_name and _avatar_variant_exists(db, thumbnail_name):
+            file_name = thumbnail_name
+
     path = AVATARS_DIR / file_name
-    return _serve_local_or_object(path, _avatar_key(file_name))
+    response = _serve_local_or_object(path, _avatar_key(file_name), request)
+    if response.status_code in {200, 206, 304}:
+        # Avatar names are random per upload and never rewritten, so clients may keep them forever.
+        response.headers["Cache-Control"] = AVATAR_CACHE_CONTROL
+    return response
 
 
 # -------------------------
 # WebSocket
 # -------------------------
+def _ws_topics_for(user: User, requested: str = "") -> list[str]:
+    """Topics a socket may follow, optionally narrowed by the client's comma-separated ``topics``."""
+    allowed = {TOPIC_CALENDAR: TOPIC_CALENDAR, "user": user_topic(user.id)}
+    if user.role:
+        allowed["role"] = role_topic(user.role)
+    if user.department:
+        allowed["department"] = department_topic(user.department)
+    if user.role in {"admin", "ceo", "supervisor"}:
+        allowed[TOPIC_APPROVERS] = TOPIC_APPROVERS
+    if _is_finance_reviewer(user.role):
+        allowed[TOPIC_FINANCE] = TOPIC_FINANCE
+    wanted = {name.strip() for name in (requested or "").split(",") if name.strip()}
+    if not wanted:
+        return list(allowed.values())
+    # A socket always hears about its own user, whatever else it narrows to.
+    return [topic for name, topic in allowed.items() if name in wanted or name == "user"]
+
+
 @app.websocket("/ws")
-async def websocket_endpoint(websocket: WebSocket, token: str = Query(default="")):
+async def websocket_endpoint(websocket: WebSocket, token: str = Query(default=""), topics: str = Query(default="")):
     # Prefer auth cookie; keep token query param as a backward-compatible fallback.
     token = websocket.cookies.get(settings.AUTH_COOKIE_NAME) or token
     if not token:
@@ -580,21 +773,62 @@ async def websocket_endpoint(websocket: WebSocket, token: str = Query(default=""
     finally:
         db.close()
 
-    await ws_manager.connect(websocket)
+    if not await ws_manager.connect(websocket, _ws_topics_for(user, topics), user_id=user.id):
+        return
     try:
-        # Keep connection open; client doesn't need to send messages
+        # Clients only answer heartbeats; anything they send marks the socket as alive.
         while True:
-            await websocket.receive_text()
+            ws_manager.touch(websocket, await websocket.receive_text())
     except WebSocketDisconnect:
         await ws_manager.disconnect(websocket)
     except Exception:
         await ws_manager.disconnect(websocket)
 
 
-async def broadcast_events_changed(action: str, event_id: Optional[int] = None):
-    await ws_manager.broadcast_json(
-        {"type": "events_changed", "action": action, "event_id": event_id}
-    )
+def _event_topics(e: Event) -> list[str]:
+    # The calendar shows everyone's events; the owner's other pages and, for
+    # leave-like requests, the approval queues follow changes too.
+    topics = [TOPIC_CALENDAR, user_topic(e.user_id)]
+    if _is_leave_like_event(e):
+        topics.append(TOPIC_APPROVERS)
+    return topics
+
+
+def _event_change_body(db: Session, e: Event) -> dict:
+    """The event as GET /events shows it to a viewer who cannot review it."""
+    # The handler may still return ``e`` with the caller's own permissions.
+    permissions = (getattr(e, "can_current_user_approve", False), getattr(e, "can_current_user_reject", False))
+    _attach_leave_review_metadata(db, e, e.user, e.user)
+    body = EventOut.model_validate(e).model_dump(mode="json")
+    body.update(can_current_user_approve=False, can_current_user_reject=False)
+    e.can_current_user_approve, e.can_current_user_reject = permissions
+    return body
+
+
+def _event_review_overrides(db: Session, e: Event) -> dict[int, dict]:
+    # Only pending leave requests differ per viewer: whoever may act on them.
+    if not _is_leave_like_event(e) or (e.status or "").strip().lower() != "pending":
+        return {}
+    owner = e.user
+    approver_ids = [i for i in (owner.first_approver_id, owner.second_approver_id) if i is not None]
+    reviewers = db.query(User).filter(or_(User.id.in_(approver_ids), User.role.in_(["admin", "ceo"]))).all()
+    overrides: dict[int, dict] = {}
+    for reviewer in reviewers:
+        can_approve, can_reject = _compute_leave_review_permissions(db, reviewer, e, owner)
+        if can_approve or can_reject:
+            overrides[reviewer.id] = {"can_current_user_approve": can_approve, "can_current_user_reject": can_reject}
+    return overrides
+
+
+async def broadcast_events_changed(db: Session, action: str, events: list[Event]):
+    # Coalesced: clients get one message per burst with the ids, date range and,
+    # for created and updated events, the events themselves.
+    for e in events:
+        body = overrides = None
+        if action != "deleted":
+            body = _event_change_body(db, e)
+            overrides = _event_review_overrides(db, e)
+        event_changes.add(action, e.id, e.start_ts, e.end_ts, _event_topics(e), body, overrides)
 
 
 def _avatar_key(file_name: str) -> str:
@@ -613,6 +847,40 @@ def _sick_note_key(file_name: str) -> str:
     return f"sick_notes/{file_name}"
 
 
+def _authorize_stored_file(
+    db: Session,
+    kind: str,
+    file_name: str,
+    current: User,
+    denied_detail: str = "Not allowed",
+) -> StoredFile:
+    stored = find_stored_file(db, kind, file_name)
+    if not stored:
+        raise HTTPException(status_code=404, detail="File not found")
+    if stored.acl in {FILE_ACL_PUBLIC, FILE_ACL_AUTHENTICATED} or _is_admin_like(current.role):
+        return stored
+    if stored.acl == FILE_ACL_OWNER and stored.owner_user_id == current.id:
+        return stored
+    raise HTTPException(status_code=403, detail=denied_detail)
+
+
+async def _store_avatar_thumbnails(file_name: str, source) -> list[str]:
+    # Decoding and resizing a large photo takes tens of milliseconds, so it runs on a worker thread.
+    thumbnails = await run_in_threadpool(render_avatar_thumbnails, source)
+    names = {size: avatar_thumbnail_name(file_name, size) for size in thumbnails}
+    if object_storage.enabled:
+        await asyncio.gather(
+            *(
+                object_storage.upload_bytes_async(_avatar_key(names[size]), content, AVATAR_THUMBNAIL_CONTENT_TYPE)
+                for size, content in thumbnails.items()
+            )
+        )
+    else:
+        for size, content in thumbnails.items():
+            (AVATARS_DIR / names[size]).write_bytes(content)
+    return list(names.values())
+
+
 def _extract_file_name_from_url(url: str, prefixes: list[str]) -> Optional[str]:
     for prefix in prefixes:
         if url.startswith(prefix):
@@ -620,14 +888,89 @@ def _extract_file_name_from_url(url: str, prefixes: list[str]) -> Optional[str]:
     return None
 
 
-def _serve_local_or_object(path: Path, object_key: str) -> Response:
+def _local_file_not_modified(request: Request, response: FileResponse) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = response.headers.get("etag", "")
+        return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+    if_modified_since = request.headers.get("if-modified-since")
+    last_modified = response.headers.get("last-modified")
+    if if_modified_since and last_modified:
+        try:
+            return parsedate_to_datetime(last_modified) <= parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _file_response(
+    request: Request,
+    path: Path,
+    media_type: Optional[str] = None,
+    headers: Optional[dict[str, str]] = None,
+) -> Response:
+    # FileResponse answers Range requests itself; conditional GETs are checked here.
+    response = FileResponse(path, stat_result=path.stat(), media_type=media_type, headers=headers)
+    if _local_file_not_modified(request, response):
+        return Response(
+            status_code=304,
+            headers={k: v for k, v in response.headers.items() if k in {"etag", "last-modified"}},
+        )
+    return response
+
+
+def _serve_stored_blob(stored: StoredFile, request: Request) -> Response:
+    # Content-addressed blobs have no extension, so the type comes from the registry.
+    return _serve_local_or_object(
+        UPLOADS_DIR / stored.storage_key,
+        stored.storage_key,
+        request,
+        media_type=stored.content_type,
+        size_hint=stored.size_bytes,
+    )
+
+
+def _serve_local_or_object(
+    path: Path,
+    object_key: str,
+    request: Request,
+    media_type: Optional[str] = None,
+    size_hint: Optional[int] = None,
+) -> Response:
     if path.exists() and path.is_file():
-        return FileResponse(path)
-    item = object_storage.get_bytes(object_key)
-    if not item:
+        return _file_response(request, path, media_type=media_type)
+    if settings.R2_PRESIGNED_DOWNLOADS and object_storage.enabled:
+        # Authorization already ran in the route; the bucket serves the bytes.
+        ttl = settings.R2_PRESIGNED_URL_TTL_SECONDS
+        return RedirectResponse(
+            object_storage.presigned_get_url(object_key, ttl),
+            status_code=307,
+            headers={"Cache-Control": f"private, max-age={max(0, ttl // 2)}"},
+        )
+    cached = object_storage.get_cached(object_key, size_hint)
+    if cached:
+        return _file_response(
+            request,
+            cached.path,
+            media_type=cached.content_type or "application/octet-stream",
+            headers={"ETag": cached.etag},
+        )
+    download = object_storage.open_download(
+        object_key,
+        byte_range=request.headers.get("range"),
+        if_none_match=request.headers.get("if-none-match"),
+        if_modified_since=request.headers.get("if-modified-since"),
+    )
+    if not download:
         raise HTTPException(status_code=404, detail="File not found")
-    content, content_type = item
-    return Response(content=content, media_type=content_type or "application/octet-stream")
+    if download.body is None:
+        return Response(status_code=download.status_code, headers=download.headers)
+    return StreamingResponse(
+        download.body,
+        status_code=download.status_code,
+        media_type=download.content_type or "application/octet-stream",
+        headers=download.headers,
+    )
 
 
 def _is_admin_user(db: Session, user_id: Optional[int]) -> bool:
@@ -1948,7 +2291,9 @@ def _reimbursement_period_from_due_date(due_date: date) -> tuple[date, date]:
     raise ValueError("Not a reimbursement due date")
 
 
+@lru_cache(maxsize=1024)
 def _reimbursement_period_for(d: date) -> tuple[date, date]:
+    # A pure function of the date, asked for several times per period listed.
     due_date = _reimbursement_due_date_for(d)
     return _reimbursement_period_from_due_date(due_date)
 
@@ -2172,13 +2517,12 @@ async def _upload_profile_document(
     if file.content_type and file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Unsupported document content type")
 
-    content = await file.read()
-    if len(content) > settings.PROFILE_DOC_MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"Document must be <= {settings.PROFILE_DOC_MAX_BYTES // (1024 * 1024)}MB")
-    object_storage.upload_bytes(_document_key(filename), content, file.content_type)
-    if not object_storage.enabled:
-        destination = DOCUMENTS_DIR / filename
-        destination.write_bytes(content)
+    upload = await store_content_addressed_upload(
+        file,
+        UPLOADS_DIR,
+        settings.PROFILE_DOC_MAX_BYTES,
+        f"Document must be <= {settings.PROFILE_DOC_MAX_BYTES // (1024 * 1024)}MB",
+    )
 
     base_url = str(request.base_url).rstrip("/")
     new_url = f"{base_url}/files/documents/{filename}"
@@ -2191,14 +2535,28 @@ async def _upload_profile_document(
         "/uploads/documents/",
         "/files/documents/",
     ]
+    register_stored_file(
+        db,
+        FILE_KIND_PROFILE_DOCUMENT,
+        filename,
+        FILE_ACL_OWNER,
+        owner_user_id=user.id,
+        upload=upload,
+        content_type=file.content_type,
+    )
     old_name = _extract_file_name_from_url(old_url, old_prefixes)
+    orphaned_blob = None
     if old_name:
-        object_storage.delete_object(_document_key(old_name))
+        orphaned_blob = forget_stored_file(db, FILE_KIND_PROFILE_DOCUMENT, old_name)
         old_file = DOCUMENTS_DIR / old_name
         if old_file.exists() and old_file.is_file():
             old_file.unlink()
 
     db.commit()
+    if old_name:
+        object_storage.delete_later(_document_key(old_name))
+    delete_orphaned_blob(orphaned_blob, UPLOADS_DIR)
+    invalidate_cached_user(user.id)
     db.refresh(user)
     return user
 
@@ -2206,17 +2564,7 @@ async def _upload_profile_document(
 # -------------------------
 # Admin bootstrap
 # -------------------------
-@app.post("/admin/create-first-admin", response_model=UserOut)
-def create_first_admin(
-    payload: FirstAdminCreate,
-    db: Session = Depends(get_db),
-    bootstrap_token: Optional[str] = Header(default=None, alias="X-Bootstrap-Token"),
-):
-    if not settings.ALLOW_CREATE_FIRST_ADMIN:
-        raise HTTPException(status_code=403, detail="First-admin bootstrap is disabled")
-    if settings.FIRST_ADMIN_BOOTSTRAP_TOKEN and bootstrap_token != settings.FIRST_ADMIN_BOOTSTRAP_TOKEN:
-        raise HTTPException(status_code=403, detail="Invalid bootstrap token")
-
+def _validate_first_admin(db: Session, payload: FirstAdminCreate) -> str:
     existing_admin = db.query(User).filter(User.role == "admin").first()
     if existing_admin:
         raise HTTPException(status_code=400, detail="Admin already exists")
@@ -2228,38 +2576,71 @@ def create_first_admin(
         raise HTTPException(status_code=400, detail="Name is required")
     if len(payload.password or "") < 12:
         raise HTTPException(status_code=400, detail="Password must be at least 12 characters")
+    db.close()
+    return admin_name
+
+
+@app.post("/admin/create-first-admin", response_model=UserOut)
+async def create_first_admin(
+    payload: FirstAdminCreate,
+    db: Session = Depends(get_db),
+    bootstrap_token: Optional[str] = Header(default=None, alias="X-Bootstrap-Token"),
+):
+    if not settings.ALLOW_CREATE_FIRST_ADMIN:
+        raise HTTPException(status_code=403, detail="First-admin bootstrap is disabled")
+    if settings.FIRST_ADMIN_BOOTSTRAP_TOKEN and bootstrap_token != settings.FIRST_ADMIN_BOOTSTRAP_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid bootstrap token")
 
+    admin_name = await run_in_threadpool(_validate_first_admin, db, payload)
     admin = User(
         name=admin_name,
         email=payload.email.lower(),
-        password_hash=hash_password(payload.password),
+        password_hash=await _hash_password_or_503(payload.password),
         role="admin",
         hire_date=date.today(),
     )
-    db.add(admin)
-    db.commit()
-    db.refresh(admin)
-    return admin
+    return await run_in_threadpool(_save_new_user, db, admin)
 
 
 # -------------------------
 # Auth
 # -------------------------
+def _login_user_or_401(db: Session, email: str, request: Request) -> User:
+    _enforce_login_throttle(email, request)
+    user = db.query(User).filter(User.email == email).first()
+    if not user:
+        _record_login_failure(email, request)
+        raise HTTPException(status_code=401, detail="Wrong email or password")
+    db.close()
+    return user
+
+
+def _finish_login(
+    db: Session, user: User, email: str, request: Request, valid: bool, upgraded_hash: Optional[str]
+) -> None:
+    if not valid:
+        _record_login_failure(email, request)
+        raise HTTPException(status_code=401, detail="Wrong email or password")
+
+    if upgraded_hash:
+        # Stored hash used an older bcrypt cost factor; upgrade it in place.
+        _store_password_hash(db, user, upgraded_hash)
+
+    _clear_login_throttle(email, request)
+
+
 @app.post("/auth/login", response_model=TokenResponse)
-def login(
+async def login(
     request: Request,
     response: Response,
     form_data: OAuth2PasswordRequestForm = Depends(),
     db: Session = Depends(get_db),
 ):
     email = (form_data.username or "").strip().lower()
-    _enforce_login_throttle(email, request)
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(form_data.password, user.password_hash):
-        _record_login_failure(email, request)
-        raise HTTPException(status_code=401, detail="Wrong email or password")
+    user = await run_in_threadpool(_login_user_or_401, db, email, request)
+    valid, upgraded_hash = await _verify_password_or_503(form_data.password, user.password_hash)
+    await run_in_threadpool(_finish_login, db, user, email, request, valid, upgraded_hash)
 
-    _clear_login_throttle(email, request)
     csrf_token = secrets.token_urlsafe(24)
     token = create_access_token(subject=user.email, csrf_token=csrf_token)
     _set_auth_cookie(response, token)
@@ -2337,16 +2718,7 @@ def forgot_password(payload: ForgotPasswordIn, db: Session = Depends(get_db)):
     return generic
 
 
-@app.post("/auth/reset-password", response_model=MessageOut)
-def reset_password(payload: ResetPasswordIn, db: Session = Depends(get_db)):
-    token = (payload.token or "").strip()
-    new_password = payload.new_password or ""
-    if not token:
-        raise HTTPException(status_code=400, detail="Reset token is required")
-    if len(new_password) < 12:
-        raise HTTPException(status_code=400, detail="Password must be at least 12 characters")
-
-    now = datetime.utcnow()
+def _find_password_reset(db: Session, token: str, now: datetime) -> tuple[PasswordResetToken, User]:
     token_hash = _password_reset_token_hash(token)
     row = (
         db.query(PasswordResetToken)
@@ -2363,8 +2735,14 @@ def reset_password(payload: ResetPasswordIn, db: Session = Depends(get_db)):
     user = db.query(User).filter(User.id == row.user_id).first()
     if not user:
         raise HTTPException(status_code=400, detail="Invalid reset token")
+    db.close()
+    return row, user
+
 
-    user.password_hash = hash_password(new_password)
+def _complete_password_reset(
+    db: Session, row: PasswordResetToken, user: User, password_hash: str, now: datetime
+) -> None:
+    user.password_hash = password_hash
     row.used_at = now
 
     # Invalidate any other active tokens for this user.
@@ -2381,6 +2759,22 @@ def reset_password(payload: ResetPasswordIn, db: Session = Depends(get_db)):
     db.add(user)
     db.add(row)
     db.commit()
+    invalidate_cached_user(user.id)
+
+
+@app.post("/auth/reset-password", response_model=MessageOut)
+async def reset_password(payload: ResetPasswordIn, db: Session = Depends(get_db)):
+    token = (payload.token or "").strip()
+    new_password = payload.new_password or ""
+    if not token:
+        raise HTTPException(status_code=400, detail="Reset token is required")
+    if len(new_password) < 12:
+        raise HTTPException(status_code=400, detail="Password must be at least 12 characters")
+
+    now = datetime.utcnow()
+    row, user = await run_in_threadpool(_find_password_reset, db, token, now)
+    password_hash = await _hash_password_or_503(new_password)
+    await run_in_threadpool(_complete_password_reset, db, row, user, password_hash, now)
 
     return MessageOut(message="Password has been reset successfully.")
 
@@ -2423,6 +2817,10 @@ def update_my_theme(
         db.add(current)
 
     db.commit()
+    if apply_to_all:
+        clear_cached_users()
+    else:
+        invalidate_cached_user(current.id)
     db.refresh(current)
     _attach_user_supervisor_metadata(db, current)
     _attach_user_payroll_metadata(db, current)
@@ -2563,12 +2961,7 @@ def list_users(db: Session = Depends(get_db), _: User = Depends(require_admin)):
     return rows
 
 
-@app.post("/users", response_model=UserOut)
-def create_user(
-    payload: UserCreate,
-    db: Session = Depends(get_db),
-    _: User = Depends(require_admin),
-):
+def _validate_new_user(db: Session, payload: UserCreate) -> tuple[str, Optional[str], Optional[str]]:
     if db.query(User).filter(User.email == payload.email).first():
         raise HTTPException(status_code=400, detail="Email already exists")
     if not _is_valid_role(payload.role):
@@ -2577,11 +2970,30 @@ def create_user(
 
     validated_department = _validate_department_exists(db, payload.department)
     validated_designation = _validate_designation_exists_for_department(db, validated_department, payload.designation)
+    db.close()
+    return employment_type, validated_department, validated_designation
+
+
+def _save_created_user(db: Session, user: User) -> User:
+    _save_new_user(db, user)
+    _attach_user_supervisor_metadata(db, user)
+    return user
+
+
+@app.post("/users", response_model=UserOut)
+async def create_user(
+    payload: UserCreate,
+    db: Session = Depends(get_db),
+    _: User = Depends(require_admin),
+):
+    employment_type, validated_department, validated_designation = await run_in_threadpool(
+        _validate_new_user, db, payload
+    )
 
     u = User(
         name=payload.name,
         email=payload.email,
-        password_hash=hash_password(payload.password),
+        password_hash=await _hash_password_or_503(payload.password),
         role=payload.role.lower(),
         employment_type=employment_type,
         avatar_url=payload.avatar_url,
@@ -2592,12 +3004,7 @@ def create_user(
         address=payload.address,
         hire_date=payload.hire_date or date.today(),
     )
-
-    db.add(u)
-    db.commit()
-    db.refresh(u)
-    _attach_user_supervisor_metadata(db, u)
-    return u
+    return await run_in_threadpool(_save_created_user, db, u)
 
 
 # -------------------------
@@ -2661,6 +3068,7 @@ def update_user_profile(
         setattr(u, k, v)
 
     db.commit()
+    invalidate_cached_user(u.id)
     db.refresh(u)
     _attach_user_supervisor_metadata(db, u)
     return u
@@ -2718,26 +3126,50 @@ def delete_user(
             detail="Cannot delete user: " + "; ".join(blockers),
         )
 
+    deleted_user_id = u.id
+    # Profile documents and avatars go with the user, as their URL columns do.
+    owned_files = db.query(StoredFile.kind, StoredFile.file_name).filter(
+        StoredFile.owner_user_id == u.id,
+        StoredFile.kind.in_([FILE_KIND_PROFILE_DOCUMENT, FILE_KIND_AVATAR]),
+    ).all()
+    orphaned_blobs = [forget_stored_file(db, kind, name) for kind, name in owned_files]
+    db.query(StoredFile).filter(StoredFile.owner_user_id == u.id).update(
+        {StoredFile.owner_user_id: None}, synchronize_session=False
+    )
     db.delete(u)
     db.commit()
+    owned_paths = {FILE_KIND_PROFILE_DOCUMENT: (DOCUMENTS_DIR, _document_key), FILE_KIND_AVATAR: (AVATARS_DIR, _avatar_key)}
+    for kind, name in owned_files:
+        local_dir, object_key = owned_paths[kind]
+        (local_dir / name).unlink(missing_ok=True)
+        object_storage.delete_later(object_key(name))
+    for storage_key in orphaned_blobs:
+        delete_orphaned_blob(storage_key, UPLOADS_DIR)
+    invalidate_cached_user(deleted_user_id)
     return {"ok": True}
 
 
+def _user_or_404(db: Session, user_id: int) -> User:
+    u = db.query(User).filter(User.id == user_id).first()
+    if not u:
+        raise HTTPException(status_code=404, detail="User not found")
+    db.close()
+    return u
+
+
 @app.post("/admin/users/{user_id}/reset-password", response_model=MessageOut)
-def admin_reset_user_password(
+async def admin_reset_user_password(
     user_id: int,
     payload: AdminResetUserPasswordIn,
     db: Session = Depends(get_db),
     current: User = Depends(require_admin),
 ):
-    u = db.query(User).filter(User.id == user_id).first()
-    if not u:
-        raise HTTPException(status_code=404, detail="User not found")
+    u = await run_in_threadpool(_user_or_404, db, user_id)
     new_password = (payload.new_password or "").strip()
     if len(new_password) < 12:
         raise HTTPException(status_code=400, detail="Password must be at least 12 characters")
-    u.password_hash = hash_password(new_password)
-    db.commit()
+    password_hash = await _hash_password_or_503(new_password)
+    await run_in_threadpool(_store_password_hash, db, u, password_hash)
     actor = f"user_id={current.id}, role={current.role}"
     logger.info("Admin password reset executed by %s for target_user_id=%s", actor, u.id)
     return MessageOut(message="Password reset successfully.")
@@ -2759,14 +3191,15 @@ async def upload_my_avatar(
 
     filename = f"{uuid4().hex}{ext}"
 
-    content = await file.read()
-    if len(content) > settings.AVATAR_MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"Image must be <= {settings.AVATAR_MAX_BYTES // (1024 * 1024)}MB")
-
-    object_storage.upload_bytes(_avatar_key(filename), content, file.content_type)
-    if not object_storage.enabled:
-        destination = AVATARS_DIR / filename
-        destination.write_bytes(content)
+    upload = await store_upload(
+        file,
+        _avatar_key(filename),
+        AVATARS_DIR / filename,
+        settings.AVATAR_MAX_BYTES,
+        f"Image must be <= {settings.AVATAR_MAX_BYTES // (1024 * 1024)}MB",
+    )
+    await file.seek(0)
+    thumbnail_names = await _store_avatar_thumbnails(filename, file.file)
 
     old_avatar = current.avatar_url or ""
     base_url = str(request.base_url).rstrip("/")
@@ -2778,14 +3211,38 @@ async def upload_my_avatar(
         "/uploads/avatars/",
         "/avatars/",
     ]
+    register_stored_file(
+        db,
+        FILE_KIND_AVATAR,
+        filename,
+        FILE_ACL_PUBLIC,
+        owner_user_id=current.id,
+        upload=upload,
+        content_type=file.content_type,
+    )
+    for thumbnail_name in thumbnail_names:
+        register_stored_file(
+            db,
+            FILE_KIND_AVATAR,
+            thumbnail_name,
+            FILE_ACL_PUBLIC,
+            owner_user_id=current.id,
+            content_type=AVATAR_THUMBNAIL_CONTENT_TYPE,
+        )
     old_name = _extract_file_name_from_url(old_avatar, old_prefixes)
+    old_names: list[str] = []
     if old_name:
-        object_storage.delete_object(_avatar_key(old_name))
-        old_file = AVATARS_DIR / old_name
-        if old_file.exists() and old_file.is_file():
-            old_file.unlink()
+        old_names = [old_name] + [avatar_thumbnail_name(old_name, size) for size in AVATAR_THUMBNAIL_SIZES]
+        for name in old_names:
+            forget_stored_file(db, FILE_KIND_AVATAR, name)
+            old_file = AVATARS_DIR / name
+            if old_file.exists() and old_file.is_file():
+                old_file.unlink()
 
     db.commit()
+    for name in old_names:
+        object_storage.delete_later(_avatar_key(name))
+    invalidate_cached_user(current.id)
     db.refresh(current)
     return current
 
@@ -2909,6 +3366,7 @@ def admin_update_user_profile(
         setattr(u, k, v)
 
     db.commit()
+    invalidate_cached_user(u.id)
     db.refresh(u)
     _attach_user_supervisor_metadata(db, u)
     return u
@@ -3159,13 +3617,12 @@ async def upload_company_document(
     if file.content_type and file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Unsupported library document content type")
 
-    content = await file.read()
-    if len(content) > settings.LIBRARY_DOC_MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"Document must be <= {settings.LIBRARY_DOC_MAX_BYTES // (1024 * 1024)}MB")
-    object_storage.upload_bytes(_library_key(filename), content, file.content_type)
-    if not object_storage.enabled:
-        destination = LIBRARY_DIR / filename
-        destination.write_bytes(content)
+    upload = await store_content_addressed_upload(
+        file,
+        UPLOADS_DIR,
+        settings.LIBRARY_DOC_MAX_BYTES,
+        f"Document must be <= {settings.LIBRARY_DOC_MAX_BYTES // (1024 * 1024)}MB",
+    )
 
     url = f"{str(request.base_url).rstrip('/')}/files/library/{filename}"
     doc = CompanyDocument(
@@ -3176,6 +3633,15 @@ async def upload_company_document(
         uploaded_by_id=admin.id,
     )
     db.add(doc)
+    register_stored_file(
+        db,
+        FILE_KIND_LIBRARY,
+        filename,
+        FILE_ACL_AUTHENTICATED,
+        owner_user_id=admin.id,
+        upload=upload,
+        content_type=file.content_type,
+    )
     db.commit()
     db.refresh(doc)
     _ = doc.uploaded_by
@@ -3224,14 +3690,18 @@ def delete_company_document(
         if prefix in doc.file_url:
             file_name = doc.file_url.split(prefix, 1)[1]
             break
+    orphaned_blob = None
     if file_name:
-        object_storage.delete_object(_library_key(file_name))
+        orphaned_blob = forget_stored_file(db, FILE_KIND_LIBRARY, file_name)
         file_path = LIBRARY_DIR / file_name
         if file_path.exists() and file_path.is_file():
             file_path.unlink()
 
     db.delete(doc)
     db.commit()
+    if file_name:
+        object_storage.delete_later(_library_key(file_name))
+    delete_orphaned_blob(orphaned_blob, UPLOADS_DIR)
     return {"ok": True}
 
 
@@ -4348,67 +4818,56 @@ def get_cash_reimbursement_draft(
         .first()
     )
 
-    used_event_ids = {
-        int(x[0]) for x in db.query(CashReimbursementItem.source_event_id)
-        .filter(CashReimbursementItem.source_event_id.isnot(None))
-        .all()
-    }
-    rows = (
-        db.query(Event)
+    # Client visits in the period that no reimbursement item (anyone's) has
+    # claimed yet, with their client, in one anti-join on the unique
+    # source_event_id index.
+    already_claimed = exists().where(CashReimbursementItem.source_event_id == Event.id)
+    visits = (
+        db.query(
+            Event.id,
+            Event.start_ts,
+            Event.client_id,
+            Event.one_time_client_name,
+            ClientAccount.name.label("client_name"),
+            ClientAccount.reimbursement_amount,
+        )
+        .outerjoin(ClientAccount, ClientAccount.id == Event.client_id)
         .filter(
             Event.user_id == current.id,
             Event.type == "Client Visit",
-            Event.client_id.isnot(None),
+            or_(Event.client_id.isnot(None), Event.one_time_client_name.isnot(None)),
             Event.start_ts >= datetime.combine(period_start, datetime.min.time()),
             Event.start_ts < datetime.combine(period_end + timedelta(days=1), datetime.min.time()),
+            ~already_claimed,
         )
         .order_by(Event.start_ts.asc(), Event.id.asc())
         .all()
     )
 
     items: list[CashReimbursementDraftItemOut] = []
-    for e in rows:
-        if e.id in used_event_ids:
-            continue
-        client = db.query(ClientAccount).filter(ClientAccount.id == e.client_id).first()
-        if not client:
-            continue
-        amount = float(client.reimbursement_amount or 0)
-        items.append(
-            CashReimbursementDraftItemOut(
-                item_date=e.start_ts.date(),
-                description=f"Client visit to and from {client.name}",
-                amount=amount,
-                client_id=e.client_id,
-                source_event_id=e.id,
-                auto_filled=True,
-            )
-        )
-
     manual_items = _parse_manual_reimbursement_items(saved_draft.manual_items_json) if saved_draft else []
     existing_manual_source_ids = {int(x.source_event_id) for x in manual_items if x.source_event_id is not None}
-    one_time_rows = (
-        db.query(Event)
-        .filter(
-            Event.user_id == current.id,
-            Event.type == "Client Visit",
-            Event.client_id.is_(None),
-            Event.one_time_client_name.isnot(None),
-            Event.start_ts >= datetime.combine(period_start, datetime.min.time()),
-            Event.start_ts < datetime.combine(period_end + timedelta(days=1), datetime.min.time()),
-        )
-        .order_by(Event.start_ts.asc(), Event.id.asc())
-        .all()
-    )
-    for e in one_time_rows:
-        if e.id in used_event_ids or e.id in existing_manual_source_ids:
-            continue
-        manual_items.append(CashReimbursementDraftManualItemOut(
-            item_date=e.start_ts.date(),
-            description=f"Client visit to and from {e.one_time_client_name}",
-            amount=None,
-            source_event_id=e.id,
-        ))
+    for e in visits:
+        if e.client_id is not None:
+            if e.client_name is None:
+                continue
+            items.append(
+                CashReimbursementDraftItemOut(
+                    item_date=e.start_ts.date(),
+                    description=f"Client visit to and from {e.client_name}",
+                    amount=float(e.reimbursement_amount or 0),
+                    client_id=e.client_id,
+                    source_event_id=e.id,
+                    auto_filled=True,
+                )
+            )
+        elif e.id not in existing_manual_source_ids:
+            manual_items.append(CashReimbursementDraftManualItemOut(
+                item_date=e.start_ts.date(),
+                description=f"Client visit to and from {e.one_time_client_name}",
+                amount=None,
+                source_event_id=e.id,
+            ))
 
     return CashReimbursementDraftOut(
         period_start=period_start,
@@ -4442,9 +4901,20 @@ def list_cash_reimbursement_periods(
         .filter(CashReimbursementDraft.user_id == current.id)
         .all()
     )
+    # One row per submission with its item count, instead of loading every
+    # request and its items collection.
     request_rows = (
-        db.query(CashReimbursementRequest)
+        db.query(
+            CashReimbursementRequest.period_start,
+            CashReimbursementRequest.period_end,
+            CashReimbursementRequest.status,
+            CashReimbursementRequest.is_late_submission,
+            func.count(CashReimbursementItem.id).label("item_count"),
+        )
+        .outerjoin(CashReimbursementItem, CashReimbursementItem.request_id == CashReimbursementRequest.id)
         .filter(CashReimbursementRequest.user_id == current.id)
+        .group_by(CashReimbursementRequest.id)
+        .order_by(CashReimbursementRequest.id.asc())
         .all()
     )
     request_by_period = {
@@ -4461,7 +4931,7 @@ def list_cash_reimbursement_periods(
     for p_start, p_end in sorted(periods, key=lambda x: (x[0], x[1]), reverse=True):
         req = request_by_period.get((p_start, p_end))
         has_submission = req is not None
-        submission_item_count = len(req.items) if req else 0
+        submission_item_count = int(req.item_count) if req else 0
         can_submit = _reimbursement_can_submit(today, p_start, p_end, has_submission)
         out.append(
             CashReimbursementPeriodOut(
@@ -4604,6 +5074,27 @@ def _reimbursement_refresh_status(req: CashReimbursementRequest) -> None:
         req.status = "rejected"
 
 
+def _reimbursement_refreshed_status_columns():
+    """``_reimbursement_refresh_status`` as SQL: ``(status, total_amount)`` for an UPDATE."""
+    item = CashReimbursementItem
+    review_status = func.lower(func.trim(func.coalesce(item.review_status, "")))
+    of_request = item.request_id == CashReimbursementRequest.id
+
+    def scalar(expression):
+        return select(expression).where(of_request).scalar_subquery()
+
+    item_count = scalar(func.count(item.id))
+    pending_count = scalar(func.coalesce(func.sum(case((review_status == "pending", 1), else_=0)), 0))
+    approved_total = scalar(func.coalesce(func.sum(case((review_status == "approved", item.amount), else_=0)), 0))
+    status = case(
+        (item_count == 0, "rejected"),
+        (pending_count > 0, "pending_approval"),
+        (approved_total > 0, "pending_reimbursement"),
+        else_="rejected",
+    )
+    return status, approved_total
+
+
 @app.get("/finance/reimbursements/my", response_model=List[CashReimbursementRequestOut])
 def list_my_cash_reimbursements(
     db: Session = Depends(get_db),
@@ -4661,52 +5152,51 @@ def list_approved_cash_reimbursements(
     return rows
 
 
+@app.get("/finance/inbox", response_model=FinanceInboxPageOut)
+def get_finance_inbox(
+    kind: Optional[str] = Query(default=None, description="Comma-separated workflows; all when omitted"),
+    sort: str = Query(default="age", description="age | amount"),
+    direction: Optional[str] = Query(default=None, description="asc | desc; oldest first by age, largest first by amount"),
+    limit: int = Query(default=50, ge=1, le=INBOX_MAX_LIMIT),
+    cursor: Optional[str] = Query(default=None),
+    user_id: Optional[int] = Query(default=None),
+    department: Optional[str] = Query(default=None),
+    min_amount: Optional[float] = Query(default=None, ge=0),
+    max_amount: Optional[float] = Query(default=None, ge=0),
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    if not _is_finance_reviewer(current.role):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    if direction not in {None, "asc", "desc"}:
+        raise HTTPException(status_code=400, detail="direction must be asc or desc")
+    descending = direction == "desc" if direction else sort == "amount"
+    kinds = [k.strip() for k in kind.split(",") if k.strip()] if kind else None
+    try:
+        rows, next_cursor = inbox_page(
+            db,
+            current.role,
+            kinds=kinds,
+            sort=sort,
+            descending=descending,
+            limit=limit,
+            cursor=cursor,
+            user_id=user_id,
+            department=(department or "").strip() or None,
+            min_amount=min_amount,
+            max_amount=max_amount,
+        )
+    except InboxQueryError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return FinanceInboxPageOut(items=[FinanceInboxItemOut(**row) for row in rows], next_cursor=next_cursor)
+
+
 @app.get("/finance/attention", response_model=FinanceAttentionOut)
 def get_finance_attention(
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    role = (current.role or "").strip().lower()
-    if role not in {"finance", "admin", "ceo"}:
-        return FinanceAttentionOut()
-
-    if role == "finance":
-        cash_reimbursement = db.query(CashReimbursementRequest.id).filter(
-            CashReimbursementRequest.status == "pending_approval",
-            CashReimbursementRequest.finance_decision.is_(None),
-        ).count()
-        cash_requisition = db.query(CashRequisitionRequest.id).filter(
-            CashRequisitionRequest.status == "pending_finance_review",
-        ).count()
-        authority_to_incur = db.query(AuthorityToIncurRequest.id).filter(
-            AuthorityToIncurRequest.status.in_(["pending_finance_review", "pending_parallel_approval"]),
-        ).count()
-        salary_advance = db.query(SalaryAdvanceRequest.id).filter(
-            SalaryAdvanceRequest.status.in_(["pending_finance_review", "pending_parallel_approval"]),
-        ).count()
-    else:
-        cash_reimbursement = db.query(CashReimbursementRequest.id).filter(
-            CashReimbursementRequest.status == "pending_approval",
-            CashReimbursementRequest.ceo_decision.is_(None),
-        ).count()
-        cash_requisition = db.query(CashRequisitionRequest.id).filter(
-            CashRequisitionRequest.status.in_(["pending_finance_review", "pending_ceo_approval"]),
-        ).count()
-        authority_to_incur = db.query(AuthorityToIncurRequest.id).filter(
-            AuthorityToIncurRequest.status.in_(["pending_ceo_approval", "pending_parallel_approval"]),
-        ).count()
-        salary_advance = db.query(SalaryAdvanceRequest.id).filter(
-            SalaryAdvanceRequest.status.in_(["pending_ceo_approval", "pending_parallel_approval"]),
-        ).count()
-
-    total = cash_reimbursement + cash_requisition + authority_to_incur + salary_advance
-    return FinanceAttentionOut(
-        cash_reimbursement=cash_reimbursement,
-        cash_requisition=cash_requisition,
-        authority_to_incur=authority_to_incur,
-        salary_advance=salary_advance,
-        total=total,
-    )
+    return finance_attention(db, current.role)
 
 
 @app.get("/payroll/attention", response_model=PayrollAttentionOut)
@@ -4714,12 +5204,7 @@ def get_payroll_attention(
     db: Session = Depends(get_db),
     current: User = Depends(get_current_user),
 ):
-    pending = db.query(PayrollRun.id).filter(
-        PayrollRun.status == "approved",
-        PayrollRun.employee_confirmed == False,
-        PayrollRun.employee_id == current.id,
-    ).count()
-    return PayrollAttentionOut(pending_confirmation=pending)
+    return payroll_attention(db, current.id)
 
 
 @app.get("/payroll/admin-attention", response_model=PayrollAdminAttentionOut)
@@ -4730,12 +5215,7 @@ def get_payroll_admin_attention(
     role = (current.role or "").strip().lower()
     if role not in {"finance", "admin", "ceo"}:
         return PayrollAdminAttentionOut(confirmed_pending_payment=0)
-
-    confirmed_pending = db.query(PayrollRun.id).filter(
-        PayrollRun.status == "approved",
-        PayrollRun.employee_confirmed == True,
-    ).count()
-    return PayrollAdminAttentionOut(confirmed_pending_payment=confirmed_pending)
+    return payroll_admin_attention(db)
 
 
 
@@ -4872,6 +5352,7 @@ def submit_cash_reimbursement(
     ).delete(synchronize_session=False)
 
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     _ = req.items
@@ -4923,10 +5404,97 @@ def reopen_pending_cash_reimbursement(
 
     db.delete(req)
     db.commit()
+    attention.mark(finance=True)
 
     return get_cash_reimbursement_draft(period_start=period_start, period_end=period_end, db=db, current=current)
 
 
+MAX_BULK_FINANCE_DECISIONS = 200
+
+
+def _bulk_decision_stage(current: User) -> str:
+    role = (current.role or "").strip().lower()
+    if role == "finance":
+        return "finance"
+    if role in {"admin", "ceo"}:
+        return "ceo"
+    raise HTTPException(status_code=403, detail="Not allowed")
+
+
+def _decide_finance_requests_in_bulk(
+    db: Session,
+    model,
+    payload: FinanceBulkDecisionIn,
+    current: User,
+    stage: str,
+    check,
+    status=None,
+    grant_requested_amount: bool = False,
+    comment_required_detail: str = "comment is required when rejecting",
+    extra_values: Optional[dict] = None,
+) -> FinanceBulkDecisionOut:
+    """Apply one decision to many requests of ``model`` in a single transaction.
+
+    The rows are loaded (and locked) in one query and each is validated by
+    ``check``, which returns the error the single-request endpoint would
+    raise, or None. The valid ones get the ``stage`` decision columns and
+    ``status`` (a value or SQL expression), plus any ``extra_values``, in
+    one UPDATE; the others are reported and left alone.
+    """
+    ids = list(dict.fromkeys(payload.ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="ids is required")
+    if len(ids) > MAX_BULK_FINANCE_DECISIONS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BULK_FINANCE_DECISIONS} requests can be decided at once")
+    decision = "approved" if payload.approve else "rejected"
+    comment = (payload.comment or "").strip()
+    if decision == "rejected" and not comment:
+        raise HTTPException(status_code=400, detail=comment_required_detail)
+
+    rows = {row.id: row for row in db.query(model).filter(model.id.in_(ids)).with_for_update().all()}
+    results: list[FinanceBulkDecisionItemOut] = []
+    eligible: list[int] = []
+    for request_id in ids:
+        row = rows.get(request_id)
+        error = "Request not found" if row is None else check(row)
+        results.append(FinanceBulkDecisionItemOut(id=request_id, ok=error is None, detail=error))
+        if error is None:
+            eligible.append(request_id)
+
+    if eligible:
+        now = datetime.utcnow()
+        values = {
+            f"{stage}_decision": decision,
+            f"{stage}_comment": comment or None,
+            f"{stage}_decided_at": now,
+        }
+        if hasattr(model, f"{stage}_decided_by_id"):
+            values[f"{stage}_decided_by_id"] = current.id
+        if hasattr(model, "updated_at"):
+            values["updated_at"] = now
+        if status is not None:
+            values["status"] = status
+        values.update(extra_values or {})
+        if grant_requested_amount and decision == "approved":
+            # As a single approval without approved_amount: the requested
+            # amount, unless an earlier approval granted less.
+            values["approved_amount"] = case(
+                (and_(model.approved_amount.isnot(None), model.approved_amount < model.amount), model.approved_amount),
+                else_=model.amount,
+            )
+        db.execute(
+            update(model).where(model.id.in_(eligible)).values(**values).execution_options(synchronize_session=False)
+        )
+    db.commit()
+    if eligible:
+        attention.mark(finance=True)
+        statuses = dict(db.query(model.id, model.status).filter(model.id.in_(eligible)).all())
+        for result in results:
+            if result.ok:
+                result.status = statuses.get(result.id)
+    return FinanceBulkDecisionOut(decided=len(eligible), results=results)
+
+
 @app.post("/finance/reimbursements/{request_id}/decision", response_model=CashReimbursementRequestOut)
 def decide_cash_reimbursement(
     request_id: int,
@@ -4963,12 +5531,42 @@ def decide_cash_reimbursement(
     _reimbursement_refresh_status(req)
 
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     _ = req.items
     return req
 
 
+@app.post("/finance/reimbursements/bulk-decision", response_model=FinanceBulkDecisionOut)
+def bulk_decide_cash_reimbursements(
+    payload: FinanceBulkDecisionIn,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    stage = _bulk_decision_stage(current)
+
+    def check(req: CashReimbursementRequest) -> Optional[str]:
+        if req.status in {"amount_reimbursed", "rejected"}:
+            return "Request already finalized"
+        if req.status == "pending_reimbursement":
+            return "Request is already approved and awaiting reimbursement"
+        return None
+
+    status, total_amount = _reimbursement_refreshed_status_columns()
+    return _decide_finance_requests_in_bulk(
+        db,
+        CashReimbursementRequest,
+        payload,
+        current,
+        stage,
+        check,
+        status=status,
+        comment_required_detail="Comment is required when denying",
+        extra_values={"total_amount": total_amount},
+    )
+
+
 @app.post("/finance/reimbursements/{request_id}/items/{item_id}/decision", response_model=CashReimbursementRequestOut)
 def decide_cash_reimbursement_item(
     request_id: int,
@@ -5005,6 +5603,7 @@ def decide_cash_reimbursement_item(
     item.reviewed_at = datetime.utcnow()
     _reimbursement_refresh_status(req)
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     _ = req.items
@@ -5033,6 +5632,7 @@ def mark_cash_reimbursement_paid(
     req.reimbursed_by_id = current.id
     req.reimbursed_at = datetime.utcnow()
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     _ = req.items
@@ -5077,6 +5677,7 @@ def submit_cash_requisition(
     )
     db.add(req)
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5187,11 +5788,38 @@ def decide_cash_requisition(
 
     req.updated_at = now
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
 
 
+@app.post("/finance/requisitions/bulk-decision", response_model=FinanceBulkDecisionOut)
+def bulk_decide_cash_requisitions(
+    payload: FinanceBulkDecisionIn,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    stage = _bulk_decision_stage(current)
+
+    def check(req: CashRequisitionRequest) -> Optional[str]:
+        if req.status in {"disbursed", "rejected"}:
+            return f"Request already {req.status}"
+        if stage == "finance" and req.status != "pending_finance_review":
+            return "Finance can only decide pending finance review requests"
+        if stage == "ceo" and req.status not in {"pending_finance_review", "pending_ceo_approval"}:
+            return "CEO/Admin can only decide pending requisition approvals"
+        return None
+
+    if not payload.approve:
+        status = "rejected"
+    else:
+        status = "pending_ceo_approval" if stage == "finance" else "pending_disbursement"
+    return _decide_finance_requests_in_bulk(
+        db, CashRequisitionRequest, payload, current, stage, check, status=status, grant_requested_amount=True
+    )
+
+
 @app.post("/finance/requisitions/{request_id}/disburse", response_model=CashRequisitionRequestOut)
 def mark_cash_requisition_disbursed(
     request_id: int,
@@ -5221,6 +5849,7 @@ def mark_cash_requisition_disbursed(
     req.disbursed_by_id = current.id
     req.updated_at = datetime.utcnow()
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5268,6 +5897,7 @@ def submit_authority_to_incur_request(
     )
     db.add(req)
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5387,11 +6017,42 @@ def decide_authority_to_incur_request(
 
     req.updated_at = now
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
 
 
+@app.post("/finance/authority-to-incur/bulk-decision", response_model=FinanceBulkDecisionOut)
+def bulk_decide_authority_to_incur_requests(
+    payload: FinanceBulkDecisionIn,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    stage = _bulk_decision_stage(current)
+
+    def check(req: AuthorityToIncurRequest) -> Optional[str]:
+        if req.status in {"incurred", "rejected"}:
+            return f"Request already {req.status}"
+        if req.status not in {"pending_parallel_approval", "pending_ceo_approval", "pending_finance_review"}:
+            return "Finance can only decide pending approval requests" if stage == "finance" else "CEO/Admin can only decide pending approval requests"
+        if stage == "finance" and req.finance_decision:
+            return "Finance has already made a decision on this request"
+        if stage == "ceo" and req.ceo_decision:
+            return "CEO has already made a decision on this request"
+        return None
+
+    if not payload.approve:
+        status = "rejected"
+    elif stage == "finance":
+        status = case((AuthorityToIncurRequest.ceo_decision == "approved", "pending_incurrence"), else_="pending_ceo_approval")
+    else:
+        status = "pending_incurrence"
+    return _decide_finance_requests_in_bulk(
+        db, AuthorityToIncurRequest, payload, current, stage, check, status=status, grant_requested_amount=True
+    )
+
+
 @app.post("/finance/authority-to-incur/{request_id}/incur", response_model=AuthorityToIncurRequestOut)
 def mark_authority_to_incur_incurred(
     request_id: int,
@@ -5421,6 +6082,7 @@ def mark_authority_to_incur_incurred(
     req.incurred_by_id = current.id
     req.updated_at = datetime.utcnow()
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5468,6 +6130,7 @@ def submit_salary_advance_request(
     )
     db.add(req)
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5587,11 +6250,42 @@ def decide_salary_advance_request(
 
     req.updated_at = now
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
 
 
+@app.post("/finance/salary-advances/bulk-decision", response_model=FinanceBulkDecisionOut)
+def bulk_decide_salary_advance_requests(
+    payload: FinanceBulkDecisionIn,
+    db: Session = Depends(get_db),
+    current: User = Depends(get_current_user),
+):
+    stage = _bulk_decision_stage(current)
+
+    def check(req: SalaryAdvanceRequest) -> Optional[str]:
+        if req.status in {"disbursed", "rejected"}:
+            return f"Request already {req.status}"
+        if req.status not in {"pending_parallel_approval", "pending_ceo_approval", "pending_finance_review"}:
+            return "Finance can only decide pending approval requests" if stage == "finance" else "CEO/Admin can only decide pending approval requests"
+        if stage == "finance" and req.finance_decision:
+            return "Finance has already made a decision on this request"
+        if stage == "ceo" and req.ceo_decision:
+            return "CEO has already made a decision on this request"
+        return None
+
+    if not payload.approve:
+        status = "rejected"
+    elif stage == "finance":
+        status = case((SalaryAdvanceRequest.ceo_decision == "approved", "pending_disbursement"), else_="pending_ceo_approval")
+    else:
+        status = "pending_disbursement"
+    return _decide_finance_requests_in_bulk(
+        db, SalaryAdvanceRequest, payload, current, stage, check, status=status, grant_requested_amount=True
+    )
+
+
 @app.post("/finance/salary-advances/{request_id}/disburse", response_model=SalaryAdvanceRequestOut)
 def mark_salary_advance_disbursed(
     request_id: int,
@@ -5623,6 +6317,7 @@ def mark_salary_advance_disbursed(
     req.disbursed_by_id = current.id
     req.updated_at = datetime.utcnow()
     db.commit()
+    attention.mark(finance=True)
     db.refresh(req)
     _ = req.user
     return req
@@ -5643,6 +6338,7 @@ def withdraw_salary_advance_request(
         raise HTTPException(status_code=400, detail="Cannot withdraw a request that has already been processed")
     db.delete(req)
     db.commit()
+    attention.mark(finance=True)
     return None
 
 
@@ -5991,6 +6687,7 @@ def save_payroll_run(
     row.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(row)
+    attention.mark(payroll_users=[row.employee_id])
     _ = row.employee
     return _serialize_payroll_run(db, row)
 
@@ -6080,6 +6777,7 @@ def bulk_submit_payroll_runs(
     for row in saved_rows:
         db.refresh(row)
         _ = row.employee
+    attention.mark(payroll_users=[row.employee_id for row in saved_rows])
 
     if skipped_names:
         detail = ", ".join(skipped_names[:8])
@@ -6145,6 +6843,7 @@ def confirm_payroll_run(
     row.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(row)
+    attention.mark(payroll_users=[row.employee_id])
     _ = row.employee
     return _serialize_payroll_run(db, row)
 
@@ -6169,6 +6868,7 @@ def unconfirm_payroll_run(
     row.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(row)
+    attention.mark(payroll_users=[row.employee_id])
     _ = row.employee
     return _serialize_payroll_run(db, row)
 
@@ -6195,6 +6895,7 @@ def mark_payroll_run_paid(
     row.updated_at = datetime.utcnow()
     db.commit()
     db.refresh(row)
+    attention.mark(payroll_users=[row.employee_id])
     _ = row.employee
     return _serialize_payroll_run(db, row)
 
@@ -7328,7 +8029,7 @@ async def create_leave_request(
     _ = e.user
     _attach_leave_review_metadata(db, e, user, user)
 
-    await broadcast_events_changed("created", e.id)
+    await broadcast_events_changed(db, "created", [e])
     return e
 
 
@@ -7440,7 +8141,7 @@ async def approve_leave_request(
     _ = e.user
     _attach_leave_review_metadata(db, e, approver, owner)
 
-    await broadcast_events_changed("updated", e.id)
+    await broadcast_events_changed(db, "updated", [e])
     return e
 
 
@@ -7501,7 +8202,7 @@ async def reject_leave_request(
     _ = e.user
     _attach_leave_review_metadata(db, e, approver, owner)
 
-    await broadcast_events_changed("updated", e.id)
+    await broadcast_events_changed(db, "updated", [e])
     return e
 
 
@@ -7650,13 +8351,21 @@ async def create_event(
         db.flush()
         _sync_client_visit_todos(db, e)
         created_events.append(e)
+    # Read before commit expires them, so a long series costs no reloads;
+    # clients refetch a series rather than receive every occurrence.
+    occurrences_created = [(x.id, x.start_ts, x.end_ts) for x in created_events]
     db.commit()
     e = created_events[0]
     db.refresh(e)
     _ = e.user
     _attach_leave_review_metadata(db, e, user, e.user)
 
-    await broadcast_events_changed("created", e.id)
+    if len(occurrences_created) == 1:
+        await broadcast_events_changed(db, "created", [e])
+    else:
+        topics = _event_topics(e)
+        for event_id, start_ts, end_ts in occurrences_created:
+            event_changes.add("created", event_id, start_ts, end_ts, topics)
     return e
 
 
@@ -7755,7 +8464,7 @@ async def update_event(
     _ = e.user
     _attach_leave_review_metadata(db, e, user, e.user)
 
-    await broadcast_events_changed("updated", e.id)
+    await broadcast_events_changed(db, "updated", [e])
     return e
 
 
@@ -7788,15 +8497,14 @@ async def upload_event_sick_note(
     if file.content_type and file.content_type not in allowed_types:
         raise HTTPException(status_code=400, detail="Unsupported sick note content type")
 
-    content = await file.read()
-    if len(content) > settings.PROFILE_DOC_MAX_BYTES:
-        raise HTTPException(status_code=400, detail=f"Sick note must be <= {settings.PROFILE_DOC_MAX_BYTES // (1024 * 1024)}MB")
-
     filename = f"sick_note_{e.id}_{uuid4().hex}{ext}"
-    object_storage.upload_bytes(_sick_note_key(filename), content, file.content_type)
-    if not object_storage.enabled:
-        destination = SICK_NOTES_DIR / filename
-        destination.write_bytes(content)
+    upload = await store_upload(
+        file,
+        _sick_note_key(filename),
+        SICK_NOTES_DIR / filename,
+        settings.PROFILE_DOC_MAX_BYTES,
+        f"Sick note must be <= {settings.PROFILE_DOC_MAX_BYTES // (1024 * 1024)}MB",
+    )
 
     base_url = str(request.base_url).rstrip("/")
     new_url = f"{base_url}/files/sick-notes/{filename}"
@@ -7810,18 +8518,29 @@ async def upload_event_sick_note(
         "/uploads/sick_notes/",
         "/files/sick-notes/",
     ]
+    register_stored_file(
+        db,
+        FILE_KIND_SICK_NOTE,
+        filename,
+        FILE_ACL_ADMIN,
+        owner_user_id=e.user_id,
+        upload=upload,
+        content_type=file.content_type,
+    )
     old_name = _extract_file_name_from_url(old_url, old_prefixes)
     if old_name:
-        object_storage.delete_object(_sick_note_key(old_name))
+        forget_stored_file(db, FILE_KIND_SICK_NOTE, old_name)
         old_file = SICK_NOTES_DIR / old_name
         if old_file.exists() and old_file.is_file():
             old_file.unlink()
 
     db.commit()
+    if old_name:
+        object_storage.delete_later(_sick_note_key(old_name))
     db.refresh(e)
     _ = e.user
     _attach_leave_review_metadata(db, e, current, e.user)
-    await broadcast_events_changed("updated", e.id)
+    await broadcast_events_changed(db, "updated", [e])
     return e
 
 
@@ -7851,14 +8570,9 @@ async def delete_event(
             detail="This event cannot be deleted because it is already attached to a submitted cash reimbursement.",
         )
 
-    old_sick_note_url = e.sick_note_url or ""
-    old_prefixes = [
-        "/uploads/sick_notes/",
-        "/files/sick-notes/",
-    ]
-    old_name = _extract_file_name_from_url(old_sick_note_url, old_prefixes)
+    old_name = file_name_from_url(e.sick_note_url, FILE_KIND_SICK_NOTE)
     if old_name:
-        object_storage.delete_object(_sick_note_key(old_name))
+        forget_stored_file(db, FILE_KIND_SICK_NOTE, old_name)
         old_file = SICK_NOTES_DIR / old_name
         if old_file.exists() and old_file.is_file():
             old_file.unlink()
@@ -7869,8 +8583,10 @@ async def delete_event(
     ).delete(synchronize_session=False)
     db.delete(e)
     db.commit()
+    if old_name:
+        object_storage.delete_later(_sick_note_key(old_name))
 
-    await broadcast_events_changed("deleted", event_id)
+    await broadcast_events_changed(db, "deleted", [e])
     return {"ok": True}
 
 
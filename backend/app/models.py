@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date, Numeric, UniqueConstraint
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Date, Numeric, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
 from datetime import datetime, date
 from .db import Base
@@ -284,6 +284,21 @@ class CashReimbursementRequest(Base):
     __tablename__ = "cash_reimbursement_requests"
     __table_args__ = (
         UniqueConstraint("user_id", "period_start", "period_end", name="uq_cash_reimbursements_user_period"),
+        # Partial indexes on the pending statuses keep the attention counts and inbox off the full tables.
+        Index(
+            "ix_cash_reimbursement_requests_pending",
+            "finance_decision",
+            "ceo_decision",
+            postgresql_where=text("status = 'pending_approval'"),
+            sqlite_where=text("status = 'pending_approval'"),
+        ),
+        Index(
+            "ix_cash_reimbursement_requests_pending_submitted",
+            "submitted_at",
+            "id",
+            postgresql_where=text("status = 'pending_approval'"),
+            sqlite_where=text("status = 'pending_approval'"),
+        ),
     )
 
     id = Column(Integer, primary_key=True)
@@ -351,6 +366,21 @@ class CashReimbursementDraft(Base):
 
 class CashRequisitionRequest(Base):
     __tablename__ = "cash_requisition_requests"
+    __table_args__ = (
+        Index(
+            "ix_cash_requisition_requests_pending",
+            "status",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval')"),
+        ),
+        Index(
+            "ix_cash_requisition_requests_pending_submitted",
+            "submitted_at",
+            "id",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -386,6 +416,21 @@ class CashRequisitionRequest(Base):
 
 class AuthorityToIncurRequest(Base):
     __tablename__ = "authority_to_incur_requests"
+    __table_args__ = (
+        Index(
+            "ix_authority_to_incur_requests_pending",
+            "status",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+        ),
+        Index(
+            "ix_authority_to_incur_requests_pending_submitted",
+            "submitted_at",
+            "id",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -422,6 +467,21 @@ class AuthorityToIncurRequest(Base):
 
 class SalaryAdvanceRequest(Base):
     __tablename__ = "salary_advance_requests"
+    __table_args__ = (
+        Index(
+            "ix_salary_advance_requests_pending",
+            "status",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+        ),
+        Index(
+            "ix_salary_advance_requests_pending_submitted",
+            "submitted_at",
+            "id",
+            postgresql_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+            sqlite_where=text("status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval')"),
+        ),
+    )
 
     id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
@@ -662,3 +722,41 @@ class PerformanceAppraisal(Base):
 
     employee = relationship("User", foreign_keys=[employee_id])
     supervisor_reviewed_by = relationship("User", foreign_keys=[supervisor_reviewed_by_id])
+
+
+class LoginThrottleEntry(Base):
+    __tablename__ = "login_throttle_entries"
+
+    key = Column(String(400), primary_key=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    window_expires_at = Column(DateTime, nullable=False, index=True)
+    blocked_until = Column(DateTime, nullable=True)
+
+
+class StoredFile(Base):
+    __tablename__ = "stored_files"
+    __table_args__ = (
+        UniqueConstraint("kind", "file_name", name="uq_stored_files_kind_file_name"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(30), nullable=False)  # profile_document | library | sick_note | avatar
+    file_name = Column(String(255), nullable=False, index=True)
+    owner_user_id = Column(Integer, ForeignKey("users.id"), nullable=True, index=True)
+    acl = Column(String(20), nullable=False, default="owner")  # public | authenticated | owner | admin
+    content_type = Column(String(120), nullable=True)
+    size_bytes = Column(Integer, nullable=True)
+    sha256 = Column(String(64), nullable=True)
+    # Set for content-addressed uploads (see StoredBlob); legacy files live under their own name.
+    storage_key = Column(String(300), nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class StoredBlob(Base):
+    __tablename__ = "stored_blobs"
+
+    sha256 = Column(String(64), primary_key=True)
+    storage_key = Column(String(300), nullable=False)
+    size_bytes = Column(Integer, nullable=False)
+    ref_count = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import tempfile
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+
+@dataclass
+class CachedObject:
+    key: str
+    etag: str
+    content_type: Optional[str]
+    size: int
+    path: Path
+    validated_at: float
+
+
+@dataclass
+class CacheFill:
+    """What a fill callback found at the origin.
+
+    ``not_modified`` means the cached ETag is still current. Otherwise
+    ``body`` is a readable stream of ``size`` bytes, or None when the
+    object is missing or (``too_large``) bigger than the cache takes.
+    """
+
+    not_modified: bool = False
+    too_large: bool = False
+    body: Optional[object] = None
+    etag: Optional[str] = None
+    content_type: Optional[str] = None
+    size: int = 0
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def remove_dead_worker_directories(root: Path) -> int:
+    """Delete per-process cache directories under ``root`` whose process is gone.
+
+    Each worker caches under ``root/<pid>``; without this every restart or
+    worker recycle would leave its copy behind. Returns how many were removed.
+    """
+    removed = 0
+    if not root.is_dir():
+        return removed
+    for child in root.iterdir():
+        if not child.is_dir() or not child.name.isdigit():
+            continue
+        pid = int(child.name)
+        if pid != os.getpid() and not _process_alive(pid):
+            shutil.rmtree(child, ignore_errors=True)
+            removed += 1
+    return removed
+
+
+class ObjectDiskCache:
+    """Bounded on-disk LRU of object bodies, keyed by object key and ETag.
+
+    Entries are trusted for ``fresh_seconds`` and then revalidated with a
+    conditional GET. Concurrent misses for one key share a single fill.
+    The index lives in memory, so the directory is emptied on start-up.
+
+    Files of evicted or replaced entries are unlinked only after
+    ``unlink_grace_seconds``, so a response that was handed a path just
+    before still finds the file when it opens it. Keys found too large to
+    cache are remembered for ``fresh_seconds`` so they are not fetched twice
+    per request.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        max_bytes: int,
+        fresh_seconds: int,
+        unlink_grace_seconds: float = 30.0,
+    ) -> None:
+        self.directory = Path(directory)
+        self.max_bytes = max(0, int(max_bytes))
+        self.max_entry_bytes = self.max_bytes // 4
+        self.fresh_seconds = max(0, int(fresh_seconds))
+        self.unlink_grace_seconds = max(0.0, float(unlink_grace_seconds))
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, CachedObject] = OrderedDict()
+        self._fills: dict[str, threading.Event] = {}
+        self._retired: deque[tuple[float, str, Path]] = deque()
+        self._too_large: dict[str, float] = {}
+        self._size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._size,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def contains(self, key: str) -> bool:
+        """Whether ``key`` has a cached copy, fresh or not; never fetches."""
+        with self._lock:
+            return key in self._entries
+
+    def get(self, key: str, fill: Callable[[Optional[str]], CacheFill]) -> Optional[CachedObject]:
+        """Return a fresh cached copy of ``key``, filling it through ``fill(etag)`` if needed."""
+        while True:
+            with self._lock:
+                if self._known_too_large_locked(key):
+                    return None
+                entry = self._entries.get(key)
+                if entry and time.monotonic() - entry.validated_at < self.fresh_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                waiter = self._fills.get(key)
+                if waiter is None:
+                    self._fills[key] = threading.Event()
+                    self.misses += 1
+                    break
+            # Another request is already filling this key; reuse its result.
+            waiter.wait()
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and time.monotonic() - entry.validated_at < self.fresh_seconds:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry
+                if key not in self._fills:
+                    return None
+
+        try:
+            return self._fill(key, entry, fill)
+        finally:
+            with self._lock:
+                self._fills.pop(key).set()
+
+    def _known_too_large_locked(self, key: str) -> bool:
+        marked_at = self._too_large.get(key)
+        if marked_at is None:
+            return False
+        if time.monotonic() - marked_at < self.fresh_seconds:
+            return True
+        del self._too_large[key]
+        return False
+
+    def _fill(
+        self,
+        key: str,
+        entry: Optional[CachedObject],
+        fill: Callable[[Optional[str]], CacheFill],
+    ) -> Optional[CachedObject]:
+        result = fill(entry.etag if entry else None)
+        if result.not_modified and entry is not None:
+            with self._lock:
+                entry.validated_at = time.monotonic()
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+            return entry
+        if result.body is None or not result.etag:
+            self._discard(key)
+            if result.too_large:
+                with self._lock:
+                    self._too_large[key] = time.monotonic()
+            return None
+
+        digest = hashlib.sha256(f"{key}\0{result.etag}".encode()).hexdigest()
+        path = self.directory / digest
+        handle, partial = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        try:
+            with os.fdopen(handle, "wb") as sink:
+                shutil.copyfileobj(result.body, sink, 64 * 1024)
+            os.replace(partial, path)
+        except BaseException:
+            Path(partial).unlink(missing_ok=True)
+            raise
+        finally:
+            close = getattr(result.body, "close", None)
+            if close:
+                close()
+
+        fresh = CachedObject(
+            key=key,
+            etag=result.etag,
+            content_type=result.content_type,
+            size=path.stat().st_size,
+            path=path,
+            validated_at=time.monotonic(),
+        )
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.size
+                if previous.path != path:
+                    self._retire_locked(key, previous.path)
+            self._entries[key] = fresh
+            self._size += fresh.size
+            self._evict_locked()
+        return fresh
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._size -= entry.size
+                self._retire_locked(key, entry.path)
+            self._reap_locked()
+
+    def _evict_locked(self) -> None:
+        while self._size > self.max_bytes and len(self._entries) > 1:
+            key, oldest = self._entries.popitem(last=False)
+            self._size -= oldest.size
+            self.evictions += 1
+            self._retire_locked(key, oldest.path)
+        self._reap_locked()
+
+    def _retire_locked(self, key: str, path: Path) -> None:
+        self._retired.append((time.monotonic(), key, path))
+
+    def _reap_locked(self) -> None:
+        now = time.monotonic()
+        while self._retired and now - self._retired[0][0] >= self.unlink_grace_seconds:
+            _, key, path = self._retired.popleft()
+            current = self._entries.get(key)
+            # The same key and ETag may have been cached again at the same path.
+            if current is None or current.path != path:
+                path.unlink(missing_ok=True)
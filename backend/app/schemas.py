@@ -924,6 +924,44 @@ class SalaryAdvanceRequestOut(BaseModel):
         from_attributes = True
 
 
+class FinanceBulkDecisionIn(BaseModel):
+    ids: List[int]
+    approve: bool
+    comment: Optional[str] = None
+
+
+class FinanceBulkDecisionItemOut(BaseModel):
+    id: int
+    ok: bool
+    status: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class FinanceBulkDecisionOut(BaseModel):
+    decided: int
+    results: List[FinanceBulkDecisionItemOut]
+
+
+class FinanceInboxItemOut(BaseModel):
+    kind: str  # cash_reimbursement | cash_requisition | authority_to_incur | salary_advance
+    id: int
+    user_id: int
+    user_name: str
+    user_department: Optional[str] = None
+    amount: float
+    status: str
+    summary: Optional[str] = None
+    submitted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class FinanceInboxPageOut(BaseModel):
+    items: List[FinanceInboxItemOut]
+    next_cursor: Optional[str] = None
+
+
 class PayrollProfileOut(BaseModel):
     id: int
     user_id: int
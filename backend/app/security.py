@@ -1,10 +1,85 @@
+from concurrent.futures import Future, ThreadPoolExecutor
 from passlib.context import CryptContext
 from jose import jwt
 from datetime import datetime, timedelta
-from typing import Optional
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+import asyncio
 from .config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+T = TypeVar("T")
+
+# Pinning min/max rounds to the configured cost makes passlib flag hashes made
+# with any other cost factor, so logins can rehash them transparently.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.PASSWORD_BCRYPT_ROUNDS,
+)
+
+
+class PasswordHashingBusyError(RuntimeError):
+    pass
+
+
+class PasswordHashPool:
+    def __init__(self, workers: int, max_pending: int) -> None:
+        self.workers = max(1, workers)
+        self.max_pending = max(self.workers, max_pending)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted_total = 0
+        self._completed_total = 0
+        self._rejected_total = 0
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def _on_done(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._completed_total += 1
+
+    def submit(self, fn: Callable[..., T], *args) -> "Future[T]":
+        with self._lock:
+            if self._in_flight >= self.max_pending:
+                self._rejected_total += 1
+                raise PasswordHashingBusyError("Sign-in is busy right now. Please try again in a moment.")
+            self._in_flight += 1
+            self._submitted_total += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            executor = self._get_executor()
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return future
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        return await asyncio.wrap_future(self.submit(fn, *args))
+
+    def stats(self) -> dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "peak_in_flight": self._peak_in_flight,
+                "submitted_total": self._submitted_total,
+                "completed_total": self._completed_total,
+                "rejected_total": self._rejected_total,
+            }
+
+
+password_hash_pool = PasswordHashPool(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+)
 
 def hash_password(password: str) -> str:
     return pwd_context.hash(password)
@@ -12,6 +87,9 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return pwd_context.verify(password, hashed)
 
+def verify_and_update_password(password: str, hashed: str) -> tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(password, hashed)
+
 def create_access_token(subject: str, csrf_token: Optional[str] = None) -> str:
     expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     payload = {"sub": subject, "exp": expire}
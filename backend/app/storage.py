@@ -1,20 +1,187 @@
 from __future__ import annotations
 
-from typing import Optional, Tuple
+import asyncio
+import heapq
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from email.utils import formatdate
+from pathlib import Path
+from contextlib import AbstractContextManager, nullcontext
+from typing import BinaryIO, Callable, Iterator, Optional, Tuple, TypeVar
 
 from .config import settings
+from .object_cache import CachedObject, CacheFill, ObjectDiskCache, remove_dead_worker_directories
 
 try:
     import boto3
+    from boto3.s3.transfer import TransferConfig
+    from botocore.config import Config as BotoConfig
 except Exception:  # pragma: no cover - optional dependency for local-only setups
     boto3 = None
+    TransferConfig = None
+    BotoConfig = None
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+DeleteGuard = Callable[[], AbstractContextManager[bool]]
+
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+# Uploads above this size go through S3 multipart so no single PUT holds the whole file.
+MULTIPART_THRESHOLD_BYTES = 8 * 1024 * 1024
+_SINGLE_BYTE_RANGE = re.compile(r"^bytes=(\d+-\d*|-\d+)$")
+
+
+@dataclass
+class ObjectDownload:
+    """An open object body plus the headers a client needs to cache or resume it."""
+
+    status_code: int
+    body: Optional[Iterator[bytes]] = None
+    content_type: Optional[str] = None
+    headers: dict[str, str] = field(default_factory=dict)
+
+
+def _error_response(exc: Exception) -> tuple[Optional[int], str, dict]:
+    response = getattr(exc, "response", None) or {}
+    metadata = response.get("ResponseMetadata") or {}
+    code = str((response.get("Error") or {}).get("Code") or "")
+    return metadata.get("HTTPStatusCode"), code, metadata.get("HTTPHeaders") or {}
+
+
+def _iter_body(body, chunk_size: int) -> Iterator[bytes]:
+    try:
+        for chunk in body.iter_chunks(chunk_size):
+            if chunk:
+                yield chunk
+    finally:
+        body.close()
+
+
+class ObjectDeleteQueue:
+    """Deletes objects on a background thread, retrying failures with exponential backoff.
+
+    ``guard`` is entered around each attempt and yields whether to go ahead;
+    False cancels the delete (e.g. a content-addressed blob was referenced
+    again). It stays entered while the object is deleted, so it can hold a
+    lock that keeps the answer true until the delete is done.
+    """
+
+    def __init__(self, delete: Callable[[str], None], max_attempts: int, retry_seconds: float) -> None:
+        self._delete = delete
+        self.max_attempts = max(1, int(max_attempts))
+        self.retry_seconds = max(0.0, float(retry_seconds))
+        self._condition = threading.Condition()
+        self._scheduled: list[tuple[float, int, str, int, Optional[DeleteGuard]]] = []
+        self._sequence = 0
+        self._running = 0
+        self._thread: Optional[threading.Thread] = None
+        self._enqueued_total = 0
+        self._deleted_total = 0
+        self._skipped_total = 0
+        self._retried_total = 0
+        self._failed_total = 0
+
+    def enqueue(self, key: str, guard: Optional[DeleteGuard] = None) -> None:
+        with self._condition:
+            self._schedule_locked(key, 0, guard, delay=0.0)
+            self._enqueued_total += 1
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="object-delete", daemon=True)
+                self._thread.start()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued delete has succeeded or given up; False on timeout."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._condition:
+            while self._scheduled or self._running:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._condition.wait(remaining)
+        return True
+
+    def stats(self) -> dict[str, int]:
+        with self._condition:
+            return {
+                "pending": len(self._scheduled) + self._running,
+                "enqueued_total": self._enqueued_total,
+                "deleted_total": self._deleted_total,
+                "skipped_total": self._skipped_total,
+                "retried_total": self._retried_total,
+                "failed_total": self._failed_total,
+            }
+
+    def _schedule_locked(self, key: str, attempt: int, guard, delay: float) -> None:
+        self._sequence += 1
+        heapq.heappush(self._scheduled, (time.monotonic() + delay, self._sequence, key, attempt, guard))
+        self._condition.notify_all()
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while not self._scheduled or self._scheduled[0][0] > time.monotonic():
+                    timeout = self._scheduled[0][0] - time.monotonic() if self._scheduled else None
+                    self._condition.wait(timeout)
+                _, _, key, attempt, guard = heapq.heappop(self._scheduled)
+                self._running += 1
+            outcome = "deleted"
+            try:
+                with guard() if guard is not None else nullcontext(True) as allowed:
+                    if allowed:
+                        self._delete(key)
+                    else:
+                        outcome = "skipped"
+            except Exception as exc:
+                outcome = "failed"
+                error = exc
+            with self._condition:
+                self._running -= 1
+                if outcome == "deleted":
+                    self._deleted_total += 1
+                elif outcome == "skipped":
+                    self._skipped_total += 1
+                elif attempt + 1 < self.max_attempts:
+                    self._retried_total += 1
+                    self._schedule_locked(key, attempt + 1, guard, delay=self.retry_seconds * 2**attempt)
+                else:
+                    self._failed_total += 1
+                    logger.warning("Giving up deleting object %s after %s attempts: %s", key, attempt + 1, error)
+                self._condition.notify_all()
 
 
 class ObjectStorage:
+    """S3-compatible object storage.
+
+    The methods are blocking boto3 calls. Async handlers use the ``*_async``
+    variants, which run on a dedicated pool sized to boto3's connection pool,
+    so storage latency never parks the event loop or the shared thread pool.
+    Deletes of replaced or orphaned files go through ``delete_later``.
+    """
+
     def __init__(self) -> None:
         self.enabled = settings.r2_enabled
         self.bucket = settings.R2_BUCKET
         self.client = None
+        self.transfer_config = None
+        self.cache: Optional[ObjectDiskCache] = None
+        self.workers = max(1, settings.R2_MAX_POOL_CONNECTIONS)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._submitted_total = 0
+        self.deletes = ObjectDeleteQueue(
+            self._delete_now,
+            max_attempts=settings.R2_DELETE_MAX_ATTEMPTS,
+            retry_seconds=settings.R2_DELETE_RETRY_SECONDS,
+        )
 
         if not self.enabled:
             return
@@ -31,7 +198,28 @@ class ObjectStorage:
             aws_access_key_id=settings.R2_ACCESS_KEY_ID,
             aws_secret_access_key=settings.R2_SECRET_ACCESS_KEY,
             region_name=settings.R2_REGION or "auto",
+            config=BotoConfig(
+                max_pool_connections=self.workers,
+                connect_timeout=settings.R2_CONNECT_TIMEOUT_SECONDS,
+                read_timeout=settings.R2_READ_TIMEOUT_SECONDS,
+                retries={"mode": "standard", "max_attempts": 3},
+                tcp_keepalive=True,
+            ),
         )
+        self.transfer_config = TransferConfig(
+            multipart_threshold=MULTIPART_THRESHOLD_BYTES,
+            multipart_chunksize=MULTIPART_THRESHOLD_BYTES,
+        )
+        if settings.OBJECT_CACHE_MAX_BYTES > 0:
+            cache_root = Path(settings.OBJECT_CACHE_DIR or Path(tempfile.gettempdir()) / "spc-object-cache")
+            # One directory per worker process: each keeps its own in-memory index.
+            # Those of exited workers are removed so restarts stay within bounds.
+            remove_dead_worker_directories(cache_root)
+            self.cache = ObjectDiskCache(
+                cache_root / str(os.getpid()),
+                max_bytes=settings.OBJECT_CACHE_MAX_BYTES,
+                fresh_seconds=settings.OBJECT_CACHE_FRESH_SECONDS,
+            )
 
     def upload_bytes(self, key: str, content: bytes, content_type: Optional[str] = None) -> None:
         if not self.enabled or self.client is None:
@@ -41,9 +229,79 @@ class ObjectStorage:
             kwargs["ContentType"] = content_type
         self.client.put_object(**kwargs)
 
+    def upload_fileobj(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict[str, str]] = None,
+    ) -> None:
+        if not self.enabled or self.client is None:
+            return
+        extra_args: dict = {}
+        if content_type:
+            extra_args["ContentType"] = content_type
+        if metadata:
+            extra_args["Metadata"] = metadata
+        self.client.upload_fileobj(
+            fileobj,
+            self.bucket,
+            key,
+            ExtraArgs=extra_args or None,
+            Config=self.transfer_config,
+        )
+
+    def get_cached(self, key: str, size_hint: Optional[int] = None) -> Optional[CachedObject]:
+        """Local copy of ``key`` from the disk cache, or None if uncached or too large.
+
+        ``size_hint`` (e.g. from the file registry) lets objects known to be
+        too large skip the cache without a GET.
+        """
+        if not self.enabled or self.client is None or self.cache is None:
+            return None
+        if size_hint is not None and size_hint > self.cache.max_entry_bytes:
+            return None
+        return self.cache.get(key, lambda etag: self._fill_cache(key, etag))
+
+    def is_cached(self, key: str) -> bool:
+        """Whether the disk cache already holds ``key``, without asking the bucket."""
+        return self.enabled and self.cache is not None and self.cache.contains(key)
+
+    def _fill_cache(self, key: str, etag: Optional[str]) -> CacheFill:
+        kwargs = {"Bucket": self.bucket, "Key": key}
+        if etag:
+            kwargs["IfNoneMatch"] = etag
+        try:
+            obj = self.client.get_object(**kwargs)
+        except Exception as exc:
+            status, code, _ = _error_response(exc)
+            return CacheFill(not_modified=status == 304 or code in {"304", "NotModified"})
+        body = obj.get("Body")
+        size = int(obj.get("ContentLength") or 0)
+        if body is None or size > self.cache.max_entry_bytes:
+            if body is not None:
+                body.close()
+            return CacheFill(too_large=body is not None)
+        return CacheFill(body=body, etag=obj.get("ETag"), content_type=obj.get("ContentType"), size=size)
+
+    def object_exists(self, key: str) -> bool:
+        if not self.enabled or self.client is None:
+            return False
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except Exception as exc:
+            status, code, _ = _error_response(exc)
+            if status == 404 or code in {"404", "NoSuchKey", "NotFound"}:
+                return False
+            raise
+        return True
+
     def get_bytes(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
         if not self.enabled or self.client is None:
             return None
+        cached = self.get_cached(key)
+        if cached is not None:
+            return cached.path.read_bytes(), cached.content_type
         try:
             obj = self.client.get_object(Bucket=self.bucket, Key=key)
         except Exception:
@@ -52,6 +310,67 @@ class ObjectStorage:
         data = body.read() if body else b""
         return data, obj.get("ContentType")
 
+    def presigned_get_url(self, key: str, expires_in: int) -> Optional[str]:
+        if not self.enabled or self.client is None:
+            return None
+        return self.client.generate_presigned_url(
+            "get_object",
+            Params={"Bucket": self.bucket, "Key": key},
+            ExpiresIn=max(1, int(expires_in)),
+        )
+
+    def open_download(
+        self,
+        key: str,
+        byte_range: Optional[str] = None,
+        if_none_match: Optional[str] = None,
+        if_modified_since: Optional[str] = None,
+        chunk_size: int = DOWNLOAD_CHUNK_BYTES,
+    ) -> Optional[ObjectDownload]:
+        """Start a streamed GET, letting the bucket evaluate Range and conditional headers.
+
+        Returns None when storage is disabled or the object does not exist.
+        Multi-range and malformed Range headers are ignored, so those requests
+        receive the whole object as RFC 9110 allows.
+        """
+        if not self.enabled or self.client is None:
+            return None
+        kwargs = {"Bucket": self.bucket, "Key": key}
+        if byte_range and _SINGLE_BYTE_RANGE.match(byte_range.strip()):
+            kwargs["Range"] = byte_range.strip()
+        if if_none_match:
+            kwargs["IfNoneMatch"] = if_none_match
+        elif if_modified_since:
+            kwargs["IfModifiedSince"] = if_modified_since
+        try:
+            obj = self.client.get_object(**kwargs)
+        except Exception as exc:
+            status, code, http_headers = _error_response(exc)
+            if status == 304 or code in {"304", "NotModified"}:
+                headers = {"ETag": http_headers["etag"]} if http_headers.get("etag") else {}
+                return ObjectDownload(status_code=304, headers=headers)
+            if status == 416 or code == "InvalidRange":
+                headers = {"Content-Range": http_headers["content-range"]} if http_headers.get("content-range") else {}
+                return ObjectDownload(status_code=416, headers=headers)
+            return None
+
+        headers = {"Accept-Ranges": "bytes"}
+        if obj.get("ContentLength") is not None:
+            headers["Content-Length"] = str(obj["ContentLength"])
+        if obj.get("ETag"):
+            headers["ETag"] = obj["ETag"]
+        if obj.get("LastModified") is not None:
+            headers["Last-Modified"] = formatdate(obj["LastModified"].timestamp(), usegmt=True)
+        if obj.get("ContentRange"):
+            headers["Content-Range"] = obj["ContentRange"]
+        body = obj.get("Body")
+        return ObjectDownload(
+            status_code=206 if obj.get("ContentRange") else 200,
+            body=_iter_body(body, chunk_size) if body is not None else iter(()),
+            content_type=obj.get("ContentType"),
+            headers=headers,
+        )
+
     def delete_object(self, key: str) -> None:
         if not self.enabled or self.client is None:
             return
@@ -61,5 +380,72 @@ class ObjectStorage:
             # Deleting a missing object should not break user flow.
             return
 
+    def _delete_now(self, key: str) -> None:
+        # S3 answers 204 for missing keys too, so any error here is worth a retry.
+        if not self.enabled or self.client is None:
+            return
+        self.client.delete_object(Bucket=self.bucket, Key=key)
+
+    def delete_later(self, key: str, guard: Optional[DeleteGuard] = None) -> None:
+        """Queue ``key`` for background deletion; call after the referencing rows are committed."""
+        if not self.enabled or self.client is None:
+            return
+        self.deletes.enqueue(key, guard)
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="object-storage")
+        return self._executor
+
+    def _on_done(self, _future: Future) -> None:
+        with self._lock:
+            self._in_flight -= 1
+
+    async def run(self, fn: Callable[..., T], *args) -> T:
+        """Run a blocking storage call on the storage pool and await its result."""
+        with self._lock:
+            self._in_flight += 1
+            self._submitted_total += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+            executor = self._get_executor()
+        future = executor.submit(fn, *args)
+        future.add_done_callback(self._on_done)
+        return await asyncio.wrap_future(future)
+
+    async def upload_bytes_async(self, key: str, content: bytes, content_type: Optional[str] = None) -> None:
+        await self.run(self.upload_bytes, key, content, content_type)
+
+    async def upload_fileobj_async(
+        self,
+        key: str,
+        fileobj: BinaryIO,
+        content_type: Optional[str] = None,
+        metadata: Optional[dict[str, str]] = None,
+    ) -> None:
+        await self.run(self.upload_fileobj, key, fileobj, content_type, metadata)
+
+    async def get_bytes_async(self, key: str) -> Optional[Tuple[bytes, Optional[str]]]:
+        return await self.run(self.get_bytes, key)
+
+    def stats(self) -> dict[str, object]:
+        with self._lock:
+            pool = {
+                "workers": self.workers,
+                "in_flight": self._in_flight,
+                "queue_depth": max(0, self._in_flight - self.workers),
+                "peak_in_flight": self._peak_in_flight,
+                "submitted_total": self._submitted_total,
+            }
+        return {"enabled": self.enabled, "pool": pool, "deletes": self.deletes.stats()}
+
+    def shutdown(self, timeout: float) -> None:
+        """Give queued deletes up to ``timeout`` seconds to finish, then stop the pool."""
+        if not self.deletes.flush(timeout):
+            logger.warning("Object storage shutting down with deletes still queued: %s", self.deletes.stats())
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False)
+
 
 object_storage = ObjectStorage()
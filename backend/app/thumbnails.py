@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import io
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+try:
+    from PIL import Image, ImageOps
+except Exception:  # pragma: no cover - optional dependency; originals are served without it
+    Image = None
+    ImageOps = None
+
+AVATAR_THUMBNAIL_SIZES = (32, 64, 128)
+AVATAR_THUMBNAIL_CONTENT_TYPE = "image/webp"
+
+
+def avatar_thumbnail_name(file_name: str, size: int) -> str:
+    return f"{Path(file_name).stem}_{size}.webp"
+
+
+def avatar_thumbnail_size_for(requested: int) -> Optional[int]:
+    """Smallest variant that covers ``requested`` px, or None if only the original will do."""
+    for size in AVATAR_THUMBNAIL_SIZES:
+        if size >= requested:
+            return size
+    return None
+
+
+def render_avatar_thumbnails(source: BinaryIO) -> dict[int, bytes]:
+    """Square WebP crops of an avatar image, keyed by edge length in px.
+
+    Returns an empty dict when Pillow is unavailable or the image cannot be
+    decoded; callers then keep serving the original.
+    """
+    if Image is None:
+        return {}
+    try:
+        with Image.open(source) as opened:
+            image = ImageOps.exif_transpose(opened)
+            image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+            thumbnails: dict[int, bytes] = {}
+            for size in AVATAR_THUMBNAIL_SIZES:
+                variant = ImageOps.fit(image, (size, size), method=Image.LANCZOS)
+                buffer = io.BytesIO()
+                variant.save(buffer, format="WEBP", quality=80, method=4)
+                thumbnails[size] = buffer.getvalue()
+            return thumbnails
+    except (OSError, ValueError, Image.DecompressionBombError):
+        return {}
@@ -0,0 +1,158 @@
+from __future__ import annotations
+
+import hashlib
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Optional
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .storage import object_storage
+
+UPLOAD_CHUNK_BYTES = 1024 * 1024
+
+
+class RequestBodyTooLarge(Exception):
+    pass
+
+
+class RequestBodyLimitMiddleware:
+    """Answer 413 to request bodies over ``max_bytes`` before they are received in full.
+
+    Starlette spools a multipart body to disk before the handler runs, so
+    the per-upload limits in ``store_upload`` cannot stop an oversized
+    request from being read; this can. A declared Content-Length is
+    checked up front, and a chunked body is counted as it arrives.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int) -> None:
+        self.app = app
+        self.max_bytes = max(0, int(max_bytes))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.max_bytes:
+            await self.app(scope, receive, send)
+            return
+        declared = dict(scope.get("headers") or []).get(b"content-length")
+        if declared is not None and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(scope, receive, send)
+            return
+
+        received = 0
+        started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise RequestBodyTooLarge()
+            return message
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal started
+            if message["type"] == "http.response.start":
+                started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except RequestBodyTooLarge:
+            if started:
+                raise
+            await self._reject(scope, receive, send)
+
+    async def _reject(self, scope: Scope, receive: Receive, send: Send) -> None:
+        limit_mb = self.max_bytes // (1024 * 1024)
+        response = JSONResponse({"detail": f"Request body must be <= {limit_mb}MB"}, status_code=413)
+        await response(scope, receive, send)
+
+
+@dataclass
+class StoredUpload:
+    size: int
+    sha256: str
+    storage_key: Optional[str] = None
+
+
+async def _copy_upload(file: UploadFile, sink: BinaryIO, max_bytes: int, too_large_detail: str) -> StoredUpload:
+    digest = hashlib.sha256()
+    size = 0
+    while True:
+        chunk = await file.read(UPLOAD_CHUNK_BYTES)
+        if not chunk:
+            break
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=400, detail=too_large_detail)
+        digest.update(chunk)
+        await run_in_threadpool(sink.write, chunk)
+    return StoredUpload(size=size, sha256=digest.hexdigest())
+
+
+async def spool_upload(
+    file: UploadFile,
+    max_bytes: int,
+    too_large_detail: str,
+    directory: Optional[Path] = None,
+) -> tuple[BinaryIO, StoredUpload]:
+    """Copy an upload to a named temporary file, checking the size limit and hashing as it goes.
+
+    The returned file is positioned at the start; the caller closes and removes it.
+    """
+    sink = tempfile.NamedTemporaryFile(dir=directory, suffix=".part", delete=False)
+    try:
+        stored = await _copy_upload(file, sink, max_bytes, too_large_detail)
+        sink.flush()
+        sink.seek(0)
+    except BaseException:
+        sink.close()
+        Path(sink.name).unlink(missing_ok=True)
+        raise
+    return sink, stored
+
+
+async def store_upload(
+    file: UploadFile,
+    object_key: str,
+    destination: Path,
+    max_bytes: int,
+    too_large_detail: str,
+) -> StoredUpload:
+    """Copy an upload to object storage or ``destination`` without holding it in memory.
+
+    The file is read in chunks, so memory stays bounded whatever its size,
+    and the SHA-256 is computed on the way through. By then the request
+    body has already been received; ``RequestBodyLimitMiddleware`` (and
+    nginx's ``client_max_body_size``) stop oversized requests earlier,
+    and ``max_bytes`` applies the per-kind limit. With object
+    storage the chunks are spooled to a temporary file and handed to
+    ``upload_fileobj`` (multipart for large files); locally they are written
+    to a ``.part`` file that is renamed into place only once complete.
+    """
+    partial = destination.with_name(f"{destination.name}.part")
+    sink = tempfile.TemporaryFile() if object_storage.enabled else partial.open("wb")
+    try:
+        stored = await _copy_upload(file, sink, max_bytes, too_large_detail)
+        if object_storage.enabled:
+            sink.seek(0)
+            await object_storage.upload_fileobj_async(
+                object_key,
+                sink,
+                file.content_type,
+                {"sha256": stored.sha256},
+            )
+    except BaseException:
+        sink.close()
+        partial.unlink(missing_ok=True)
+        raise
+
+    sink.close()
+    if not object_storage.enabled:
+        partial.replace(destination)
+    return stored
@@ -1,36 +1,327 @@
 from __future__ import annotations
-from typing import Set
+from typing import Dict, Iterable, Optional, Set
 from fastapi import WebSocket
 import asyncio
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Close code for a client that could not keep up; browsers reconnect and refetch.
+WS_CLOSE_TRY_AGAIN_LATER = 1013
+# Close code for a client that stopped answering heartbeats (half-open sockets).
+WS_CLOSE_IDLE_TIMEOUT = 4408
+
+# Heartbeats the server sends and the reply clients are expected to make.
+# Any message from the client counts as a sign of life.
+MESSAGE_PING = "ping"
+MESSAGE_PONG = "pong"
+
+# Subscription topics. Every connection also gets its own user and role
+# topics and, when it has one, its department topic.
+TOPIC_CALENDAR = "calendar"
+TOPIC_APPROVERS = "approvers"
+TOPIC_FINANCE = "finance"
+
+
+def user_topic(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def department_topic(department: str) -> str:
+    return f"department:{department.strip().lower()}"
+
+
+def role_topic(role: str) -> str:
+    return f"role:{role.strip().lower()}"
+
+
+class _Connection:
+    """One accepted socket, its bounded outgoing queue and the task that drains it."""
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        queue_size: int,
+        topics: frozenset[str],
+        user_id: Optional[int] = None,
+    ) -> None:
+        self.websocket = websocket
+        self.topics = topics
+        self.user_id = user_id
+        self.connected_at = self.last_seen = time.monotonic()
+        self.queue: asyncio.Queue[tuple[Optional[str], str]] = asyncio.Queue(maxsize=queue_size)
+        self.writer: Optional[asyncio.Task] = None
+        self.closed = False
+
+    def coalesce(self) -> int:
+        """Collapse queued messages to one per type; returns how many were dropped.
+
+        A type that had several messages is replaced by a ``resync`` hint, since
+        the dropped ones may have carried changes the newest one does not.
+        """
+        latest: Dict[Optional[str], str] = {}
+        collapsed: Set[Optional[str]] = set()
+        dropped = 0
+        while not self.queue.empty():
+            kind, text = self.queue.get_nowait()
+            if kind in latest:
+                dropped += 1
+                collapsed.add(kind)
+                del latest[kind]
+            latest[kind] = text
+        for kind, text in latest.items():
+            if kind in collapsed and kind not in (MESSAGE_PING, MESSAGE_PONG):
+                text = json.dumps({"type": kind, "action": "batch", "resync": True}, separators=(",", ":"))
+            self.queue.put_nowait((kind, text))
+        return dropped
 
 
 class ConnectionManager:
-    def __init__(self) -> None:
-        self._connections: Set[WebSocket] = set()
-        self._lock = asyncio.Lock()
+    """Fan-out of JSON messages to connected sockets, optionally scoped to topics.
+
+    Each connection is subscribed to a fixed set of topics when it is
+    accepted; ``publish(payload, topics)`` reaches the connections
+    subscribed to any of them, and ``topics=None`` reaches everyone.
 
-    async def connect(self, websocket: WebSocket) -> None:
+    Broadcasting never awaits the network: each message is encoded once and
+    put on every connection's bounded queue, and a per-connection writer task
+    sends it. When a queue is full the pending messages are coalesced to one
+    ``resync`` hint per ``type``, on which clients refetch; a
+    client that still cannot keep up, or whose send stalls longer than
+    ``send_timeout``, is closed so it reconnects and resyncs.
+
+    While any socket is open a heartbeat task pings every connection each
+    ``heartbeat_seconds`` and closes those that have sent nothing for
+    ``idle_timeout`` seconds, so half-open sockets stop receiving broadcasts
+    instead of piling up. A user may hold at most ``max_per_user`` sockets;
+    further ones are refused.
+    """
+
+    def __init__(
+        self,
+        queue_size: int = 64,
+        send_timeout: float = 10.0,
+        heartbeat_seconds: float = 25.0,
+        idle_timeout: float = 60.0,
+        max_per_user: int = 0,
+    ) -> None:
+        self.queue_size = max(1, queue_size)
+        self.send_timeout = max(0.1, send_timeout)
+        self.heartbeat_seconds = max(0.0, heartbeat_seconds)
+        self.idle_timeout = max(self.heartbeat_seconds, idle_timeout)
+        self.max_per_user = max(0, max_per_user)
+        self._connections: Dict[WebSocket, _Connection] = {}
+        self._subscribers: Dict[str, Set[_Connection]] = {}
+        self._by_user: Dict[int, Set[_Connection]] = {}
+        self._heartbeat: Optional[asyncio.Task] = None
+        self._opened_total = 0
+        self._closed_total = 0
+        self._rejected_total = 0
+        self._idle_closed_total = 0
+        self._pings_total = 0
+        self._lifetime_seconds_total = 0.0
+        self._longest_lifetime_seconds = 0.0
+        self._published_total = 0
+        self._sent_total = 0
+        self._coalesced_total = 0
+        self._dropped_total = 0
+        self._evicted_total = 0
+        self._peak_queue_depth = 0
+
+    async def connect(
+        self,
+        websocket: WebSocket,
+        topics: Iterable[str] = (),
+        user_id: Optional[int] = None,
+    ) -> bool:
+        """Accept and register ``websocket``; returns False if the user is over the cap."""
         await websocket.accept()
-        async with self._lock:
-            self._connections.add(websocket)
+        if self.max_per_user and user_id is not None and len(self._by_user.get(user_id, ())) >= self.max_per_user:
+            self._rejected_total += 1
+            await self._close(websocket, WS_CLOSE_TRY_AGAIN_LATER)
+            return False
+        conn = _Connection(websocket, self.queue_size, frozenset(topics), user_id)
+        conn.writer = asyncio.create_task(self._write(conn))
+        self._connections[websocket] = conn
+        for topic in conn.topics:
+            self._subscribers.setdefault(topic, set()).add(conn)
+        if user_id is not None:
+            self._by_user.setdefault(user_id, set()).add(conn)
+        self._opened_total += 1
+        self._ensure_heartbeat()
+        return True
+
+    def touch(self, websocket: WebSocket, text: str = "") -> None:
+        """Record a message from the client; answers its own pings with a pong."""
+        conn = self._connections.get(websocket)
+        if conn is None:
+            return
+        conn.last_seen = time.monotonic()
+        if text:
+            try:
+                kind = json.loads(text).get("type")
+            except (ValueError, AttributeError):
+                return
+            if kind == MESSAGE_PING:
+                self._enqueue(conn, MESSAGE_PONG, json.dumps({"type": MESSAGE_PONG}))
 
     async def disconnect(self, websocket: WebSocket) -> None:
-        async with self._lock:
-            self._connections.discard(websocket)
+        conn = self._remove(websocket)
+        if conn is not None and conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
 
-    async def broadcast_json(self, payload: dict) -> None:
-        # Snapshot to avoid holding the lock while awaiting network IO
-        async with self._lock:
-            conns = list(self._connections)
+    def _remove(self, websocket: WebSocket) -> Optional[_Connection]:
+        conn = self._connections.pop(websocket, None)
+        if conn is None:
+            return None
+        conn.closed = True
+        for topic in conn.topics:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(conn)
+                if not subscribers:
+                    del self._subscribers[topic]
+        if conn.user_id is not None:
+            owned = self._by_user.get(conn.user_id)
+            if owned is not None:
+                owned.discard(conn)
+                if not owned:
+                    del self._by_user[conn.user_id]
+        lifetime = time.monotonic() - conn.connected_at
+        self._closed_total += 1
+        self._lifetime_seconds_total += lifetime
+        self._longest_lifetime_seconds = max(self._longest_lifetime_seconds, lifetime)
+        return conn
 
-        dead: list[WebSocket] = []
-        for ws in conns:
-            try:
-                await ws.send_json(payload)
-            except Exception:
-                dead.append(ws)
-
-        if dead:
-            async with self._lock:
-                for ws in dead:
-                    self._connections.discard(ws)
+    def _ensure_heartbeat(self) -> None:
+        if not self.heartbeat_seconds:
+            return
+        loop = asyncio.get_running_loop()
+        if self._heartbeat is not None and not self._heartbeat.done() and self._heartbeat.get_loop() is loop:
+            return
+        self._heartbeat = loop.create_task(self._heartbeat_loop())
+
+    async def _heartbeat_loop(self) -> None:
+        # Runs only while sockets are open; the next connect starts it again.
+        while self._connections:
+            await asyncio.sleep(self.heartbeat_seconds)
+            self.sweep()
+
+    def sweep(self) -> None:
+        """Close connections idle past ``idle_timeout`` and ping the rest."""
+        now = time.monotonic()
+        ping = json.dumps({"type": MESSAGE_PING})
+        for conn in list(self._connections.values()):
+            if now - conn.last_seen > self.idle_timeout:
+                self._idle_closed_total += 1
+                self._evict(conn, WS_CLOSE_IDLE_TIMEOUT)
+            elif not conn.queue.full():
+                self._pings_total += 1
+                conn.queue.put_nowait((MESSAGE_PING, ping))
+
+    async def broadcast_json(self, payload: dict, topics: Optional[Iterable[str]] = None) -> None:
+        self.publish(payload, topics)
+
+    def publish(
+        self,
+        payload: dict,
+        topics: Optional[Iterable[str]] = None,
+        exclude: Optional[Iterable[str]] = None,
+    ) -> int:
+        """Queue ``payload`` for the matching connections without waiting on any of them.
+
+        Connections subscribed to any ``exclude`` topic are skipped; they are
+        sent their own variant. Returns how many connections it was queued for.
+        """
+        if topics is None:
+            targets = list(self._connections.values())
+        else:
+            matched: Set[_Connection] = set()
+            for topic in topics:
+                matched.update(self._subscribers.get(topic, ()))
+            targets = list(matched)
+        if exclude:
+            excluded = set(exclude)
+            targets = [conn for conn in targets if not conn.topics & excluded]
+        self._published_total += 1
+        if not targets:
+            return 0
+        kind = payload.get("type")
+        text = json.dumps(payload, separators=(",", ":"), ensure_ascii=False, default=str)
+        for conn in targets:
+            self._enqueue(conn, kind, text)
+        return len(targets)
+
+    def _enqueue(self, conn: _Connection, kind: Optional[str], text: str) -> None:
+        if conn.closed:
+            return
+        if conn.queue.full():
+            coalesced = conn.coalesce()
+            self._coalesced_total += coalesced
+            self._dropped_total += coalesced
+            if conn.queue.full():
+                self._dropped_total += conn.queue.qsize() + 1
+                self._evict(conn)
+                return
+        conn.queue.put_nowait((kind, text))
+        self._peak_queue_depth = max(self._peak_queue_depth, conn.queue.qsize())
+
+    async def _write(self, conn: _Connection) -> None:
+        try:
+            while True:
+                _, text = await conn.queue.get()
+                await asyncio.wait_for(conn.websocket.send_text(text), timeout=self.send_timeout)
+                self._sent_total += 1
+        except asyncio.CancelledError:
+            raise
+        except asyncio.TimeoutError:
+            self._dropped_total += conn.queue.qsize() + 1
+            self._evict(conn)
+        except Exception:
+            # The peer went away; the receive loop notices and disconnects too.
+            await self.disconnect(conn.websocket)
+
+    def _evict(self, conn: _Connection, code: int = WS_CLOSE_TRY_AGAIN_LATER) -> None:
+        if conn.closed:
+            return
+        self._evicted_total += 1
+        self._remove(conn.websocket)
+        if conn.writer is not None and conn.writer is not asyncio.current_task():
+            conn.writer.cancel()
+        asyncio.get_running_loop().create_task(self._close(conn.websocket, code))
+
+    async def _close(self, websocket: WebSocket, code: int = WS_CLOSE_TRY_AGAIN_LATER) -> None:
+        try:
+            await asyncio.wait_for(websocket.close(code=code), timeout=self.send_timeout)
+        except Exception:
+            logger.debug("Closing a WebSocket client failed", exc_info=True)
+
+    def stats(self) -> dict[str, object]:
+        now = time.monotonic()
+        conns = list(self._connections.values())
+        depths = [conn.queue.qsize() for conn in conns]
+        return {
+            "connections": len(depths),
+            "users": len(self._by_user),
+            "max_connections_per_user": max((len(owned) for owned in self._by_user.values()), default=0),
+            "oldest_connection_seconds": round(max((now - conn.connected_at for conn in conns), default=0.0), 1),
+            "opened_total": self._opened_total,
+            "closed_total": self._closed_total,
+            "rejected_total": self._rejected_total,
+            "idle_closed_total": self._idle_closed_total,
+            "pings_total": self._pings_total,
+            "avg_lifetime_seconds": round(self._lifetime_seconds_total / self._closed_total, 1) if self._closed_total else 0.0,
+            "longest_lifetime_seconds": round(self._longest_lifetime_seconds, 1),
+            "topics": len(self._subscribers),
+            "queue_size": self.queue_size,
+            "queued": sum(depths),
+            "max_queue_depth": max(depths, default=0),
+            "peak_queue_depth": self._peak_queue_depth,
+            "published_total": self._published_total,
+            "sent_total": self._sent_total,
+            "coalesced_total": self._coalesced_total,
+            "dropped_total": self._dropped_total,
+            "evicted_total": self._evicted_total,
+        }
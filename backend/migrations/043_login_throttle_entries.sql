@@ -0,0 +1,9 @@
+CREATE TABLE IF NOT EXISTS login_throttle_entries (
+    key VARCHAR(400) PRIMARY KEY,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    window_expires_at TIMESTAMP NOT NULL,
+    blocked_until TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS ix_login_throttle_entries_window_expires_at
+ON login_throttle_entries (window_expires_at);
@@ -0,0 +1,18 @@
+CREATE TABLE IF NOT EXISTS stored_files (
+    id SERIAL PRIMARY KEY,
+    kind VARCHAR(30) NOT NULL,
+    file_name VARCHAR(255) NOT NULL,
+    owner_user_id INTEGER REFERENCES users(id),
+    acl VARCHAR(20) NOT NULL DEFAULT 'owner',
+    content_type VARCHAR(120),
+    size_bytes INTEGER,
+    sha256 VARCHAR(64),
+    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    CONSTRAINT uq_stored_files_kind_file_name UNIQUE (kind, file_name)
+);
+
+CREATE INDEX IF NOT EXISTS ix_stored_files_file_name
+ON stored_files (file_name);
+
+CREATE INDEX IF NOT EXISTS ix_stored_files_owner_user_id
+ON stored_files (owner_user_id);
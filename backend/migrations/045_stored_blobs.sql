@@ -0,0 +1,10 @@
+ALTER TABLE stored_files
+ADD COLUMN IF NOT EXISTS storage_key VARCHAR(300);
+
+CREATE TABLE IF NOT EXISTS stored_blobs (
+    sha256 VARCHAR(64) PRIMARY KEY,
+    storage_key VARCHAR(300) NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP NOT NULL DEFAULT NOW()
+);
@@ -0,0 +1,15 @@
+CREATE INDEX IF NOT EXISTS ix_cash_reimbursement_requests_pending
+ON cash_reimbursement_requests (finance_decision, ceo_decision)
+WHERE status = 'pending_approval';
+
+CREATE INDEX IF NOT EXISTS ix_cash_requisition_requests_pending
+ON cash_requisition_requests (status)
+WHERE status IN ('pending_finance_review', 'pending_ceo_approval');
+
+CREATE INDEX IF NOT EXISTS ix_authority_to_incur_requests_pending
+ON authority_to_incur_requests (status)
+WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval');
+
+CREATE INDEX IF NOT EXISTS ix_salary_advance_requests_pending
+ON salary_advance_requests (status)
+WHERE status IN ('pending_finance_review', 'pending_ceo_approval', 'pending_parallel_approval');
@@ -0,0 +1,253 @@
+"""Drive the hot API endpoints in-process and record latency and query counts.
+
+Usage (from the backend directory, against a database filled by perf.seed):
+
+    python -m perf.bench --iterations 50 --output perf/baseline.json
+    python -m perf.bench --iterations 50 --compare perf/baseline.json
+
+Results are written as JSON so a later run can be compared to a baseline.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import statistics
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.db import engine
+from app.security import create_access_token
+
+from .seed import (
+    BENCH_ADMIN_EMAIL,
+    BENCH_EMPLOYEE_EMAIL,
+    BENCH_FINANCE_EMAIL,
+    BENCH_SUPERVISOR_EMAIL,
+)
+
+DEFAULT_BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+
+class QueryCounter:
+    """Counts SQL statements issued through the application engine."""
+
+    def __init__(self, target=engine) -> None:
+        self._target = target
+        self._installed = False
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def _on_execute(self, *_args, **_kwargs) -> None:
+        with self._lock:
+            self.count += 1
+
+    def install(self) -> None:
+        if not self._installed:
+            event.listen(self._target, "before_cursor_execute", self._on_execute)
+            self._installed = True
+
+    def remove(self) -> None:
+        if self._installed:
+            event.remove(self._target, "before_cursor_execute", self._on_execute)
+            self._installed = False
+
+    @contextmanager
+    def measure(self) -> Iterator[dict]:
+        result = {"queries": 0}
+        self.install()
+        with self._lock:
+            start = self.count
+        try:
+            yield result
+        finally:
+            with self._lock:
+                result["queries"] = self.count - start
+
+
+@dataclass
+class Scenario:
+    name: str
+    path: str
+    email: str
+    params: Callable[[], dict] = field(default=lambda: {})
+
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def default_scenarios() -> list[Scenario]:
+    today = date.today()
+    month_start = _month_start(today)
+    next_month = date(month_start.year + (month_start.month // 12), month_start.month % 12 + 1, 1)
+    last_month = _month_start(month_start - timedelta(days=1))
+    return [
+        Scenario(
+            name="events_month",
+            path="/events",
+            email=BENCH_ADMIN_EMAIL,
+            params=lambda: {
+                "start": datetime.combine(month_start, datetime.min.time()).isoformat(),
+                "end": datetime.combine(next_month, datetime.min.time()).isoformat(),
+            },
+        ),
+        Scenario(name="dashboard_overview", path="/dashboard/overview", email=BENCH_EMPLOYEE_EMAIL),
+        Scenario(
+            name="payroll_admin_overview",
+            path="/payroll/admin-overview",
+            email=BENCH_FINANCE_EMAIL,
+            params=lambda: {"payroll_month": last_month.isoformat()},
+        ),
+        Scenario(name="leave_requests_admin", path="/leave/requests", email=BENCH_ADMIN_EMAIL),
+        Scenario(name="leave_requests_supervisor", path="/leave/requests", email=BENCH_SUPERVISOR_EMAIL),
+        Scenario(name="reimbursement_draft", path="/finance/reimbursements/draft", email=BENCH_EMPLOYEE_EMAIL),
+    ]
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def build_client() -> TestClient:
+    # Imported lazily so DATABASE_URL overrides apply before the app module loads.
+    from app.main import app
+
+    # Not entered as a context manager: startup hooks validate production settings.
+    return TestClient(app, base_url="http://localhost")
+
+
+def run_scenario(
+    client: TestClient,
+    counter: QueryCounter,
+    scenario: Scenario,
+    iterations: int,
+    warmup: int = 2,
+) -> dict:
+    headers = {"Authorization": f"Bearer {create_access_token(scenario.email)}"}
+    params = scenario.params()
+
+    for _ in range(warmup):
+        client.get(scenario.path, params=params, headers=headers)
+
+    latencies: list[float] = []
+    query_counts: list[int] = []
+    status_code: Optional[int] = None
+    for _ in range(iterations):
+        with counter.measure() as measured:
+            started = time.perf_counter()
+            response = client.get(scenario.path, params=params, headers=headers)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+        status_code = response.status_code
+        latencies.append(elapsed_ms)
+        query_counts.append(measured["queries"])
+
+    return {
+        "path": scenario.path,
+        "as": scenario.email,
+        "status": status_code,
+        "iterations": iterations,
+        "p50_ms": round(percentile(latencies, 50), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3),
+        "mean_ms": round(statistics.fmean(latencies), 3) if latencies else 0.0,
+        "queries_median": int(statistics.median(query_counts)) if query_counts else 0,
+        "queries_max": max(query_counts) if query_counts else 0,
+    }
+
+
+def run_benchmarks(scenarios: list[Scenario], iterations: int, warmup: int = 2) -> dict:
+    client = build_client()
+    counter = QueryCounter()
+    counter.install()
+    try:
+        results = {
+            scenario.name: run_scenario(client, counter, scenario, iterations, warmup)
+            for scenario in scenarios
+        }
+    finally:
+        counter.remove()
+    return {
+        "generated_at": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+        "database": engine.url.render_as_string(hide_password=True),
+        "dialect": engine.dialect.name,
+        "endpoints": results,
+    }
+
+
+def compare_to_baseline(current: dict, baseline: dict, latency_tolerance: float = 1.25) -> list[str]:
+    regressions: list[str] = []
+    base_endpoints = baseline.get("endpoints") or {}
+    for name, result in (current.get("endpoints") or {}).items():
+        base = base_endpoints.get(name)
+        if not base:
+            continue
+        if result["queries_max"] > base["queries_max"]:
+            regressions.append(
+                f"{name}: queries {result['queries_max']} > baseline {base['queries_max']}"
+            )
+        for key in ("p50_ms", "p95_ms"):
+            limit = base[key] * latency_tolerance
+            if result[key] > limit:
+                regressions.append(
+                    f"{name}: {key} {result[key]:.1f}ms > {limit:.1f}ms "
+                    f"(baseline {base[key]:.1f}ms x {latency_tolerance})"
+                )
+    return regressions
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints.")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--only", action="append", default=[], help="Scenario name to run (repeatable).")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON to this path.")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline JSON to compare against.")
+    parser.add_argument("--latency-tolerance", type=float, default=1.25)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = _parse_args(argv)
+    scenarios = default_scenarios()
+    if args.only:
+        scenarios = [s for s in scenarios if s.name in set(args.only)]
+
+    report = run_benchmarks(scenarios, iterations=args.iterations, warmup=args.warmup)
+    for name, result in report["endpoints"].items():
+        print(
+            f"{name:<28} status={result['status']} p50={result['p50_ms']:.1f}ms "
+            f"p95={result['p95_ms']:.1f}ms p99={result['p99_ms']:.1f}ms "
+            f"queries={result['queries_median']} (max {result['queries_max']})"
+        )
+
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+        print(f"Wrote {args.output}")
+
+    if args.compare:
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.latency_tolerance)
+        if regressions:
+            print("Regressions against baseline:")
+            for line in regressions:
+                print(f"  - {line}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,539 @@
+"""Fill a local database with synthetic, realistically sized data.
+
+Usage (from the backend directory):
+
+    python -m perf.seed --users 2000 --events 1000000 --daily-activities 200000 \
+        --client-tasks 50000 --payroll-months 24 --reimbursement-items 100000
+
+Every row is generated from the application models, so the resulting database
+is the same shape the API reads in production.
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Iterable, Iterator
+from uuid import uuid4
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db import Base, SessionLocal, engine
+from app.models import (
+    CashReimbursementItem,
+    CashReimbursementRequest,
+    ClientAccount,
+    ClientTask,
+    DailyActivity,
+    Department,
+    Event,
+    PayrollProfile,
+    PayrollRun,
+    User,
+)
+from app.security import hash_password
+
+BENCH_PASSWORD = "benchmark-password"
+BENCH_EMAIL_DOMAIN = "bench.example.com"
+BENCH_ADMIN_EMAIL = f"admin@{BENCH_EMAIL_DOMAIN}"
+BENCH_FINANCE_EMAIL = f"finance@{BENCH_EMAIL_DOMAIN}"
+BENCH_SUPERVISOR_EMAIL = f"supervisor@{BENCH_EMAIL_DOMAIN}"
+BENCH_EMPLOYEE_EMAIL = f"employee@{BENCH_EMAIL_DOMAIN}"
+
+DEPARTMENTS = [
+    "Advisory",
+    "Audit",
+    "Finance",
+    "Human Resources",
+    "Operations",
+    "Sales",
+    "Tax",
+    "Technology",
+]
+EVENT_TYPE_WEIGHTS = [
+    ("Client Visit", 35),
+    ("Meeting", 25),
+    ("Leave", 12),
+    ("Hospital", 3),
+    ("Training", 10),
+    ("Other", 15),
+]
+LEAVE_STATUS_WEIGHTS = [("approved", 70), ("pending", 20), ("rejected", 10)]
+
+
+@dataclass
+class SeedConfig:
+    users: int = 2000
+    events: int = 1_000_000
+    daily_activities: int = 200_000
+    client_tasks: int = 50_000
+    payroll_months: int = 24
+    clients: int = 250
+    reimbursement_items: int = 100_000
+    batch_size: int = 5000
+    seed: int = 42
+
+
+@dataclass
+class SeedSummary:
+    users: int = 0
+    clients: int = 0
+    events: int = 0
+    daily_activities: int = 0
+    client_tasks: int = 0
+    payroll_profiles: int = 0
+    payroll_runs: int = 0
+    reimbursement_requests: int = 0
+    reimbursement_items: int = 0
+
+
+def _chunks(rows: Iterable[dict], size: int) -> Iterator[list[dict]]:
+    batch: list[dict] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _weighted(rng: random.Random, weights: list[tuple[str, int]]) -> str:
+    values, cum = zip(*weights)
+    return rng.choices(values, weights=cum, k=1)[0]
+
+
+def _month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def _shift_months(d: date, months: int) -> date:
+    index = d.year * 12 + (d.month - 1) + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bulk_insert(db: Session, model, rows: Iterable[dict], batch_size: int) -> int:
+    total = 0
+    for batch in _chunks(rows, batch_size):
+        db.execute(insert(model), batch)
+        db.commit()
+        total += len(batch)
+    return total
+
+
+def _seed_departments(db: Session) -> None:
+    existing = {name for (name,) in db.query(Department.name).all()}
+    for name in DEPARTMENTS:
+        if name not in existing:
+            db.add(Department(name=name))
+    db.commit()
+
+
+def _seed_users(db: Session, rng: random.Random, cfg: SeedConfig) -> list[dict]:
+    # bcrypt is deliberately slow; every synthetic account shares one hash.
+    password_hash = hash_password(BENCH_PASSWORD)
+    run_tag = uuid4().hex[:8]
+    today = date.today()
+    fixed = [
+        ("Bench Admin", BENCH_ADMIN_EMAIL, "admin"),
+        ("Bench Finance", BENCH_FINANCE_EMAIL, "finance"),
+        ("Bench Supervisor", BENCH_SUPERVISOR_EMAIL, "supervisor"),
+        ("Bench Employee", BENCH_EMPLOYEE_EMAIL, "employee"),
+    ]
+    taken = {
+        email
+        for (email,) in db.query(User.email).filter(User.email.in_([row[1] for row in fixed])).all()
+    }
+
+    base_rows: list[dict] = []
+    for name, email, role in fixed:
+        if email in taken:
+            continue
+        base_rows.append({"name": name, "email": email, "role": role})
+    remaining = max(0, cfg.users - len(base_rows))
+    for index in range(remaining):
+        roll = rng.random()
+        role = "supervisor" if roll < 0.05 else "finance" if roll < 0.07 else "employee"
+        base_rows.append(
+            {
+                "name": f"Synthetic User {run_tag}-{index:05d}",
+                "email": f"user-{run_tag}-{index:05d}@{BENCH_EMAIL_DOMAIN}",
+                "role": role,
+            }
+        )
+
+    rows: list[dict] = []
+    for row in base_rows:
+        hire_date = today - timedelta(days=rng.randint(30, 365 * 8))
+        rows.append(
+            {
+                **row,
+                "password_hash": password_hash,
+                "employment_type": "consultant" if rng.random() < 0.08 else "employee",
+                "department": rng.choice(DEPARTMENTS),
+                "designation": "Associate",
+                "employee_no": f"EMP-{rng.randint(10000, 99999)}",
+                "date_of_birth": date(rng.randint(1965, 2002), rng.randint(1, 12), rng.randint(1, 28)),
+                "hire_date": hire_date,
+                "require_two_step_leave_approval": rng.random() < 0.3,
+                "created_at": datetime.combine(hire_date, datetime.min.time()),
+            }
+        )
+
+    created: list[dict] = []
+    for batch in _chunks(rows, cfg.batch_size):
+        ids = db.scalars(insert(User).returning(User.id), batch).all()
+        db.commit()
+        for user_id, row in zip(ids, batch):
+            created.append({"id": user_id, "role": row["role"], "department": row["department"]})
+
+    supervisors = [u["id"] for u in created if u["role"] == "supervisor"]
+    admins = [u["id"] for u in created if u["role"] == "admin"]
+    if supervisors and admins:
+        for u in created:
+            if u["role"] != "employee":
+                continue
+            first = rng.choice(supervisors)
+            second = rng.choice(admins)
+            db.query(User).filter(User.id == u["id"]).update(
+                {
+                    User.supervisor_id: first,
+                    User.first_approver_id: first,
+                    User.second_approver_id: second,
+                },
+                synchronize_session=False,
+            )
+        db.commit()
+    return created
+
+
+def _seed_clients(db: Session, rng: random.Random, cfg: SeedConfig) -> list[int]:
+    run_tag = uuid4().hex[:8]
+    rows = [
+        {
+            "name": f"Synthetic Client {run_tag}-{index:04d}",
+            "reimbursement_amount": Decimal(rng.choice([500, 750, 1000, 1500, 2000])),
+        }
+        for index in range(cfg.clients)
+    ]
+    ids: list[int] = []
+    for batch in _chunks(rows, cfg.batch_size):
+        ids.extend(db.scalars(insert(ClientAccount).returning(ClientAccount.id), batch).all())
+        db.commit()
+    return ids
+
+
+def _event_rows(rng: random.Random, cfg: SeedConfig, user_ids: list[int], client_ids: list[int]) -> Iterator[dict]:
+    # Whole months (the payroll window, this month and two ahead) and only the
+    # first 23 days of each, drawn with a fixed number of random calls per row:
+    # every month then holds the same rows whatever today's date, and no event
+    # spills into the next month, so route query counts do not drift by day.
+    window_start = _shift_months(_month_start(date.today()), -cfg.payroll_months)
+    window_months = cfg.payroll_months + 3
+    for _ in range(cfg.events):
+        event_type = _weighted(rng, EVENT_TYPE_WEIGHTS)
+        user_id = rng.choice(user_ids)
+        month = _shift_months(window_start, int(rng.random() * window_months))
+        day = month + timedelta(days=int(rng.random() * 23))
+        all_day = event_type in {"Leave", "Hospital", "Client Visit"} or rng.random() < 0.3
+        if all_day:
+            start_ts = datetime.combine(day, datetime.min.time())
+            end_ts = start_ts + timedelta(days=rng.choice([1, 1, 1, 2, 3, 5]))
+        else:
+            start_ts = datetime.combine(day, datetime.min.time()) + timedelta(hours=rng.randint(8, 16))
+            end_ts = start_ts + timedelta(minutes=rng.choice([30, 60, 90, 120]))
+
+        client_id = None
+        one_time_client_name = None
+        if event_type == "Client Visit":
+            if rng.random() < 0.9 and client_ids:
+                client_id = rng.choice(client_ids)
+            else:
+                one_time_client_name = f"Walk-in Client {rng.randint(1, 500)}"
+        elif event_type == "Meeting" and client_ids and rng.random() < 0.3:
+            client_id = rng.choice(client_ids)
+
+        status = _weighted(rng, LEAVE_STATUS_WEIGHTS) if event_type in {"Leave", "Hospital"} else "approved"
+        yield {
+            "user_id": user_id,
+            "start_ts": start_ts,
+            "end_ts": end_ts,
+            "all_day": all_day,
+            "type": event_type,
+            "client_id": client_id,
+            "one_time_client_name": one_time_client_name,
+            "note": None,
+            "status": status,
+            "requested_by_id": user_id if event_type in {"Leave", "Hospital"} else None,
+            "created_at": start_ts - timedelta(days=rng.randint(0, 14)),
+            "updated_at": start_ts,
+        }
+
+
+def _daily_activity_rows(rng: random.Random, cfg: SeedConfig, user_ids: list[int], client_ids: list[int]) -> Iterator[dict]:
+    today = date.today()
+    span_days = max(1, cfg.payroll_months * 30)
+    for _ in range(cfg.daily_activities):
+        # Skew towards recent days so the dashboard windows are populated.
+        offset = min(span_days - 1, int(rng.expovariate(1 / 45)))
+        activity_date = today - timedelta(days=offset)
+        completed = offset > 0 and rng.random() < 0.8
+        created_at = datetime.combine(activity_date, datetime.min.time()) + timedelta(hours=rng.randint(7, 18))
+        yield {
+            "user_id": rng.choice(user_ids),
+            "client_id": rng.choice(client_ids) if client_ids and rng.random() < 0.6 else None,
+            "post_group_id": uuid4().hex,
+            "activity_date": activity_date,
+            "activity": f"Synthetic activity {rng.randint(1, 10_000_000)}",
+            "completed": completed,
+            "completed_at": created_at + timedelta(hours=2) if completed else None,
+            "created_at": created_at,
+        }
+
+
+def _client_task_rows(rng: random.Random, cfg: SeedConfig, user_ids: list[int], client_ids: list[int]) -> Iterator[dict]:
+    today = date.today()
+    group_id = uuid4().hex
+    for index in range(cfg.client_tasks):
+        if index % 5 == 0:
+            group_id = uuid4().hex
+        completion_date = today + timedelta(days=rng.randint(-365, 60))
+        completed = completion_date < today and rng.random() < 0.85
+        workstream = f"Workstream {rng.randint(1, 12)}"
+        deliverable = f"Deliverable {rng.randint(1, 40)}"
+        yield {
+            "client_id": rng.choice(client_ids),
+            "user_id": rng.choice(user_ids),
+            "task_group_id": group_id,
+            "year": completion_date.year,
+            "quarter": (completion_date.month - 1) // 3 + 1,
+            "workstream": workstream,
+            "deliverable": deliverable,
+            "kpi": None,
+            "task": deliverable,
+            "subtask": f"Synthetic subtask {index}",
+            "completion_date": completion_date,
+            "completed": completed,
+            "completed_at": datetime.combine(completion_date, datetime.min.time()) if completed else None,
+        }
+
+
+def _seed_payroll(db: Session, rng: random.Random, cfg: SeedConfig, users: list[dict]) -> tuple[int, int]:
+    user_ids = [u["id"] for u in users]
+    existing_profiles = {
+        uid for (uid,) in db.query(PayrollProfile.user_id).filter(PayrollProfile.user_id.in_(user_ids)).all()
+    }
+    salaries: dict[int, Decimal] = {}
+    profile_rows: list[dict] = []
+    for uid in user_ids:
+        basic = Decimal(rng.randrange(40_000, 600_000, 500))
+        salaries[uid] = basic
+        if uid in existing_profiles:
+            continue
+        profile_rows.append(
+            {
+                "user_id": uid,
+                "payment_method": "bank_transfer",
+                "bank_name": "Synthetic Bank",
+                "basic_salary": basic,
+                "house_allowance": (basic * Decimal("0.15")).quantize(Decimal("0.01")),
+                "transport_allowance": Decimal("5000.00"),
+            }
+        )
+    profiles = _bulk_insert(db, PayrollProfile, profile_rows, cfg.batch_size)
+
+    actor_id = user_ids[0]
+    current_month = _month_start(date.today())
+
+    def run_rows() -> Iterator[dict]:
+        for month_offset in range(1, cfg.payroll_months + 1):
+            month = _shift_months(current_month, -month_offset)
+            for uid in user_ids:
+                gross = salaries[uid] + Decimal("5000.00")
+                paye = (gross * Decimal("0.25")).quantize(Decimal("0.01"))
+                nssf = min(gross * Decimal("0.06"), Decimal("4320.00")).quantize(Decimal("0.01"))
+                shif = (gross * Decimal("0.0275")).quantize(Decimal("0.01"))
+                ahl = (gross * Decimal("0.015")).quantize(Decimal("0.01"))
+                net = gross - paye - nssf - shif - ahl
+                yield {
+                    "employee_id": uid,
+                    "payroll_month": month,
+                    "pay_date": _shift_months(month, 1) - timedelta(days=1),
+                    "status": "paid",
+                    "employee_confirmed": True,
+                    "gross_cash_pay": gross,
+                    "gross_taxable_pay": gross,
+                    "taxable_income": gross - nssf,
+                    "nssf_employee": nssf,
+                    "nssf_employer": nssf,
+                    "shif_employee": shif,
+                    "ahl_employee": ahl,
+                    "ahl_employer": ahl,
+                    "paye_before_reliefs": paye + Decimal("2400.00"),
+                    "paye_after_reliefs": paye,
+                    "personal_relief": Decimal("2400.00"),
+                    "net_pay": net,
+                    "employer_total_cost": gross + nssf + ahl,
+                    "breakdown_json": "{}",
+                    "created_by_id": actor_id,
+                    "updated_by_id": actor_id,
+                }
+
+    runs = _bulk_insert(db, PayrollRun, run_rows(), cfg.batch_size)
+    return profiles, runs
+
+
+def _seed_reimbursements(db: Session, rng: random.Random, cfg: SeedConfig, user_ids: list[int]) -> tuple[int, int]:
+    if cfg.reimbursement_items <= 0:
+        return 0, 0
+    visits = db.execute(
+        select(Event.id, Event.user_id, Event.start_ts, Event.client_id)
+        .where(
+            Event.user_id.in_(user_ids),
+            Event.type == "Client Visit",
+            Event.client_id.isnot(None),
+            Event.start_ts < datetime.combine(date.today(), datetime.min.time()),
+        )
+        .order_by(Event.id.asc())
+        .limit(cfg.reimbursement_items)
+    ).all()
+
+    by_period: dict[tuple[int, date, date], list] = {}
+    for row in visits:
+        visit_day = row.start_ts.date()
+        # Half-month buckets roughly match the reimbursement cadence.
+        if visit_day.day <= 15:
+            period = (date(visit_day.year, visit_day.month, 1), date(visit_day.year, visit_day.month, 15))
+        else:
+            period = (date(visit_day.year, visit_day.month, 16), _shift_months(visit_day, 1) - timedelta(days=1))
+        by_period.setdefault((row.user_id, period[0], period[1]), []).append(row)
+
+    request_count = 0
+    item_count = 0
+    for (user_id, period_start, period_end), rows in by_period.items():
+        status = rng.choice(["pending_approval", "approved", "reimbursed"])
+        req = CashReimbursementRequest(
+            user_id=user_id,
+            period_start=period_start,
+            period_end=period_end,
+            total_amount=Decimal("1000.00") * len(rows),
+            status=status,
+            submitted_at=datetime.combine(period_end, datetime.min.time()),
+        )
+        db.add(req)
+        db.flush()
+        db.execute(
+            insert(CashReimbursementItem),
+            [
+                {
+                    "request_id": req.id,
+                    "item_date": row.start_ts.date(),
+                    "description": "Client visit",
+                    "amount": Decimal("1000.00"),
+                    "client_id": row.client_id,
+                    "source_event_id": row.id,
+                    "review_status": "approved" if status != "pending_approval" else "pending",
+                }
+                for row in rows
+            ],
+        )
+        request_count += 1
+        item_count += len(rows)
+        if request_count % 200 == 0:
+            db.commit()
+    db.commit()
+    return request_count, item_count
+
+
+def seed_database(db: Session, cfg: SeedConfig, log=print) -> SeedSummary:
+    rng = random.Random(cfg.seed)
+    summary = SeedSummary()
+
+    def step(label: str, fn):
+        started = time.perf_counter()
+        result = fn()
+        log(f"  {label}: {time.perf_counter() - started:.1f}s")
+        return result
+
+    step("departments", lambda: _seed_departments(db))
+    users = step("users", lambda: _seed_users(db, rng, cfg))
+    summary.users = len(users)
+    user_ids = [u["id"] for u in users]
+    if not user_ids:
+        return summary
+
+    client_ids = step("clients", lambda: _seed_clients(db, rng, cfg))
+    summary.clients = len(client_ids)
+    summary.events = step(
+        "events",
+        lambda: _bulk_insert(db, Event, _event_rows(rng, cfg, user_ids, client_ids), cfg.batch_size),
+    )
+    summary.daily_activities = step(
+        "daily activities",
+        lambda: _bulk_insert(db, DailyActivity, _daily_activity_rows(rng, cfg, user_ids, client_ids), cfg.batch_size),
+    )
+    if client_ids:
+        summary.client_tasks = step(
+            "client tasks",
+            lambda: _bulk_insert(db, ClientTask, _client_task_rows(rng, cfg, user_ids, client_ids), cfg.batch_size),
+        )
+    summary.payroll_profiles, summary.payroll_runs = step("payroll", lambda: _seed_payroll(db, rng, cfg, users))
+    summary.reimbursement_requests, summary.reimbursement_items = step(
+        "reimbursements",
+        lambda: _seed_reimbursements(db, rng, cfg, user_ids),
+    )
+    return summary
+
+
+def _parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    defaults = SeedConfig()
+    parser = argparse.ArgumentParser(description="Seed a local database with synthetic benchmark data.")
+    parser.add_argument("--users", type=int, default=defaults.users)
+    parser.add_argument("--events", type=int, default=defaults.events)
+    parser.add_argument("--daily-activities", type=int, default=defaults.daily_activities)
+    parser.add_argument("--client-tasks", type=int, default=defaults.client_tasks)
+    parser.add_argument("--payroll-months", type=int, default=defaults.payroll_months)
+    parser.add_argument("--clients", type=int, default=defaults.clients)
+    parser.add_argument("--reimbursement-items", type=int, default=defaults.reimbursement_items)
+    parser.add_argument("--batch-size", type=int, default=defaults.batch_size)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    return parser.parse_args(argv)
+
+
+def main(argv: list[str] | None = None) -> None:
+    if settings.is_production:
+        raise SystemExit("Refusing to seed synthetic data while APP_ENV=production.")
+
+    args = _parse_args(argv)
+    cfg = SeedConfig(
+        users=args.users,
+        events=args.events,
+        daily_activities=args.daily_activities,
+        client_tasks=args.client_tasks,
+        payroll_months=args.payroll_months,
+        clients=args.clients,
+        reimbursement_items=args.reimbursement_items,
+        batch_size=args.batch_size,
+        seed=args.seed,
+    )
+
+    Base.metadata.create_all(bind=engine)
+    print(f"Seeding {engine.url.render_as_string(hide_password=True)} ...")
+    db = SessionLocal()
+    try:
+        summary = seed_database(db, cfg)
+    finally:
+        db.close()
+
+    for field, value in vars(summary).items():
+        print(f"{field}: {value}")
+    print(f"Benchmark accounts use the password '{BENCH_PASSWORD}'.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+import os
+import tempfile
+from pathlib import Path
+
+# The fixture database must be configured before any app module is imported.
+_FIXTURE_DIR = Path(tempfile.mkdtemp(prefix="spc-perf-"))
+os.environ["DATABASE_URL"] = os.environ.get("PERF_TEST_DATABASE_URL") or f"sqlite:///{_FIXTURE_DIR / 'fixture.db'}"
+os.environ.setdefault("APP_ENV", "development")
+
+import pytest  # noqa: E402
+
+from app.db import Base, SessionLocal, engine  # noqa: E402
+from app.models import ClientAccount, User  # noqa: E402
+from app.security import create_access_token  # noqa: E402
+from app.storage import object_storage  # noqa: E402
+from perf.bench import QueryCounter, build_client  # noqa: E402
+from perf.seed import BENCH_EMPLOYEE_EMAIL, SeedConfig, seed_database  # noqa: E402
+from tests.local_s3 import LocalS3Server  # noqa: E402
+
+FIXTURE_SEED = SeedConfig(
+    users=120,
+    events=6000,
+    daily_activities=3000,
+    client_tasks=1200,
+    payroll_months=3,
+    clients=25,
+    reimbursement_items=400,
+    batch_size=2000,
+    seed=7,
+)
+
+
+def pytest_addoption(parser):
+    parser.addoption(
+        "--update-perf-baseline",
+        action="store_true",
+        default=False,
+        help="Record measured route latencies as the new perf baseline instead of asserting against it.",
+    )
+
+
+@pytest.fixture(scope="session")
+def seeded_db():
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        seed_database(db, FIXTURE_SEED, log=lambda *_: None)
+        employee = db.query(User).filter(User.email == BENCH_EMPLOYEE_EMAIL).one()
+        client = db.query(ClientAccount).order_by(ClientAccount.id.asc()).first()
+        ids = {"employee_id": employee.id, "client_id": client.id}
+    finally:
+        db.close()
+    yield ids
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def api_client(seeded_db):
+    return build_client()
+
+
+@pytest.fixture(scope="session")
+def query_counter():
+    counter = QueryCounter(engine)
+    counter.install()
+    yield counter
+    counter.remove()
+
+
+@pytest.fixture(scope="session")
+def auth_headers():
+    def _headers(email: str) -> dict[str, str]:
+        return {"Authorization": f"Bearer {create_access_token(email)}"}
+
+    return _headers
+
+
+@pytest.fixture(scope="session")
+def local_s3_server():
+    server = LocalS3Server().start()
+    yield server
+    server.stop()
+
+
+@pytest.fixture
+def local_s3(local_s3_server, monkeypatch):
+    """Point the app's object storage at the in-process S3 stand-in."""
+    local_s3_server.objects.clear()
+    local_s3_server.requests.clear()
+    monkeypatch.setattr(object_storage, "enabled", True)
+    monkeypatch.setattr(object_storage, "bucket", local_s3_server.bucket)
+    monkeypatch.setattr(object_storage, "client", local_s3_server.client())
+    return local_s3_server
@@ -0,0 +1,201 @@
+"""A small in-process S3-compatible server for exercising the real boto3 client.
+
+It understands path-style object PUT/GET/HEAD/DELETE, single byte ranges,
+If-None-Match, user metadata and multipart uploads. Signatures are not
+checked, so presigned URLs resolve as long as bucket and key are right.
+"""
+from __future__ import annotations
+
+import hashlib
+import re
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+from uuid import uuid4
+
+import boto3
+from botocore.config import Config
+
+_RANGE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_PART = re.compile(r"<PartNumber>(\d+)</PartNumber>")
+
+
+@dataclass
+class StoredObject:
+    body: bytes
+    content_type: str
+    metadata: dict[str, str]
+    modified: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+
+    @property
+    def etag(self) -> str:
+        return f'"{hashlib.md5(self.body).hexdigest()}"'
+
+
+class LocalS3Server:
+    def __init__(self, bucket: str = "test-bucket") -> None:
+        self.bucket = bucket
+        self.objects: dict[str, StoredObject] = {}
+        self.requests: list[tuple[str, str]] = []
+        self._uploads: dict[str, dict[int, bytes]] = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def endpoint_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "LocalS3Server":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def client(self):
+        return boto3.client(
+            "s3",
+            endpoint_url=self.endpoint_url,
+            aws_access_key_id="test",
+            aws_secret_access_key="test",
+            region_name="auto",
+            config=Config(
+                s3={"addressing_style": "path"},
+                request_checksum_calculation="when_required",
+                response_checksum_validation="when_required",
+            ),
+        )
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *_args) -> None:
+                return
+
+            def _target(self) -> tuple[str, dict[str, list[str]]]:
+                parts = urlsplit(self.path)
+                bucket, _, key = unquote(parts.path).lstrip("/").partition("/")
+                if bucket != server.bucket:
+                    return "", {}
+                return key, parse_qs(parts.query, keep_blank_values=True)
+
+            def _body(self) -> bytes:
+                length = int(self.headers.get("Content-Length") or 0)
+                return self.rfile.read(length) if length else b""
+
+            def _reply(self, status: int, body: bytes = b"", headers: dict[str, str] | None = None) -> None:
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if body and self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def _error(self, status: int, code: str) -> None:
+                body = f"<Error><Code>{code}</Code><Message>{code}</Message></Error>".encode()
+                self._reply(status, body, {"Content-Type": "application/xml"})
+
+            def do_PUT(self) -> None:
+                key, query = self._target()
+                server.requests.append(("PUT", key))
+                body = self._body()
+                if "uploadId" in query:
+                    with server._lock:
+                        server._uploads[query["uploadId"][0]][int(query["partNumber"][0])] = body
+                    self._reply(200, headers={"ETag": f'"{hashlib.md5(body).hexdigest()}"'})
+                    return
+                metadata = {
+                    name[len("x-amz-meta-"):]: value
+                    for name, value in self.headers.items()
+                    if name.lower().startswith("x-amz-meta-")
+                }
+                obj = StoredObject(body, self.headers.get("Content-Type") or "binary/octet-stream", metadata)
+                with server._lock:
+                    server.objects[key] = obj
+                self._reply(200, headers={"ETag": obj.etag})
+
+            def do_POST(self) -> None:
+                key, query = self._target()
+                server.requests.append(("POST", key))
+                body = self._body()
+                if "uploads" in query:
+                    upload_id = uuid4().hex
+                    with server._lock:
+                        server._uploads[upload_id] = {}
+                    xml = (
+                        "<InitiateMultipartUploadResult>"
+                        f"<Bucket>{server.bucket}</Bucket><Key>{key}</Key><UploadId>{upload_id}</UploadId>"
+                        "</InitiateMultipartUploadResult>"
+                    )
+                    self._reply(200, xml.encode(), {"Content-Type": "application/xml"})
+                    return
+                if "uploadId" in query:
+                    with server._lock:
+                        parts = server._uploads.pop(query["uploadId"][0])
+                        numbers = [int(n) for n in _PART.findall(body.decode())]
+                        obj = StoredObject(b"".join(parts[n] for n in numbers), "binary/octet-stream", {})
+                        server.objects[key] = obj
+                    xml = f"<CompleteMultipartUploadResult><Key>{key}</Key><ETag>{obj.etag}</ETag></CompleteMultipartUploadResult>"
+                    self._reply(200, xml.encode(), {"Content-Type": "application/xml"})
+                    return
+                self._error(400, "InvalidRequest")
+
+            def do_DELETE(self) -> None:
+                key, query = self._target()
+                server.requests.append(("DELETE", key))
+                with server._lock:
+                    if "uploadId" in query:
+                        server._uploads.pop(query["uploadId"][0], None)
+                    else:
+                        server.objects.pop(key, None)
+                self._reply(204)
+
+            def do_HEAD(self) -> None:
+                self.do_GET()
+
+            def do_GET(self) -> None:
+                key, _query = self._target()
+                server.requests.append((self.command, key))
+                obj = server.objects.get(key)
+                if obj is None:
+                    self._error(404, "NoSuchKey")
+                    return
+                headers = {
+                    "Content-Type": obj.content_type,
+                    "ETag": obj.etag,
+                    "Last-Modified": formatdate(obj.modified.timestamp(), usegmt=True),
+                    "Accept-Ranges": "bytes",
+                }
+                headers.update({f"x-amz-meta-{name}": value for name, value in obj.metadata.items()})
+                if_none_match = self.headers.get("If-None-Match")
+                if if_none_match and obj.etag in [tag.strip() for tag in if_none_match.split(",")]:
+                    self._reply(304, headers={"ETag": obj.etag})
+                    return
+
+                body = obj.body
+                match = _RANGE.match(self.headers.get("Range") or "")
+                if match and (match.group(1) or match.group(2)):
+                    size = len(body)
+                    if match.group(1):
+                        start = int(match.group(1))
+                        end = min(int(match.group(2)) if match.group(2) else size - 1, size - 1)
+                    else:
+                        start, end = max(0, size - int(match.group(2))), size - 1
+                    if start >= size or start > end:
+                        headers["Content-Range"] = f"bytes */{size}"
+                        self._error(416, "InvalidRange")
+                        return
+                    headers["Content-Range"] = f"bytes {start}-{end}/{size}"
+                    self._reply(206, body[start : end + 1], headers)
+                    return
+                self._reply(200, body, headers)
+
+        return Handler
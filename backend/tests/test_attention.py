@@ -0,0 +1,89 @@
+from app import main
+from app.attention import AttentionNotifier, finance_attention_counts
+from app.db import SessionLocal
+from app.models import (
+    AuthorityToIncurRequest,
+    CashReimbursementRequest,
+    CashRequisitionRequest,
+    SalaryAdvanceRequest,
+    User,
+)
+from perf.seed import BENCH_EMPLOYEE_EMAIL, BENCH_FINANCE_EMAIL
+
+
+def _recording_notifier(sent: list) -> AttentionNotifier:
+    return AttentionNotifier(lambda message, topics: sent.append((message, topics)), SessionLocal, window_seconds=0)
+
+
+def test_finance_change_pushes_each_roles_counts(api_client, auth_headers, monkeypatch):
+    sent: list = []
+    monkeypatch.setattr(main, "attention", _recording_notifier(sent))
+    finance_headers = auth_headers(BENCH_FINANCE_EMAIL)
+    before = api_client.get("/finance/attention", headers=finance_headers).json()
+
+    employee = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    response = api_client.post("/finance/salary-advances", json={"amount": 1500, "reason": "Rent"}, headers=employee)
+    assert response.status_code == 200, response.text
+    try:
+        (reviewer, reviewer_topics), (executive, executive_topics) = sent
+        assert reviewer_topics == ["role:finance"]
+        assert executive_topics == ["role:admin", "role:ceo"]
+        assert reviewer["type"] == executive["type"] == "finance_attention"
+        assert reviewer["salary_advance"] == before["salary_advance"] + 1
+        assert reviewer["total"] == api_client.get("/finance/attention", headers=finance_headers).json()["total"]
+    finally:
+        withdrawn = api_client.delete(f"/finance/salary-advances/{response.json()['id']}", headers=employee)
+        assert withdrawn.status_code == 204
+    assert sent[-2][0]["total"] == before["total"]
+
+
+def test_payroll_marks_push_employee_and_admin_counts(seeded_db, api_client, auth_headers):
+    sent: list = []
+    notifier = _recording_notifier(sent)
+    notifier.mark(payroll_users=[seeded_db["employee_id"], None])
+    notifier.mark()
+
+    (admin, admin_topics), (own, own_topics) = sent
+    assert admin_topics == ["finance"] and own_topics == [f"user:{seeded_db['employee_id']}"]
+    expected_own = api_client.get("/payroll/attention", headers=auth_headers(BENCH_EMPLOYEE_EMAIL)).json()
+    expected_admin = api_client.get("/payroll/admin-attention", headers=auth_headers(BENCH_FINANCE_EMAIL)).json()
+    assert own == dict(expected_own, type="payroll_attention")
+    assert admin == dict(expected_admin, type="payroll_admin_attention")
+    assert notifier.stats()["recomputes_total"] == 1
+
+
+def test_role_topic_is_offered_to_every_socket():
+    assert "role:finance" in main._ws_topics_for(User(id=3, role="finance"))
+    assert main._ws_topics_for(User(id=4, role="employee"), "role") == ["user:4", "role:employee"]
+
+
+def test_finance_counts_match_per_table_counts(seeded_db):
+    db = SessionLocal()
+    try:
+        counts = finance_attention_counts(db)
+
+        def count(model, *conditions):
+            return db.query(model.id).filter(*conditions).count()
+
+        pending = CashReimbursementRequest.status == "pending_approval"
+        assert counts["finance"].cash_reimbursement == count(
+            CashReimbursementRequest, pending, CashReimbursementRequest.finance_decision.is_(None)
+        )
+        assert counts["approver"].cash_reimbursement == count(
+            CashReimbursementRequest, pending, CashReimbursementRequest.ceo_decision.is_(None)
+        )
+        for model, field in ((AuthorityToIncurRequest, "authority_to_incur"), (SalaryAdvanceRequest, "salary_advance")):
+            assert getattr(counts["finance"], field) == count(
+                model, model.status.in_(["pending_finance_review", "pending_parallel_approval"])
+            )
+            assert getattr(counts["approver"], field) == count(
+                model, model.status.in_(["pending_ceo_approval", "pending_parallel_approval"])
+            )
+        assert counts["finance"].cash_requisition == count(
+            CashRequisitionRequest, CashRequisitionRequest.status == "pending_finance_review"
+        )
+        for view in counts.values():
+            assert view.total == view.cash_reimbursement + view.cash_requisition + view.authority_to_incur + view.salary_advance
+        assert counts["finance"].total > 0
+    finally:
+        db.close()
@@ -0,0 +1,66 @@
+from app.deps import AuthUserCache
+from app.models import User
+
+
+def _user(user_id: int, email: str, role: str = "employee") -> User:
+    return User(id=user_id, name=f"User {user_id}", email=email, password_hash="x", role=role)
+
+
+def test_cache_returns_snapshot_until_invalidated():
+    cache = AuthUserCache(ttl_seconds=60, max_entries=10)
+    cache.put("a@example.com", _user(1, "a@example.com", role="admin"), cache.generation)
+
+    assert cache.get("a@example.com")["role"] == "admin"
+
+    cache.invalidate_user(1)
+    assert cache.get("a@example.com") is None
+
+
+def test_cache_drops_a_load_that_started_before_an_invalidation():
+    cache = AuthUserCache(ttl_seconds=60, max_entries=10)
+    generation = cache.generation
+    stale = _user(1, "a@example.com", role="admin")
+
+    cache.invalidate_user(1)
+    cache.put("a@example.com", stale, generation)
+    assert cache.get("a@example.com") is None
+
+    cache.put("a@example.com", _user(1, "a@example.com", role="finance"), cache.generation)
+    assert cache.get("a@example.com")["role"] == "finance"
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = AuthUserCache(ttl_seconds=60, max_entries=2)
+    cache.put("a@example.com", _user(1, "a@example.com"), cache.generation)
+    cache.put("b@example.com", _user(2, "b@example.com"), cache.generation)
+    cache.get("a@example.com")
+    cache.put("c@example.com", _user(3, "c@example.com"), cache.generation)
+
+    assert cache.get("a@example.com") is not None
+    assert cache.get("b@example.com") is None
+    assert cache.get("c@example.com") is not None
+
+
+def test_cache_expires_entries_after_ttl(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("app.deps.time.monotonic", lambda: now[0])
+    cache = AuthUserCache(ttl_seconds=30, max_entries=10)
+    cache.put("a@example.com", _user(1, "a@example.com"), cache.generation)
+
+    now[0] += 31
+    assert cache.get("a@example.com") is None
+
+
+def test_role_change_is_visible_on_next_request(seeded_db, api_client, auth_headers):
+    from perf.seed import BENCH_ADMIN_EMAIL, BENCH_EMPLOYEE_EMAIL
+
+    employee_headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    assert api_client.get("/me", headers=employee_headers).json()["role"] == "employee"
+
+    path = f"/admin/users/{seeded_db['employee_id']}/profile"
+    admin_headers = auth_headers(BENCH_ADMIN_EMAIL)
+    try:
+        assert api_client.patch(path, json={"role": "finance"}, headers=admin_headers).status_code == 200
+        assert api_client.get("/me", headers=employee_headers).json()["role"] == "finance"
+    finally:
+        api_client.patch(path, json={"role": "employee"}, headers=admin_headers)
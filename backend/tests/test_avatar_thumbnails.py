@@ -0,0 +1,79 @@
+import io
+
+from PIL import Image
+
+from app import main
+from app.thumbnails import AVATAR_THUMBNAIL_SIZES, avatar_thumbnail_name
+from perf.seed import BENCH_SUPERVISOR_EMAIL
+
+
+def _photo(width: int = 640, height: int = 480) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (200, 40, 90)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _upload(api_client, auth_headers, body: bytes) -> str:
+    response = api_client.post(
+        "/users/me/avatar",
+        files={"file": ("me.jpg", body, "image/jpeg")},
+        headers=auth_headers(BENCH_SUPERVISOR_EMAIL),
+    )
+    assert response.status_code == 200
+    return response.json()["avatar_url"].rsplit("/", 1)[-1]
+
+
+def _cleanup(file_name: str) -> None:
+    for name in [file_name] + [avatar_thumbnail_name(file_name, size) for size in AVATAR_THUMBNAIL_SIZES]:
+        (main.AVATARS_DIR / name).unlink(missing_ok=True)
+
+
+def test_upload_generates_square_webp_variants(api_client, auth_headers, query_counter):
+    file_name = _upload(api_client, auth_headers, _photo())
+    try:
+        for size in AVATAR_THUMBNAIL_SIZES:
+            with Image.open(main.AVATARS_DIR / avatar_thumbnail_name(file_name, size)) as thumbnail:
+                assert thumbnail.format == "WEBP"
+                assert thumbnail.size == (size, size)
+
+        with query_counter.measure() as measured:
+            response = api_client.get(f"/avatars/{file_name}", params={"size": 40})
+        assert response.status_code == 200
+        assert measured["queries"] == 0  # the thumbnail is on disk; no registry lookup
+        assert response.headers["content-type"] == "image/webp"
+        assert response.headers["cache-control"] == main.AVATAR_CACHE_CONTROL
+        with Image.open(io.BytesIO(response.content)) as served:
+            assert served.size == (64, 64)
+
+        revalidated = api_client.get(
+            f"/avatars/{file_name}", params={"size": 40}, headers={"If-None-Match": response.headers["etag"]}
+        )
+        assert revalidated.status_code == 304
+        assert revalidated.headers["cache-control"] == main.AVATAR_CACHE_CONTROL
+
+        original = api_client.get(f"/avatars/{file_name}", params={"size": 512})
+        assert original.headers["content-type"] == "image/jpeg"
+    finally:
+        _cleanup(file_name)
+
+
+def test_replacing_avatar_removes_old_variants(api_client, auth_headers):
+    first = _upload(api_client, auth_headers, _photo())
+    second = _upload(api_client, auth_headers, _photo(300, 300))
+    try:
+        assert not (main.AVATARS_DIR / avatar_thumbnail_name(first, 64)).exists()
+        assert (main.AVATARS_DIR / avatar_thumbnail_name(second, 64)).exists()
+    finally:
+        _cleanup(first)
+        _cleanup(second)
+
+
+def test_avatar_without_variants_falls_back_to_original(api_client):
+    path = main.AVATARS_DIR / "legacy-avatar.jpg"
+    path.write_bytes(_photo(50, 50))
+    try:
+        response = api_client.get("/avatars/legacy-avatar.jpg", params={"size": 32})
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "image/jpeg"
+    finally:
+        path.unlink()
@@ -0,0 +1,50 @@
+import asyncio
+import json
+import threading
+
+from app.broadcast_bus import NOTIFY_MAX_PAYLOAD_BYTES, BroadcastBus, PostgresBroadcastBus
+
+
+def test_notification_reaches_other_workers_but_not_its_origin():
+    received_a: list = []
+    received_b: list = []
+    worker_a = PostgresBroadcastBus(lambda *args: received_a.append(args), "spc_test")
+    worker_b = PostgresBroadcastBus(lambda *args: received_b.append(args), "spc_test")
+
+    payload = {"type": "events_changed", "action": "created", "event_id": 5}
+    message = worker_a._encode(payload, ["calendar", "user:3"], ["user:1"])
+    worker_a._handle_notification(message)
+    worker_b._handle_notification(message)
+
+    assert received_a == []
+    assert received_b == [(payload, ["calendar", "user:3"], ["user:1"])]
+    assert worker_b.stats()["received_total"] == 1
+
+
+def test_oversized_payload_is_cut_down_to_scalar_fields():
+    bus = PostgresBroadcastBus(lambda *args: None, "spc_test")
+    payload = {"type": "events_changed", "event_id": 9, "event": {"note": "x" * 20_000}}
+    message = bus._encode(payload, None)
+    assert len(message.encode()) <= NOTIFY_MAX_PAYLOAD_BYTES
+    assert json.loads(message)["p"] == {"type": "events_changed", "event_id": 9, "truncated": True}
+    assert bus.stats()["oversized_total"] == 1
+
+
+def test_publish_from_a_worker_thread_is_handed_to_the_event_loop():
+    async def scenario():
+        delivered: list = []
+        loop = asyncio.get_running_loop()
+
+        def deliver(payload, topics, exclude):
+            delivered.append((payload["type"], asyncio.get_running_loop() is loop))
+
+        bus = BroadcastBus(deliver)
+        bus.start(loop)
+        thread = threading.Thread(target=bus.publish, args=({"type": "from_thread"}, ["finance"]))
+        thread.start()
+        thread.join()
+        bus.publish({"type": "from_loop"})
+        await asyncio.sleep(0.01)
+        assert sorted(delivered) == [("from_loop", True), ("from_thread", True)]
+
+    asyncio.run(scenario())
@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta
+
+from app import main
+from app.change_notifier import EventChangeNotifier
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+MONDAY = datetime(2026, 1, 5, 9, 0)
+
+
+def test_burst_within_window_becomes_one_message():
+    async def scenario():
+        sent: list = []
+        notifier = EventChangeNotifier(lambda message, topics: sent.append((message, topics)), window_seconds=0.05)
+        for week in range(52):
+            start = MONDAY + timedelta(weeks=week)
+            notifier.add("created", 100 + week, start, start + timedelta(hours=1), ["calendar", "user:3"])
+        notifier.add("updated", 7, MONDAY - timedelta(days=2), MONDAY, ["calendar", "approvers"])
+        assert sent == []
+
+        await asyncio.sleep(0.1)
+        assert len(sent) == 1
+        message, topics = sent[0]
+        assert message["action"] == "batch"
+        assert message["event_ids"][:2] == [100, 101] and len(message["event_ids"]) == 53
+        assert message["changes"]["updated"] == [7]
+        assert message["start"] == (MONDAY - timedelta(days=2)).isoformat()
+        assert message["end"] == (MONDAY + timedelta(weeks=51, hours=1)).isoformat()
+        assert topics == ["approvers", "calendar", "user:3"]
+
+        notifier.add("deleted", 9, MONDAY, MONDAY, ["calendar"])
+        await asyncio.sleep(0.1)
+        assert sent[1][0]["action"] == "deleted"
+        assert sent[1][0]["event_id"] == 9
+        assert notifier.stats()["messages_total"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_ids_are_capped_and_changes_outside_a_loop_go_out_at_once():
+    sent: list = []
+    notifier = EventChangeNotifier(lambda message, topics: sent.append(message), window_seconds=1, max_ids=3)
+    notifier.add("created", 1, None, None, ["calendar"])
+    assert len(sent) == 1
+
+    async def burst():
+        for event_id in range(10):
+            notifier.add("created", event_id, MONDAY, MONDAY, ["calendar"])
+        notifier.flush()
+
+    asyncio.run(burst())
+    assert sent[1]["event_ids"] == [0, 1, 2]
+    assert sent[1]["truncated"] is True
+
+
+def test_reviewers_get_their_own_copy_of_changed_events():
+    sent: list = []
+    notifier = EventChangeNotifier(lambda *args: sent.append(args), window_seconds=0)
+    body = {"id": 5, "status": "pending", "can_current_user_approve": False}
+    notifier.add(
+        "created",
+        5,
+        MONDAY,
+        MONDAY,
+        ["calendar", "approvers"],
+        body=body,
+        overrides={2: {"can_current_user_approve": True}},
+    )
+
+    shared, variant = sent
+    assert shared[0]["events"] == [body]
+    assert shared[1:] == (["approvers", "calendar"], ["user:2"])
+    assert variant[0]["events"] == [dict(body, can_current_user_approve=True)]
+    assert variant[1] == ["user:2"]
+
+    sent.clear()
+    notifier.add("created", 6, MONDAY, MONDAY, ["calendar"])
+    assert "events" not in sent[0][0]
+
+
+def test_leave_request_reaches_its_approvers_with_their_permissions(api_client, auth_headers, monkeypatch):
+    sent: list = []
+    monkeypatch.setattr(main, "event_changes", EventChangeNotifier(lambda *args: sent.append(args), window_seconds=0))
+    headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+
+    response = api_client.post(
+        "/leave/requests",
+        json={"start_ts": "2031-03-11T00:00:00", "end_ts": "2031-03-12T00:00:00", "all_day": True},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    leave = response.json()
+    try:
+        shared, *variants = sent
+        assert shared[0]["events"][0]["id"] == leave["id"]
+        assert shared[0]["events"][0]["can_current_user_approve"] is False
+        assert shared[0]["events"][0]["first_approver_name"] == leave["first_approver_name"]
+        assert variants and sorted(topic for _, topics in variants for topic in topics) == sorted(shared[2])
+        assert all(message["events"][0]["can_current_user_approve"] for message, _ in variants)
+    finally:
+        assert api_client.delete(f"/events/{leave['id']}", headers=headers).status_code == 200
+    assert sent[-1][0]["changes"] == {"deleted": [leave["id"]]}
@@ -0,0 +1,96 @@
+from urllib.request import urlopen
+
+from app import main
+from app.config import settings
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+PAYLOAD = bytes(range(256)) * 1024  # 256 KiB, several download chunks
+REMOTE_KEY = main._avatar_key("remote.pdf")
+
+
+def _put_remote(local_s3) -> str:
+    response = local_s3.client().put_object(
+        Bucket=local_s3.bucket, Key=REMOTE_KEY, Body=PAYLOAD, ContentType="application/pdf"
+    )
+    return response["ETag"]
+
+
+def test_object_download_streams_with_length_and_etag(api_client, local_s3):
+    etag = _put_remote(local_s3)
+    response = api_client.get("/avatars/remote.pdf")
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+    assert response.headers["content-type"] == "application/pdf"
+    assert response.headers["content-length"] == str(len(PAYLOAD))
+    assert response.headers["etag"] == etag
+    assert response.headers["accept-ranges"] == "bytes"
+
+
+def test_object_download_forwards_range(api_client, local_s3):
+    _put_remote(local_s3)
+    response = api_client.get("/avatars/remote.pdf", headers={"Range": "bytes=100-199"})
+    assert response.status_code == 206
+    assert response.content == PAYLOAD[100:200]
+    assert response.headers["content-range"] == f"bytes 100-199/{len(PAYLOAD)}"
+
+    unsatisfiable = api_client.get("/avatars/remote.pdf", headers={"Range": f"bytes={len(PAYLOAD)}-"})
+    assert unsatisfiable.status_code == 416
+
+
+def test_object_download_ignores_multi_range(api_client, local_s3):
+    _put_remote(local_s3)
+    response = api_client.get("/avatars/remote.pdf", headers={"Range": "bytes=0-1,5-9"})
+    assert response.status_code == 200
+    assert response.content == PAYLOAD
+
+
+def test_object_download_not_modified(api_client, local_s3):
+    etag = _put_remote(local_s3)
+    response = api_client.get("/avatars/remote.pdf", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+def test_missing_object_is_404(api_client, local_s3):
+    assert api_client.get("/avatars/missing.pdf").status_code == 404
+
+
+def test_presigned_mode_redirects_to_the_bucket(api_client, local_s3, monkeypatch):
+    _put_remote(local_s3)
+    monkeypatch.setattr(settings, "R2_PRESIGNED_DOWNLOADS", True)
+
+    response = api_client.get("/avatars/remote.pdf", follow_redirects=False)
+    assert response.status_code == 307
+    location = response.headers["location"]
+    assert location.startswith(f"{local_s3.endpoint_url}/{local_s3.bucket}/{REMOTE_KEY}?")
+    assert "Signature=" in location
+    assert local_s3.requests == [("PUT", REMOTE_KEY)]
+
+    with urlopen(location) as redirected:
+        assert redirected.read() == PAYLOAD
+
+
+def test_presigned_mode_still_checks_authorization(api_client, auth_headers, local_s3, monkeypatch):
+    monkeypatch.setattr(settings, "R2_PRESIGNED_DOWNLOADS", True)
+    response = api_client.get(
+        "/files/library/not-registered.pdf",
+        headers=auth_headers(BENCH_EMPLOYEE_EMAIL),
+        follow_redirects=False,
+    )
+    assert response.status_code == 404
+
+
+def test_local_file_range_and_conditional(api_client):
+    path = main.AVATARS_DIR / "local-range.bin"
+    path.write_bytes(PAYLOAD)
+    try:
+        ranged = api_client.get("/avatars/local-range.bin", headers={"Range": "bytes=0-9"})
+        assert ranged.status_code == 206
+        assert ranged.content == PAYLOAD[:10]
+
+        etag = api_client.get("/avatars/local-range.bin").headers["etag"]
+        cached = api_client.get("/avatars/local-range.bin", headers={"If-None-Match": etag})
+        assert cached.status_code == 304
+    finally:
+        path.unlink()
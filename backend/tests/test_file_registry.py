@@ -0,0 +1,92 @@
+from sqlalchemy import event, insert
+
+from app import main
+from app.db import SessionLocal, engine
+from app.file_registry import FILE_KIND_PROFILE_DOCUMENT, backfill_stored_files, find_stored_file
+from app.models import StoredFile, User
+from perf.seed import BENCH_ADMIN_EMAIL, BENCH_EMPLOYEE_EMAIL, BENCH_SUPERVISOR_EMAIL
+
+PDF = b"%PDF-1.4\n" + b"0" * 2048
+
+
+def test_document_access_is_decided_from_the_registry(api_client, auth_headers, query_counter):
+    uploaded = api_client.post(
+        "/users/me/documents/kra_copy",
+        files={"file": ("kra.pdf", PDF, "application/pdf")},
+        headers=auth_headers(BENCH_EMPLOYEE_EMAIL),
+    )
+    assert uploaded.status_code == 200
+    file_name = uploaded.json()["kra_copy_url"].rsplit("/", 1)[-1]
+    path = f"/files/documents/{file_name}"
+    try:
+        db = SessionLocal()
+        try:
+            stored = find_stored_file(db, FILE_KIND_PROFILE_DOCUMENT, file_name)
+            owner_id = db.query(User.id).filter(User.email == BENCH_EMPLOYEE_EMAIL).scalar()
+            assert stored.owner_user_id == owner_id
+            assert stored.size_bytes == len(PDF)
+        finally:
+            db.close()
+
+        owner_headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+        api_client.get(path, headers=owner_headers)
+        with query_counter.measure() as measured:
+            assert api_client.get(path, headers=owner_headers).content == PDF
+        assert measured["queries"] <= 2  # authenticated user (cached) + one registry lookup
+
+        assert api_client.get(path, headers=auth_headers(BENCH_SUPERVISOR_EMAIL)).status_code == 403
+        assert api_client.get(path, headers=auth_headers(BENCH_ADMIN_EMAIL)).status_code == 200
+        assert api_client.get("/files/documents/unknown.pdf", headers=owner_headers).status_code == 404
+    finally:
+        (main.DOCUMENTS_DIR / file_name).unlink(missing_ok=True)
+
+
+def test_backfill_registers_files_from_existing_urls(seeded_db):
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_SUPERVISOR_EMAIL).one()
+        user.bio_data_form_url = "https://api.example.com/files/documents/legacy-bio.pdf"
+        db.commit()
+
+        assert backfill_stored_files(db) >= 1
+        stored = find_stored_file(db, FILE_KIND_PROFILE_DOCUMENT, "legacy-bio.pdf")
+        assert stored.owner_user_id == user.id
+        assert stored.acl == "owner"
+        assert backfill_stored_files(db) == 0
+    finally:
+        db.query(StoredFile).filter(StoredFile.file_name == "legacy-bio.pdf").delete()
+        user.bio_data_form_url = None
+        db.commit()
+        db.close()
+
+
+def test_backfill_skips_rows_another_worker_registered_meanwhile(seeded_db):
+    db = SessionLocal()
+    user = db.query(User).filter(User.email == BENCH_SUPERVISOR_EMAIL).one()
+    user.bank_details_form_url = "https://api.example.com/files/documents/racing-bank.pdf"
+    db.commit()
+
+    raced: list[bool] = []
+
+    def register_first(conn, cursor, statement, *_args):
+        # Another worker's backfill lands between our scan and our insert.
+        if statement.startswith("INSERT INTO stored_files") and not raced:
+            raced.append(True)
+            with engine.begin() as other:
+                other.execute(
+                    insert(StoredFile).values(
+                        kind=FILE_KIND_PROFILE_DOCUMENT, file_name="racing-bank.pdf", acl="owner", owner_user_id=user.id
+                    )
+                )
+
+    event.listen(engine, "before_cursor_execute", register_first)
+    try:
+        assert backfill_stored_files(db) == 0 and raced
+        assert find_stored_file(db, FILE_KIND_PROFILE_DOCUMENT, "racing-bank.pdf") is not None
+    finally:
+        event.remove(engine, "before_cursor_execute", register_first)
+        db.rollback()
+        db.query(StoredFile).filter(StoredFile.file_name == "racing-bank.pdf").delete()
+        user.bank_details_form_url = None
+        db.commit()
+        db.close()
@@ -0,0 +1,89 @@
+import hashlib
+
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from app import main
+from app.config import settings
+from app.uploads import RequestBodyLimitMiddleware
+from perf.seed import BENCH_FINANCE_EMAIL
+
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 64
+
+
+def _avatar_files() -> set[str]:
+    return {path.name for path in main.AVATARS_DIR.iterdir()}
+
+
+def _upload_avatar(api_client, auth_headers, body: bytes):
+    return api_client.post(
+        "/users/me/avatar",
+        files={"file": ("me.png", body, "image/png")},
+        headers=auth_headers(BENCH_FINANCE_EMAIL),
+    )
+
+
+def test_local_avatar_upload_is_written_whole(api_client, auth_headers):
+    response = _upload_avatar(api_client, auth_headers, IMAGE)
+    assert response.status_code == 200
+    file_name = response.json()["avatar_url"].rsplit("/", 1)[-1]
+    stored = main.AVATARS_DIR / file_name
+    try:
+        assert stored.read_bytes() == IMAGE
+        assert not any(name.endswith(".part") for name in _avatar_files())
+    finally:
+        stored.unlink(missing_ok=True)
+
+
+def test_oversized_upload_is_rejected_without_leftovers(api_client, auth_headers, monkeypatch):
+    monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", len(IMAGE) - 1)
+    before = _avatar_files()
+    response = _upload_avatar(api_client, auth_headers, IMAGE)
+    assert response.status_code == 400
+    assert _avatar_files() == before
+
+
+def test_object_storage_upload_carries_checksum(api_client, auth_headers, local_s3):
+    before = _avatar_files()
+
+    response = _upload_avatar(api_client, auth_headers, IMAGE)
+    assert response.status_code == 200
+    key = main._avatar_key(response.json()["avatar_url"].rsplit("/", 1)[-1])
+    stored = local_s3.objects[key]
+    assert stored.body == IMAGE
+    assert stored.content_type == "image/png"
+    assert stored.metadata == {"sha256": hashlib.sha256(IMAGE).hexdigest()}
+    assert _avatar_files() == before
+
+
+def test_large_object_storage_upload_uses_multipart(api_client, auth_headers, local_s3, monkeypatch):
+    body = IMAGE * 600  # ~9.5 MiB, above the multipart threshold
+    monkeypatch.setattr(settings, "AVATAR_MAX_BYTES", len(body))
+
+    response = _upload_avatar(api_client, auth_headers, body)
+    assert response.status_code == 200
+    key = main._avatar_key(response.json()["avatar_url"].rsplit("/", 1)[-1])
+    assert local_s3.objects[key].body == body
+    assert ("POST", key) in local_s3.requests
+
+
+def test_request_body_limit_stops_oversized_bodies_early():
+    app = FastAPI()
+    app.add_middleware(RequestBodyLimitMiddleware, max_bytes=1024 * 1024)
+    received: list[int] = []
+
+    @app.post("/echo")
+    async def echo(request: Request):
+        received.append(len(await request.body()))
+        return {"size": received[-1]}
+
+    client = TestClient(app)
+    assert client.post("/echo", content=b"x" * 1024).json() == {"size": 1024}
+
+    declared = client.post("/echo", content=b"x" * (1024 * 1024 + 1))
+    assert declared.status_code == 413 and declared.json()["detail"] == "Request body must be <= 1MB"
+
+    chunks = (b"x" * 65536 for _ in range(32))  # no Content-Length: counted as it streams
+    streamed = client.post("/echo", content=chunks)
+    assert streamed.status_code == 413
+    assert received == [1024]
@@ -0,0 +1,219 @@
+from datetime import date
+from decimal import Decimal
+
+from app import main
+from app.db import SessionLocal
+from app.models import (
+    AuthorityToIncurRequest,
+    CashReimbursementItem,
+    CashReimbursementRequest,
+    CashRequisitionRequest,
+    SalaryAdvanceRequest,
+)
+from perf.seed import BENCH_ADMIN_EMAIL, BENCH_EMPLOYEE_EMAIL, BENCH_FINANCE_EMAIL
+
+BULK = "/finance/salary-advances/bulk-decision"
+
+
+def _outcomes(response) -> dict[int, dict]:
+    assert response.status_code == 200, response.text
+    return {result["id"]: result for result in response.json()["results"]}
+
+
+def _delete(model, ids) -> None:
+    db = SessionLocal()
+    try:
+        db.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_bulk_decisions_apply_valid_items_and_report_the_rest(api_client, auth_headers, query_counter, monkeypatch):
+    marks: list = []
+    monkeypatch.setattr(main.attention, "mark", lambda **kwargs: marks.append(kwargs))
+    employee = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    finance = auth_headers(BENCH_FINANCE_EMAIL)
+    admin = auth_headers(BENCH_ADMIN_EMAIL)
+    ids = []
+    for amount in (1200, 800, 500):
+        created = api_client.post("/finance/salary-advances", json={"amount": amount, "reason": "Bulk"}, headers=employee)
+        assert created.status_code == 200, created.text
+        ids.append(created.json()["id"])
+    first, second, third = ids
+    try:
+        api_client.get("/finance/attention", headers=finance)
+        marks.clear()
+        with query_counter.measure() as measured:
+            response = api_client.post(BULK, json={"ids": [first, second, first, 987654], "approve": True}, headers=finance)
+        outcomes = _outcomes(response)
+        assert measured["queries"] <= 4  # lock + validate, one UPDATE, statuses (user is cached)
+        assert response.json()["decided"] == 2 and list(outcomes) == [first, second, 987654]
+        assert outcomes[first] == {"id": first, "ok": True, "status": "pending_ceo_approval", "detail": None}
+        assert outcomes[987654] == {"id": 987654, "ok": False, "status": None, "detail": "Request not found"}
+        assert marks == [{"finance": True}]
+
+        again = _outcomes(api_client.post(BULK, json={"ids": [first, third], "approve": True}, headers=finance))
+        assert again[first]["detail"] == "Finance has already made a decision on this request"
+        assert again[third]["ok"] and again[third]["status"] == "pending_ceo_approval"
+
+        refused = api_client.post(BULK, json={"ids": [second, third], "approve": False}, headers=admin)
+        assert refused.status_code == 400
+        rejected = _outcomes(api_client.post(BULK, json={"ids": [second, third], "approve": False, "comment": "No"}, headers=admin))
+        assert all(result["status"] == "rejected" for result in rejected.values())
+        approved = _outcomes(api_client.post(BULK, json={"ids": [first], "approve": True}, headers=admin))
+        assert approved[first]["status"] == "pending_disbursement"
+
+        (detail,) = [row for row in api_client.get("/finance/salary-advances/approved", headers=admin).json() if row["id"] == first]
+        assert float(detail["approved_amount"]) == 1200
+        assert detail["finance_decision"] == detail["ceo_decision"] == "approved"
+
+        assert api_client.post(BULK, json={"ids": [first], "approve": True}, headers=employee).status_code == 403
+        assert api_client.post(BULK, json={"ids": [], "approve": True}, headers=finance).status_code == 400
+    finally:
+        _delete(SalaryAdvanceRequest, ids)
+
+
+def test_bulk_requisition_decisions_follow_each_stage(api_client, auth_headers):
+    employee = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    finance = auth_headers(BENCH_FINANCE_EMAIL)
+    admin = auth_headers(BENCH_ADMIN_EMAIL)
+    bulk = "/finance/requisitions/bulk-decision"
+    ids = []
+    for amount in (900, 400, 300):
+        created = api_client.post("/finance/requisitions", json={"amount": amount, "purpose": "Bulk"}, headers=employee)
+        assert created.status_code == 200, created.text
+        ids.append(created.json()["id"])
+    direct, reviewed, refused = ids
+    try:
+        # The CEO may approve straight from finance review.
+        ceo = _outcomes(api_client.post(bulk, json={"ids": [direct], "approve": True}, headers=admin))
+        assert ceo[direct]["status"] == "pending_disbursement"
+
+        review = _outcomes(api_client.post(bulk, json={"ids": [direct, reviewed], "approve": True}, headers=finance))
+        assert review[direct] == {
+            "id": direct,
+            "ok": False,
+            "status": None,
+            "detail": "Finance can only decide pending finance review requests",
+        }
+        assert review[reviewed]["status"] == "pending_ceo_approval"
+
+        rejected = _outcomes(
+            api_client.post(bulk, json={"ids": [reviewed, refused], "approve": False, "comment": "No"}, headers=admin)
+        )
+        assert [result["status"] for result in rejected.values()] == ["rejected", "rejected"]
+        late = _outcomes(api_client.post(bulk, json={"ids": [refused], "approve": True}, headers=finance))
+        assert late[refused]["detail"] == "Request already rejected"
+
+        (row,) = [r for r in api_client.get("/finance/requisitions/approved", headers=admin).json() if r["id"] == direct]
+        assert float(row["approved_amount"]) == 900 and row["ceo_decision"] == "approved" and row["finance_decision"] is None
+    finally:
+        _delete(CashRequisitionRequest, ids)
+
+
+def test_bulk_authority_to_incur_finance_approval_honours_an_earlier_ceo_approval(api_client, auth_headers):
+    employee = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    finance = auth_headers(BENCH_FINANCE_EMAIL)
+    admin = auth_headers(BENCH_ADMIN_EMAIL)
+    bulk = "/finance/authority-to-incur/bulk-decision"
+    ids = []
+    for amount in (2500, 1500, 700):
+        created = api_client.post("/finance/authority-to-incur", json={"amount": amount, "title": "Bulk"}, headers=employee)
+        assert created.status_code == 200, created.text
+        ids.append(created.json()["id"])
+    ceo_first, finance_first, ceo_only = ids
+    db = SessionLocal()
+    try:
+        # A CEO approval recorded while the request is still awaiting finance.
+        db.query(AuthorityToIncurRequest).filter(AuthorityToIncurRequest.id == ceo_first).update(
+            {AuthorityToIncurRequest.ceo_decision: "approved"}, synchronize_session=False
+        )
+        db.commit()
+
+        outcomes = _outcomes(api_client.post(bulk, json={"ids": [ceo_first, finance_first], "approve": True}, headers=finance))
+        assert outcomes[ceo_first]["status"] == "pending_incurrence"
+        assert outcomes[finance_first]["status"] == "pending_ceo_approval"
+
+        ceo = _outcomes(api_client.post(bulk, json={"ids": [ceo_first, ceo_only], "approve": True}, headers=admin))
+        assert ceo[ceo_first]["detail"] == "CEO/Admin can only decide pending approval requests"
+        assert ceo[ceo_only]["status"] == "pending_incurrence"
+    finally:
+        db.close()
+        _delete(AuthorityToIncurRequest, ids)
+
+
+def test_bulk_reimbursement_decisions_match_the_single_endpoint(seeded_db, api_client, auth_headers):
+    finance = auth_headers(BENCH_FINANCE_EMAIL)
+    # Item review states per request: still under review, nothing left, already reviewed.
+    shapes = [["pending"], [], ["approved", "rejected"]]
+    db = SessionLocal()
+    pairs: list[tuple[int, int]] = []
+    created: list[int] = []
+    try:
+        for index, reviews in enumerate(shapes * 2):
+            req = CashReimbursementRequest(
+                user_id=seeded_db["employee_id"],
+                period_start=date(2002, index + 1, 1),
+                period_end=date(2002, index + 1, 15),
+                total_amount=Decimal("0"),
+                status="pending_approval",
+            )
+            db.add(req)
+            db.flush()
+            for review in reviews:
+                db.add(
+                    CashReimbursementItem(
+                        request_id=req.id,
+                        item_date=req.period_start,
+                        description="Client visit",
+                        amount=Decimal("700.00"),
+                        review_status=review,
+                    )
+                )
+            created.append(req.id)
+        finalized = CashReimbursementRequest(
+            user_id=seeded_db["employee_id"],
+            period_start=date(2002, 12, 1),
+            period_end=date(2002, 12, 15),
+            total_amount=Decimal("700.00"),
+            status="pending_reimbursement",
+        )
+        db.add(finalized)
+        db.commit()
+        created.append(finalized.id)
+        pairs = list(zip(created[: len(shapes)], created[len(shapes) : 2 * len(shapes)]))
+
+        for single, _ in pairs:
+            response = api_client.post(f"/finance/reimbursements/{single}/decision", json={"approve": True}, headers=finance)
+            assert response.status_code == 200, response.text
+        bulk_ids = [bulk for _, bulk in pairs] + [finalized.id]
+        outcomes = _outcomes(
+            api_client.post("/finance/reimbursements/bulk-decision", json={"ids": bulk_ids, "approve": True}, headers=finance)
+        )
+        assert outcomes[finalized.id]["detail"] == "Request is already approved and awaiting reimbursement"
+
+        db.expire_all()
+        for single, bulk in pairs:
+            expected, actual = db.get(CashReimbursementRequest, single), db.get(CashReimbursementRequest, bulk)
+            assert (actual.status, actual.total_amount, actual.finance_decision) == (
+                expected.status,
+                expected.total_amount,
+                expected.finance_decision,
+            )
+            assert outcomes[bulk]["status"] == expected.status
+        assert [db.get(CashReimbursementRequest, bulk).status for _, bulk in pairs] == [
+            "pending_approval",
+            "rejected",
+            "pending_reimbursement",
+        ]
+    finally:
+        db.rollback()
+        db.query(CashReimbursementItem).filter(CashReimbursementItem.request_id.in_(created)).delete(
+            synchronize_session=False
+        )
+        db.query(CashReimbursementRequest).filter(CashReimbursementRequest.id.in_(created)).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.close()
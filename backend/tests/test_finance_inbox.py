@@ -0,0 +1,72 @@
+from decimal import Decimal
+
+from perf.seed import BENCH_ADMIN_EMAIL, BENCH_EMPLOYEE_EMAIL, BENCH_FINANCE_EMAIL
+
+PENDING_LISTS = {
+    "cash_reimbursement": "/finance/reimbursements/pending",
+    "cash_requisition": "/finance/requisitions/pending",
+    "authority_to_incur": "/finance/authority-to-incur/pending",
+    "salary_advance": "/finance/salary-advances/pending",
+}
+
+
+def _walk(api_client, headers, **params) -> list[dict]:
+    items: list[dict] = []
+    cursor = None
+    while True:
+        query = dict(params, **({"cursor": cursor} if cursor else {}))
+        response = api_client.get("/finance/inbox", params=query, headers=headers)
+        assert response.status_code == 200, response.text
+        page = response.json()
+        items.extend(page["items"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            return items
+
+
+def test_inbox_pages_through_every_pending_request(api_client, auth_headers):
+    for email in (BENCH_FINANCE_EMAIL, BENCH_ADMIN_EMAIL):
+        headers = auth_headers(email)
+        expected = {
+            (kind, row["id"])
+            for kind, path in PENDING_LISTS.items()
+            for row in api_client.get(path, headers=headers).json()
+        }
+        items = _walk(api_client, headers, limit=7)
+        assert len(items) == len(expected) > 7
+        assert {(item["kind"], item["id"]) for item in items} == expected
+        ages = [(item["submitted_at"], item["kind"], item["id"]) for item in items]
+        assert ages == sorted(ages)
+
+
+def test_inbox_sorts_by_amount_and_filters(api_client, auth_headers):
+    headers = auth_headers(BENCH_ADMIN_EMAIL)
+    items = _walk(api_client, headers, sort="amount", limit=5)
+    amounts = [Decimal(str(item["amount"])) for item in items]
+    assert amounts == sorted(amounts, reverse=True)
+
+    smallest_first = _walk(api_client, headers, sort="amount", direction="asc", limit=50)
+    assert [item["id"] for item in smallest_first] == [item["id"] for item in reversed(items)]
+
+    floor = float(amounts[0])
+    large = _walk(api_client, headers, kind="cash_reimbursement,salary_advance", min_amount=floor, limit=50)
+    assert 0 < len(large) < len(items)
+    assert all(item["kind"] in {"cash_reimbursement", "salary_advance"} and item["amount"] >= floor for item in large)
+    assert _walk(api_client, headers, kind="cash_requisition", min_amount=floor) == [
+        item for item in large if item["kind"] == "cash_requisition"
+    ]
+
+    owner = items[0]
+    mine = _walk(api_client, headers, user_id=owner["user_id"])
+    assert mine and {item["user_id"] for item in mine} == {owner["user_id"]}
+
+
+def test_inbox_rejects_bad_input_and_other_roles(api_client, auth_headers):
+    headers = auth_headers(BENCH_FINANCE_EMAIL)
+    assert api_client.get("/finance/inbox", params={"cursor": "not-a-cursor"}, headers=headers).status_code == 400
+    assert api_client.get("/finance/inbox", params={"kind": "payroll"}, headers=headers).status_code == 400
+    age_cursor = api_client.get("/finance/inbox", params={"limit": 1}, headers=headers).json()["next_cursor"]
+    assert api_client.get(
+        "/finance/inbox", params={"sort": "amount", "cursor": age_cursor}, headers=headers
+    ).status_code == 400
+    assert api_client.get("/finance/inbox", headers=auth_headers(BENCH_EMPLOYEE_EMAIL)).status_code == 403
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.db import SessionLocal
+from app.login_throttle import DatabaseLoginThrottle, InMemoryLoginThrottle
+from app.models import LoginThrottleEntry
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+LIMITS = dict(window_seconds=60, max_attempts=3, block_seconds=120, sweep_seconds=0)
+
+
+@pytest.fixture(params=["memory", "database"])
+def throttle(request, seeded_db):
+    if request.param == "memory":
+        yield InMemoryLoginThrottle(**LIMITS)
+        return
+    yield DatabaseLoginThrottle(**LIMITS)
+    db = SessionLocal()
+    try:
+        db.query(LoginThrottleEntry).delete()
+        db.commit()
+    finally:
+        db.close()
+
+
+def test_blocks_after_max_attempts_and_releases_after_block(throttle):
+    keys = ["ip:10.0.0.1", "ip-email:10.0.0.1:a@example.com"]
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    for offset in range(3):
+        assert throttle.retry_after(keys, now + timedelta(seconds=offset)) == 0
+        throttle.record_failure(keys, now + timedelta(seconds=offset))
+
+    assert throttle.retry_after(keys, now + timedelta(seconds=3)) == 119
+    assert throttle.retry_after(keys, now + timedelta(seconds=200)) == 0
+
+
+def test_window_lapse_resets_the_count(throttle):
+    keys = ["ip:10.0.0.2"]
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    throttle.record_failure(keys, now)
+    throttle.record_failure(keys, now + timedelta(seconds=1))
+    throttle.record_failure(keys, now + timedelta(seconds=90))
+    assert throttle.retry_after(keys, now + timedelta(seconds=91)) == 0
+
+
+def test_sweep_drops_expired_entries_but_keeps_blocks(throttle):
+    now = datetime(2026, 1, 1, 12, 0, 0)
+    throttle.record_failure(["ip:stale"], now)
+    for _ in range(3):
+        throttle.record_failure(["ip:blocked"], now)
+
+    assert throttle.sweep(now + timedelta(seconds=61)) == 1
+    assert throttle.retry_after(["ip:blocked"], now + timedelta(seconds=61)) == 59
+    assert throttle.sweep(now + timedelta(seconds=121)) == 1
+
+
+def test_login_returns_429_with_retry_after(api_client):
+    headers = {"X-Forwarded-For": "203.0.113.7"}
+    data = {"username": BENCH_EMPLOYEE_EMAIL, "password": "wrong-password"}
+    for _ in range(5):
+        assert api_client.post("/auth/login", data=data, headers=headers).status_code == 401
+
+    response = api_client.post("/auth/login", data=data, headers=headers)
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) > 0
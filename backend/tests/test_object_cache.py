@@ -0,0 +1,152 @@
+import io
+import os
+import threading
+import time
+
+import pytest
+from PIL import Image
+
+from app import main
+from app.object_cache import CacheFill, ObjectDiskCache, remove_dead_worker_directories
+from app.storage import object_storage
+from perf.seed import BENCH_SUPERVISOR_EMAIL
+
+
+def _filler(payloads: dict[str, bytes], calls: list, delay: float = 0.0):
+    def fill_for(key: str):
+        def fill(etag):
+            calls.append((key, etag))
+            time.sleep(delay)
+            body = payloads[key]
+            current = f'"{len(body)}"'
+            if etag == current:
+                return CacheFill(not_modified=True)
+            return CacheFill(body=io.BytesIO(body), etag=current, content_type="image/png", size=len(body))
+
+        return fill
+
+    return fill_for
+
+
+def test_lru_eviction_keeps_total_size_bounded(tmp_path):
+    cache = ObjectDiskCache(tmp_path, max_bytes=400, fresh_seconds=60, unlink_grace_seconds=0)
+    payloads = {name: bytes(100) for name in "abcde"}
+    fill_for = _filler(payloads, [])
+    for name in "abcd":
+        cache.get(name, fill_for(name))
+    cache.get("a", fill_for("a"))  # touch: "b" is now least recently used
+    cache.get("e", fill_for("e"))
+
+    stats = cache.stats()
+    assert stats["bytes"] <= 400
+    assert stats["evictions"] == 1
+    assert len(list(tmp_path.iterdir())) == stats["entries"]
+    calls: list = []
+    cache.get("b", _filler(payloads, calls)("b"))
+    assert calls == [("b", None)]
+
+
+def test_concurrent_misses_share_one_fill(tmp_path):
+    cache = ObjectDiskCache(tmp_path, max_bytes=10_000, fresh_seconds=60)
+    calls: list = []
+    fill = _filler({"k": b"x" * 50}, calls, delay=0.2)("k")
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get("k", fill))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert {entry.path for entry in results} == {results[0].path}
+
+
+def test_stale_entry_is_revalidated_with_etag(tmp_path):
+    cache = ObjectDiskCache(tmp_path, max_bytes=10_000, fresh_seconds=0)
+    calls: list = []
+    fill = _filler({"k": b"y" * 10}, calls)("k")
+    first = cache.get("k", fill)
+    cache.fresh_seconds = 60
+    cache._entries["k"].validated_at -= 120
+    second = cache.get("k", fill)
+    assert calls == [("k", None), ("k", '"10"')]
+    assert second.path == first.path
+
+
+def test_evicted_files_outlive_the_grace_period(tmp_path):
+    cache = ObjectDiskCache(tmp_path, max_bytes=200, fresh_seconds=60)
+    payloads = {name: bytes(100) for name in "abcd"}
+    fill_for = _filler(payloads, [])
+    evicted = cache.get("a", fill_for("a"))
+    cache.get("b", fill_for("b"))
+    cache.get("c", fill_for("c"))
+    assert cache.stats()["evictions"] == 1
+    # A response that was handed this path a moment ago can still open it.
+    assert evicted.path.exists()
+
+    cache.unlink_grace_seconds = 0
+    cache.get("d", fill_for("d"))
+    assert not evicted.path.exists()
+    assert len(list(tmp_path.iterdir())) == cache.stats()["entries"]
+
+
+def test_dead_worker_directories_are_removed(tmp_path):
+    dead, alive, other = tmp_path / "999999999", tmp_path / str(os.getppid()), tmp_path / "shared"
+    for directory in (dead, alive, other):
+        directory.mkdir()
+    assert remove_dead_worker_directories(tmp_path) == 1
+    assert not dead.exists() and alive.exists() and other.exists()
+
+
+@pytest.fixture
+def object_cache(local_s3, tmp_path, monkeypatch):
+    cache = ObjectDiskCache(tmp_path / "cache", max_bytes=1024 * 1024, fresh_seconds=60)
+    monkeypatch.setattr(object_storage, "cache", cache)
+    return cache
+
+
+def test_avatar_is_served_from_cache_after_first_fetch(api_client, local_s3, object_cache):
+    key = main._avatar_key("cached.png")
+    local_s3.client().put_object(Bucket=local_s3.bucket, Key=key, Body=b"png" * 100, ContentType="image/png")
+    local_s3.requests.clear()
+
+    first = api_client.get("/avatars/cached.png")
+    second = api_client.get("/avatars/cached.png", headers={"Range": "bytes=0-2"})
+    assert first.content == b"png" * 100
+    assert first.headers["etag"] == local_s3.objects[key].etag
+    assert second.status_code == 206
+    assert second.content == b"png"
+    assert local_s3.requests == [("GET", key)]
+    assert object_cache.stats()["hits"] == 1
+
+
+def test_oversized_object_is_fetched_once_per_request(api_client, local_s3, object_cache):
+    key = main._avatar_key("large.png")
+    body = b"L" * (object_cache.max_entry_bytes + 1)
+    local_s3.client().put_object(Bucket=local_s3.bucket, Key=key, Body=body, ContentType="image/png")
+    local_s3.requests.clear()
+
+    assert api_client.get("/avatars/large.png").content == body
+    assert api_client.get("/avatars/large.png").content == body
+    # The first request learns the size from its fill; afterwards only the streamed GET remains.
+    assert local_s3.requests == [("GET", key)] * 3
+    assert object_cache.stats()["entries"] == 0
+
+
+def test_cached_avatar_thumbnail_skips_the_registry(api_client, auth_headers, local_s3, object_cache, query_counter):
+    buffer = io.BytesIO()
+    Image.new("RGB", (180, 180), (30, 60, 90)).save(buffer, format="JPEG")
+    uploaded = api_client.post(
+        "/users/me/avatar",
+        files={"file": ("me.jpg", buffer.getvalue(), "image/jpeg")},
+        headers=auth_headers(BENCH_SUPERVISOR_EMAIL),
+    )
+    assert uploaded.status_code == 200
+    file_name = uploaded.json()["avatar_url"].rsplit("/", 1)[-1]
+
+    with query_counter.measure() as first:
+        api_client.get(f"/avatars/{file_name}", params={"size": 40})
+    with query_counter.measure() as second:
+        response = api_client.get(f"/avatars/{file_name}", params={"size": 40})
+    assert response.headers["content-type"] == "image/webp"
+    assert (first["queries"], second["queries"]) == (1, 0)
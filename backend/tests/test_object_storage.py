@@ -0,0 +1,89 @@
+import io
+from contextlib import nullcontext
+
+from PIL import Image
+
+from app.storage import ObjectDeleteQueue, object_storage
+from app.thumbnails import AVATAR_THUMBNAIL_SIZES, avatar_thumbnail_name
+from perf.seed import BENCH_ADMIN_EMAIL, BENCH_SUPERVISOR_EMAIL
+
+
+def test_failed_deletes_are_retried_until_they_succeed():
+    attempts: list[str] = []
+
+    def flaky_delete(key: str) -> None:
+        attempts.append(key)
+        if len(attempts) < 3:
+            raise ConnectionError("bucket unavailable")
+
+    queue = ObjectDeleteQueue(flaky_delete, max_attempts=5, retry_seconds=0.01)
+    queue.enqueue("documents/old.pdf")
+    assert queue.flush(timeout=5)
+    assert attempts == ["documents/old.pdf"] * 3
+    stats = queue.stats()
+    assert (stats["deleted_total"], stats["retried_total"], stats["failed_total"]) == (1, 2, 0)
+
+
+def test_delete_gives_up_after_max_attempts_and_honours_guard():
+    attempts: list[str] = []
+
+    def failing_delete(key: str) -> None:
+        attempts.append(key)
+        raise ConnectionError("bucket unavailable")
+
+    queue = ObjectDeleteQueue(failing_delete, max_attempts=2, retry_seconds=0.0)
+    queue.enqueue("a")
+    queue.enqueue("b", guard=lambda: nullcontext(False))
+    assert queue.flush(timeout=5)
+    assert attempts == ["a", "a"]
+    stats = queue.stats()
+    assert (stats["failed_total"], stats["skipped_total"], stats["pending"]) == (1, 1, 0)
+
+
+def _photo(width: int) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, width), (10, 120, 60)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def _avatar_keys(name: str) -> set[str]:
+    return {f"avatars/{name}"} | {f"avatars/{avatar_thumbnail_name(name, size)}" for size in AVATAR_THUMBNAIL_SIZES}
+
+
+def test_replaced_avatar_objects_are_deleted_in_the_background(api_client, auth_headers, local_s3):
+    headers = auth_headers(BENCH_SUPERVISOR_EMAIL)
+    names = []
+    for width in (200, 240):
+        response = api_client.post(
+            "/users/me/avatar", files={"file": ("me.jpg", _photo(width), "image/jpeg")}, headers=headers
+        )
+        assert response.status_code == 200
+        names.append(response.json()["avatar_url"].rsplit("/", 1)[-1])
+
+    assert object_storage.deletes.flush(timeout=5)
+    first, second = names
+    assert not _avatar_keys(first) & set(local_s3.objects)
+    assert _avatar_keys(second) <= set(local_s3.objects)
+    assert object_storage.stats()["pool"]["submitted_total"] >= 2 * (1 + len(AVATAR_THUMBNAIL_SIZES))
+
+
+def test_deleted_user_avatar_objects_are_deleted_in_the_background(api_client, auth_headers, local_s3):
+    admin = auth_headers(BENCH_ADMIN_EMAIL)
+    created = api_client.post(
+        "/users",
+        json={"name": "Departing", "email": "departing@example.com", "password": "Departing-pass-1"},
+        headers=admin,
+    )
+    assert created.status_code == 200, created.text
+    uploaded = api_client.post(
+        "/users/me/avatar",
+        files={"file": ("me.jpg", _photo(220), "image/jpeg")},
+        headers=auth_headers("departing@example.com"),
+    )
+    assert uploaded.status_code == 200
+    name = uploaded.json()["avatar_url"].rsplit("/", 1)[-1]
+    assert _avatar_keys(name) <= set(local_s3.objects)
+
+    assert api_client.delete(f"/users/{created.json()['id']}", headers=admin).status_code == 200
+    assert object_storage.deletes.flush(timeout=5)
+    assert not _avatar_keys(name) & set(local_s3.objects)
@@ -0,0 +1,97 @@
+import asyncio
+import threading
+
+import httpx
+import pytest
+from passlib.context import CryptContext
+
+from app import main
+from app.db import SessionLocal
+from app.models import User
+from app.security import PasswordHashingBusyError, PasswordHashPool, pwd_context
+from perf.seed import BENCH_EMPLOYEE_EMAIL, BENCH_PASSWORD
+
+
+def test_pool_sheds_load_when_pending_limit_is_reached():
+    pool = PasswordHashPool(workers=1, max_pending=2)
+    release = threading.Event()
+    futures = [pool.submit(release.wait, 5) for _ in range(2)]
+
+    with pytest.raises(PasswordHashingBusyError):
+        pool.submit(release.wait, 5)
+
+    stats = pool.stats()
+    assert stats["in_flight"] == 2
+    assert stats["queue_depth"] == 1
+    assert stats["rejected_total"] == 1
+
+    release.set()
+    for future in futures:
+        future.result(timeout=5)
+    assert pool.stats()["in_flight"] == 0
+
+
+def test_login_rehashes_password_with_outdated_cost(seeded_db, api_client):
+    legacy_context = CryptContext(schemes=["bcrypt"], bcrypt__rounds=4)
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.email == BENCH_EMPLOYEE_EMAIL).one()
+        user.password_hash = legacy_context.hash(BENCH_PASSWORD)
+        db.commit()
+    finally:
+        db.close()
+
+    response = api_client.post(
+        "/auth/login",
+        data={"username": BENCH_EMPLOYEE_EMAIL, "password": BENCH_PASSWORD},
+    )
+    assert response.status_code == 200
+
+    db = SessionLocal()
+    try:
+        stored = db.query(User.password_hash).filter(User.email == BENCH_EMPLOYEE_EMAIL).scalar()
+    finally:
+        db.close()
+    assert not pwd_context.needs_update(stored)
+    assert pwd_context.verify(BENCH_PASSWORD, stored)
+
+
+def test_login_burst_does_not_hold_threadpool_tokens(seeded_db, monkeypatch):
+    # More logins waiting on the hash pool than anyio has threadpool tokens (40).
+    pool = PasswordHashPool(workers=1, max_pending=64)
+    release = threading.Event()
+
+    def blocked_verify(password: str, hashed: str):
+        release.wait(30)
+        return True, None
+
+    monkeypatch.setattr(main, "password_hash_pool", pool)
+    monkeypatch.setattr(main, "verify_and_update_password", blocked_verify)
+
+    async def burst():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            logins = [
+                asyncio.ensure_future(
+                    client.post("/auth/login", data={"username": BENCH_EMPLOYEE_EMAIL, "password": BENCH_PASSWORD})
+                )
+                for _ in range(48)
+            ]
+            try:
+                while pool.stats()["in_flight"] < len(logins) and not any(login.done() for login in logins):
+                    await asyncio.sleep(0.01)
+                # A sync endpoint still gets a threadpool token while every login waits.
+                logout = await asyncio.wait_for(client.post("/auth/logout"), timeout=5)
+            finally:
+                release.set()
+            return logout, await asyncio.gather(*logins)
+
+    logout, logins = asyncio.run(burst())
+    assert logout.status_code == 200
+    assert {response.status_code for response in logins} == {200}
+
+
+def test_run_awaits_the_pool():
+    pool = PasswordHashPool(workers=1, max_pending=1)
+    assert asyncio.run(pool.run(pow, 2, 10)) == 1024
+    assert pool.stats()["submitted_total"] == 1
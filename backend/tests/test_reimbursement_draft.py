@@ -0,0 +1,78 @@
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from app import main
+from app.db import SessionLocal
+from app.models import CashReimbursementItem, CashReimbursementRequest, Event
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+
+def test_draft_skips_claimed_visits_in_one_query(seeded_db, api_client, auth_headers, query_counter):
+    period_start, _ = main._reimbursement_period_for(date.today())
+    visit_at = datetime.combine(period_start, time(10, 0))
+    db = SessionLocal()
+    try:
+        def visit(**fields) -> Event:
+            row = Event(
+                user_id=seeded_db["employee_id"],
+                start_ts=visit_at,
+                end_ts=visit_at + timedelta(hours=1),
+                type="Client Visit",
+                status="approved",
+                **fields,
+            )
+            db.add(row)
+            return row
+
+        open_visit = visit(client_id=seeded_db["client_id"])
+        claimed_visit = visit(client_id=seeded_db["client_id"])
+        walk_in = visit(one_time_client_name="Walk-in Draft Client")
+        db.flush()
+        claim = CashReimbursementRequest(
+            user_id=seeded_db["employee_id"],
+            period_start=date(2000, 1, 1),
+            period_end=date(2000, 1, 15),
+            total_amount=Decimal("1000.00"),
+            status="amount_reimbursed",
+        )
+        db.add(claim)
+        db.flush()
+        db.add(
+            CashReimbursementItem(
+                request_id=claim.id,
+                item_date=period_start,
+                description="Client visit",
+                amount=Decimal("1000.00"),
+                client_id=seeded_db["client_id"],
+                source_event_id=claimed_visit.id,
+            )
+        )
+        db.commit()
+
+        headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+        api_client.get("/finance/reimbursements/draft", headers=headers)
+        with query_counter.measure() as measured:
+            response = api_client.get("/finance/reimbursements/draft", headers=headers)
+        assert response.status_code == 200, response.text
+        assert measured["queries"] <= 3  # submitted check, saved draft, visits
+
+        draft = response.json()
+        auto_ids = [item["source_event_id"] for item in draft["auto_items"]]
+        assert open_visit.id in auto_ids and claimed_visit.id not in auto_ids
+        (auto,) = [item for item in draft["auto_items"] if item["source_event_id"] == open_visit.id]
+        assert auto["client_id"] == seeded_db["client_id"] and auto["description"].startswith("Client visit to and from ")
+        manual = [item for item in draft["manual_items"] if item["source_event_id"] == walk_in.id]
+        assert [item["description"] for item in manual] == ["Client visit to and from Walk-in Draft Client"]
+    finally:
+        db.rollback()
+        db.query(CashReimbursementItem).filter(CashReimbursementItem.request_id.in_(
+            db.query(CashReimbursementRequest.id).filter(CashReimbursementRequest.period_start == date(2000, 1, 1))
+        )).delete(synchronize_session=False)
+        db.query(CashReimbursementRequest).filter(CashReimbursementRequest.period_start == date(2000, 1, 1)).delete(
+            synchronize_session=False
+        )
+        db.query(Event).filter(Event.start_ts == visit_at, Event.user_id == seeded_db["employee_id"]).delete(
+            synchronize_session=False
+        )
+        db.commit()
+        db.close()
@@ -0,0 +1,65 @@
+from datetime import date
+from decimal import Decimal
+
+from app import main
+from app.db import SessionLocal
+from app.models import CashReimbursementItem, CashReimbursementRequest
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+HISTORY = [(date(2001, month, 1), date(2001, month, 15)) for month in range(1, 13)]
+
+
+def test_periods_count_items_without_loading_them(seeded_db, api_client, auth_headers, query_counter):
+    db = SessionLocal()
+    try:
+        for index, (period_start, period_end) in enumerate(HISTORY):
+            req = CashReimbursementRequest(
+                user_id=seeded_db["employee_id"],
+                period_start=period_start,
+                period_end=period_end,
+                total_amount=Decimal("1000.00") * index,
+                status="amount_reimbursed" if index else "rejected",
+                is_late_submission=index == 1,
+            )
+            db.add(req)
+            db.flush()
+            for _ in range(index):
+                db.add(
+                    CashReimbursementItem(
+                        request_id=req.id,
+                        item_date=period_start,
+                        description="Client visit",
+                        amount=Decimal("1000.00"),
+                    )
+                )
+        db.commit()
+
+        headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+        api_client.get("/finance/reimbursements/periods", headers=headers)
+        main._reimbursement_period_for.cache_clear()
+        with query_counter.measure() as measured:
+            response = api_client.get("/finance/reimbursements/periods", headers=headers)
+        assert response.status_code == 200, response.text
+        assert measured["queries"] <= 2  # drafts, submissions with item counts
+        assert main._reimbursement_period_for.cache_info().misses == 1
+
+        by_start = {row["period_start"]: row for row in response.json()}
+        for index, (period_start, _) in enumerate(HISTORY):
+            row = by_start[period_start.isoformat()]
+            assert row["has_submission"] and row["submission_item_count"] == index
+            assert row["submission_status"] == ("amount_reimbursed" if index else "rejected")
+            assert row["is_late_submission"] == (index == 1)
+    finally:
+        db.rollback()
+        starts = [period_start for period_start, _ in HISTORY]
+        history = db.query(CashReimbursementRequest).filter(
+            CashReimbursementRequest.user_id == seeded_db["employee_id"],
+            CashReimbursementRequest.period_start.in_(starts),
+        )
+        history_ids = history.with_entities(CashReimbursementRequest.id)
+        db.query(CashReimbursementItem).filter(CashReimbursementItem.request_id.in_(history_ids)).delete(
+            synchronize_session=False
+        )
+        history.delete(synchronize_session=False)
+        db.commit()
+        db.close()
@@ -0,0 +1,195 @@
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+from perf.seed import (
+    BENCH_ADMIN_EMAIL,
+    BENCH_EMPLOYEE_EMAIL,
+    BENCH_FINANCE_EMAIL,
+    BENCH_SUPERVISOR_EMAIL,
+)
+
+pytestmark = pytest.mark.perf
+
+BASELINE_PATH = Path(__file__).resolve().parent / "perf_baseline.json"
+# Wall-clock medians depend on the machine that recorded the baseline, so the
+# latency check is opt-in (PERF_CHECK_LATENCY=1); query counts always gate.
+CHECK_LATENCY = os.environ.get("PERF_CHECK_LATENCY", "").lower() in {"1", "true", "yes"}
+LATENCY_TOLERANCE = float(os.environ.get("PERF_LATENCY_TOLERANCE", "3.0"))
+LATENCY_SLACK_MS = float(os.environ.get("PERF_LATENCY_SLACK_MS", "25"))
+SAMPLES = int(os.environ.get("PERF_SAMPLES", "3"))
+
+TODAY = date.today()
+MONTH_START = date(TODAY.year, TODAY.month, 1)
+NEXT_MONTH = date(MONTH_START.year + MONTH_START.month // 12, MONTH_START.month % 12 + 1, 1)
+LAST_MONTH = date((MONTH_START - timedelta(days=1)).year, (MONTH_START - timedelta(days=1)).month, 1)
+
+
+@dataclass
+class RouteBudget:
+    name: str
+    path: str
+    email: str
+    max_queries: int
+    params: dict = field(default_factory=dict)
+
+
+# Budgets are SQL statements per request against the FIXTURE_SEED dataset in
+# conftest.py. Routes that still issue per-row lookups scale with that dataset
+# and sit at their measured count, so one new per-row query fails them; only
+# routes whose rows follow today's date (tasks by year, reimbursements from
+# past visits, the dashboard) keep headroom. Lower the number when a route is
+# fixed, never raise it to make a test pass.
+ROUTE_BUDGETS = [
+    RouteBudget("healthz", "/healthz", BENCH_EMPLOYEE_EMAIL, 0),
+    RouteBudget("me", "/me", BENCH_EMPLOYEE_EMAIL, 2),
+    RouteBudget("departments", "/departments", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("designations", "/designations", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("users", "/users", BENCH_ADMIN_EMAIL, 106),
+    RouteBudget("user_profile", "/users/{employee_id}/profile", BENCH_EMPLOYEE_EMAIL, 2),
+    RouteBudget("admin_user_profile", "/admin/users/{employee_id}/profile", BENCH_ADMIN_EMAIL, 2),
+    RouteBudget("library_categories", "/library/categories", BENCH_EMPLOYEE_EMAIL, 4),
+    RouteBudget("library_documents", "/library/documents", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("shared_notebook", "/shared-notebook", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("task_years", "/task-manager/years", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("task_clients", "/task-manager/clients", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget(
+        "client_tasks",
+        "/task-manager/tasks",
+        BENCH_EMPLOYEE_EMAIL,
+        55,
+        {"year": TODAY.year, "client_id": "{client_id}"},
+    ),
+    RouteBudget("workplan_history", "/task-manager/reports/workplan/history", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("probation_records", "/task-manager/probation-records", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("reimbursement_draft", "/finance/reimbursements/draft", BENCH_EMPLOYEE_EMAIL, 3),
+    RouteBudget("reimbursement_periods", "/finance/reimbursements/periods", BENCH_EMPLOYEE_EMAIL, 2),
+    RouteBudget("reimbursements_my", "/finance/reimbursements/my", BENCH_EMPLOYEE_EMAIL, 4),
+    RouteBudget("reimbursements_pending", "/finance/reimbursements/pending", BENCH_FINANCE_EMAIL, 205),
+    RouteBudget("reimbursements_approved", "/finance/reimbursements/approved", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("finance_attention", "/finance/attention", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("payroll_attention", "/payroll/attention", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("payroll_admin_attention", "/payroll/admin-attention", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("requisitions_my", "/finance/requisitions/my", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("requisitions_pending", "/finance/requisitions/pending", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("requisitions_approved", "/finance/requisitions/approved", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("finance_inbox", "/finance/inbox", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("finance_inbox_amount", "/finance/inbox", BENCH_ADMIN_EMAIL, 1, {"sort": "amount", "limit": 100}),
+    RouteBudget("authority_to_incur_my", "/finance/authority-to-incur/my", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("authority_to_incur_pending", "/finance/authority-to-incur/pending", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("authority_to_incur_approved", "/finance/authority-to-incur/approved", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("salary_advances_my", "/finance/salary-advances/my", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("salary_advances_pending", "/finance/salary-advances/pending", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("salary_advances_approved", "/finance/salary-advances/approved", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("payroll_statutory", "/payroll/statutory", BENCH_FINANCE_EMAIL, 2),
+    RouteBudget("payroll_statutory_configs", "/payroll/statutory/configs", BENCH_FINANCE_EMAIL, 3),
+    RouteBudget("payroll_employees", "/payroll/employees", BENCH_FINANCE_EMAIL, 106),
+    RouteBudget("payroll_employees_confirmed", "/payroll/employees-confirmed", BENCH_FINANCE_EMAIL, 1),
+    RouteBudget("payroll_profile", "/payroll/profiles/{employee_id}", BENCH_FINANCE_EMAIL, 5),
+    RouteBudget(
+        "payroll_admin_overview",
+        "/payroll/admin-overview",
+        BENCH_FINANCE_EMAIL,
+        680,
+        {"payroll_month": LAST_MONTH.isoformat()},
+    ),
+    RouteBudget(
+        "payroll_runs_month",
+        "/payroll/runs",
+        BENCH_FINANCE_EMAIL,
+        345,
+        {"payroll_month": LAST_MONTH.isoformat()},
+    ),
+    RouteBudget("payroll_my_runs", "/payroll/my-runs", BENCH_EMPLOYEE_EMAIL, 7),
+    RouteBudget("performance_users", "/performance/users", BENCH_ADMIN_EMAIL, 1),
+    RouteBudget("performance_direct_reports", "/performance/direct-reports", BENCH_SUPERVISOR_EMAIL, 1),
+    RouteBudget("performance_company_goals", "/performance/company-goals", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("performance_department_goals", "/performance/department-goals", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("performance_appraisal", "/performance/appraisals", BENCH_EMPLOYEE_EMAIL, 4),
+    RouteBudget("dashboard_overview", "/dashboard/overview", BENCH_EMPLOYEE_EMAIL, 180),
+    RouteBudget("activity_history", "/dashboard/activities/history", BENCH_EMPLOYEE_EMAIL, 7),
+    RouteBudget("leave_balance", "/leave/balance", BENCH_EMPLOYEE_EMAIL, 1),
+    RouteBudget("admin_leave_balance", "/admin/users/{employee_id}/leave/balance", BENCH_ADMIN_EMAIL, 2),
+    RouteBudget("leave_requests_admin", "/leave/requests", BENCH_ADMIN_EMAIL, 1986),
+    RouteBudget("leave_requests_supervisor", "/leave/requests", BENCH_SUPERVISOR_EMAIL, 363),
+    RouteBudget("leave_requests_employee", "/leave/requests", BENCH_EMPLOYEE_EMAIL, 13),
+    RouteBudget(
+        "events_month",
+        "/events",
+        BENCH_ADMIN_EMAIL,
+        434,
+        {
+            "start": datetime.combine(MONTH_START, datetime.min.time()).isoformat(),
+            "end": datetime.combine(NEXT_MONTH, datetime.min.time()).isoformat(),
+        },
+    ),
+]
+
+
+def _load_baseline() -> dict:
+    if not BASELINE_PATH.exists():
+        return {}
+    return json.loads(BASELINE_PATH.read_text(encoding="utf-8")).get("routes", {})
+
+
+_BASELINE = _load_baseline()
+_MEASURED: dict[str, dict] = {}
+
+
+def _fill(value, ids: dict):
+    return value.format(**ids) if isinstance(value, str) else value
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _write_baseline(request):
+    yield
+    if request.config.getoption("--update-perf-baseline") and _MEASURED:
+        routes = {**_BASELINE, **_MEASURED}
+        payload = {"recorded_at": date.today().isoformat(), "routes": dict(sorted(routes.items()))}
+        BASELINE_PATH.write_text(json.dumps(payload, indent=2) + "\n", encoding="utf-8")
+
+
+@pytest.mark.parametrize("budget", ROUTE_BUDGETS, ids=[b.name for b in ROUTE_BUDGETS])
+def test_route_within_budget(budget: RouteBudget, request, seeded_db, api_client, query_counter, auth_headers):
+    path = _fill(budget.path, seeded_db)
+    params = {key: _fill(value, seeded_db) for key, value in budget.params.items()}
+    headers = auth_headers(budget.email)
+
+    # Warm-up request: first-touch work (default rows, lazy config) is not budgeted.
+    warmup = api_client.get(path, params=params, headers=headers)
+    assert warmup.status_code == 200, f"{budget.name}: {warmup.status_code} {warmup.text[:300]}"
+
+    query_counts: list[int] = []
+    latencies: list[float] = []
+    for _ in range(max(1, SAMPLES)):
+        with query_counter.measure() as measured:
+            started = time.perf_counter()
+            response = api_client.get(path, params=params, headers=headers)
+            latencies.append((time.perf_counter() - started) * 1000)
+        assert response.status_code == 200, f"{budget.name}: {response.status_code}"
+        query_counts.append(measured["queries"])
+
+    queries = max(query_counts)
+    latency_ms = statistics.median(latencies)
+    _MEASURED[budget.name] = {"queries": queries, "median_ms": round(latency_ms, 2)}
+
+    assert queries <= budget.max_queries, (
+        f"{budget.name} issued {queries} SQL statements; budget is {budget.max_queries}"
+    )
+
+    if request.config.getoption("--update-perf-baseline") or not CHECK_LATENCY:
+        return
+    baseline = _BASELINE.get(budget.name)
+    if not baseline:
+        return
+    limit_ms = baseline["median_ms"] * LATENCY_TOLERANCE + LATENCY_SLACK_MS
+    assert latency_ms <= limit_ms, (
+        f"{budget.name} took {latency_ms:.1f}ms; baseline {baseline['median_ms']:.1f}ms "
+        f"x {LATENCY_TOLERANCE} + {LATENCY_SLACK_MS}ms = {limit_ms:.1f}ms"
+    )
@@ -0,0 +1,183 @@
+import asyncio
+import hashlib
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app import main
+from app.db import SessionLocal, engine
+from app.file_registry import acquire_blob, blob_storage_key, delete_orphaned_blob, release_blob
+from app.models import StoredBlob
+from app.storage import object_storage
+from perf.seed import BENCH_ADMIN_EMAIL, BENCH_EMPLOYEE_EMAIL, BENCH_SUPERVISOR_EMAIL
+
+POLICY = b"%PDF-1.4\nstaff handbook v3\n" + b"." * 4096
+
+
+def _ref_count(sha256: str):
+    db = SessionLocal()
+    try:
+        return db.query(StoredBlob.ref_count).filter(StoredBlob.sha256 == sha256).scalar()
+    finally:
+        db.close()
+
+
+def _upload_library(api_client, headers, title: str) -> dict:
+    response = api_client.post(
+        "/library/documents",
+        data={"title": title, "category": "Contract"},
+        files={"file": ("handbook.pdf", POLICY, "application/pdf")},
+        headers=headers,
+    )
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_identical_library_uploads_share_one_blob(api_client, auth_headers):
+    sha256 = hashlib.sha256(POLICY).hexdigest()
+    blob_path = main.UPLOADS_DIR / blob_storage_key(sha256)
+    headers = auth_headers(BENCH_ADMIN_EMAIL)
+
+    first = _upload_library(api_client, headers, "Handbook")
+    second = _upload_library(api_client, headers, "Handbook (copy)")
+    assert first["file_url"] != second["file_url"]
+    assert _ref_count(sha256) == 2
+    assert blob_path.read_bytes() == POLICY
+
+    served = api_client.get(
+        "/files/library/" + second["file_url"].rsplit("/", 1)[-1], headers=auth_headers(BENCH_EMPLOYEE_EMAIL)
+    )
+    assert served.status_code == 200
+    assert served.content == POLICY
+    assert served.headers["content-type"] == "application/pdf"
+
+    assert api_client.delete(f"/library/documents/{first['id']}", headers=headers).status_code == 200
+    assert _ref_count(sha256) == 1
+    assert blob_path.exists()
+
+    assert api_client.delete(f"/library/documents/{second['id']}", headers=headers).status_code == 200
+    assert _ref_count(sha256) is None
+    assert not blob_path.exists()
+
+
+def test_identical_object_storage_upload_skips_second_put(api_client, auth_headers, local_s3):
+    sha256 = hashlib.sha256(POLICY + b"s3").hexdigest()
+    headers = auth_headers(BENCH_EMPLOYEE_EMAIL)
+    for doc_type in ("offer_letter", "employment_contract"):
+        response = api_client.post(
+            f"/users/me/documents/{doc_type}",
+            files={"file": ("letter.pdf", POLICY + b"s3", "application/pdf")},
+            headers=headers,
+        )
+        assert response.status_code == 200
+
+    key = blob_storage_key(sha256)
+    assert [request for request in local_s3.requests if request[0] == "PUT"] == [("PUT", key)]
+    assert local_s3.objects[key].metadata == {"sha256": sha256}
+    assert _ref_count(sha256) == 2
+
+
+def test_orphaned_blob_is_kept_when_reacquired_before_the_unlink(seeded_db):
+    sha256 = hashlib.sha256(POLICY + b"race").hexdigest()
+    storage_key = blob_storage_key(sha256)
+    blob_path = main.UPLOADS_DIR / storage_key
+    blob_path.parent.mkdir(parents=True, exist_ok=True)
+    raced: list[bool] = []
+
+    def reacquire_first(conn, cursor, statement, *_args):
+        # A duplicate upload references the content just before the delete claims the row.
+        if statement.startswith("UPDATE stored_blobs") and not raced:
+            raced.append(True)
+            other = SessionLocal()
+            try:
+                acquire_blob(other, sha256, storage_key, len(POLICY))
+                other.commit()
+            finally:
+                other.close()
+
+    db = SessionLocal()
+    try:
+        # A released blob: its row is left at zero references.
+        db.add(StoredBlob(sha256=sha256, storage_key=storage_key, size_bytes=len(POLICY), ref_count=0))
+        db.commit()
+        blob_path.write_bytes(POLICY)
+        event.listen(engine, "before_cursor_execute", reacquire_first)
+        try:
+            delete_orphaned_blob(storage_key, main.UPLOADS_DIR)
+        finally:
+            event.remove(engine, "before_cursor_execute", reacquire_first)
+        assert raced and blob_path.exists() and _ref_count(sha256) == 1
+
+        assert release_blob(db, sha256) == storage_key
+        db.commit()
+        delete_orphaned_blob(storage_key, main.UPLOADS_DIR)
+        assert not blob_path.exists() and _ref_count(sha256) is None
+    finally:
+        db.rollback()
+        db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).delete()
+        db.commit()
+        db.close()
+        blob_path.unlink(missing_ok=True)
+
+
+def test_queued_bucket_delete_skips_a_blob_referenced_again(seeded_db, local_s3):
+    sha256 = hashlib.sha256(POLICY + b"queued").hexdigest()
+    storage_key = blob_storage_key(sha256)
+    local_s3.client().put_object(Bucket=local_s3.bucket, Key=storage_key, Body=POLICY)
+    db = SessionLocal()
+    try:
+        db.add(StoredBlob(sha256=sha256, storage_key=storage_key, size_bytes=len(POLICY), ref_count=1))
+        db.commit()
+        assert release_blob(db, sha256) == storage_key
+        acquire_blob(db, sha256, storage_key, len(POLICY))
+        db.commit()
+        delete_orphaned_blob(storage_key, main.UPLOADS_DIR)
+        assert object_storage.deletes.flush(timeout=5)
+        assert storage_key in local_s3.objects and _ref_count(sha256) == 1
+
+        assert release_blob(db, sha256) == storage_key
+        db.commit()
+        delete_orphaned_blob(storage_key, main.UPLOADS_DIR)
+        assert object_storage.deletes.flush(timeout=5)
+        assert storage_key not in local_s3.objects and _ref_count(sha256) is None
+    finally:
+        db.rollback()
+        db.query(StoredBlob).filter(StoredBlob.sha256 == sha256).delete()
+        db.commit()
+        db.close()
+
+
+def test_concurrent_identical_uploads_on_one_worker_both_complete(seeded_db, auth_headers, local_s3, monkeypatch):
+    body = POLICY + b"concurrent"
+    sha256 = hashlib.sha256(body).hexdigest()
+    upload_fileobj = object_storage.upload_fileobj
+
+    def slow_upload(*args, **kwargs):
+        # Keeps the first request parked in an await while the second one arrives.
+        time.sleep(0.3)
+        upload_fileobj(*args, **kwargs)
+
+    monkeypatch.setattr(object_storage, "upload_fileobj", slow_upload)
+
+    async def upload_both():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://localhost") as client:
+            return await asyncio.wait_for(
+                asyncio.gather(
+                    *(
+                        client.post(
+                            "/users/me/documents/offer_letter",
+                            files={"file": ("letter.pdf", body, "application/pdf")},
+                            headers=auth_headers(email),
+                        )
+                        for email in (BENCH_EMPLOYEE_EMAIL, BENCH_SUPERVISOR_EMAIL)
+                    )
+                ),
+                timeout=30,
+            )
+
+    responses = asyncio.run(upload_both())
+    assert [response.status_code for response in responses] == [200, 200]
+    assert _ref_count(sha256) == 2
+    assert local_s3.objects[blob_storage_key(sha256)].body == body
@@ -0,0 +1,176 @@
+import asyncio
+import json
+
+from app import main
+from app.models import User
+from app.security import create_access_token
+from app.ws_manager import (
+    TOPIC_CALENDAR,
+    WS_CLOSE_IDLE_TIMEOUT,
+    WS_CLOSE_TRY_AGAIN_LATER,
+    ConnectionManager,
+    user_topic,
+)
+from perf.seed import BENCH_EMPLOYEE_EMAIL
+
+
+class FakeSocket:
+    def __init__(self, stalled: bool = False) -> None:
+        self.sent: list[dict] = []
+        self.closed_with = None
+        self.release = asyncio.Event()
+        if not stalled:
+            self.release.set()
+
+    async def accept(self) -> None:
+        return None
+
+    async def send_text(self, text: str) -> None:
+        await self.release.wait()
+        self.sent.append(json.loads(text))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed_with = code
+
+
+async def _settle() -> None:
+    for _ in range(20):
+        await asyncio.sleep(0)
+
+
+def test_slow_client_does_not_delay_others_and_is_coalesced():
+    async def scenario():
+        manager = ConnectionManager(queue_size=4, send_timeout=5)
+        fast, slow = FakeSocket(), FakeSocket(stalled=True)
+        await manager.connect(fast)
+        await manager.connect(slow)
+
+        for event_id in range(10):
+            await manager.broadcast_json({"type": "events_changed", "event_id": event_id})
+            await _settle()
+        assert [message["event_id"] for message in fast.sent] == list(range(10))
+        assert slow.sent == []
+        stats = manager.stats()
+        assert stats["coalesced_total"] > 0
+        assert stats["max_queue_depth"] <= 4
+
+        slow.release.set()
+        await _settle()
+        assert slow.sent[-1]["event_id"] == 9
+        assert len(slow.sent) < 10
+        assert {"type": "events_changed", "action": "batch", "resync": True} in slow.sent
+        assert manager.stats()["evicted_total"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_client_that_cannot_be_coalesced_is_closed():
+    async def scenario():
+        manager = ConnectionManager(queue_size=2, send_timeout=5)
+        slow = FakeSocket(stalled=True)
+        await manager.connect(slow)
+        for kind in ("a", "b", "c", "d"):
+            await manager.broadcast_json({"type": kind})
+        await _settle()
+        assert slow.closed_with == WS_CLOSE_TRY_AGAIN_LATER
+        stats = manager.stats()
+        assert (stats["connections"], stats["evicted_total"]) == (0, 1)
+        assert stats["dropped_total"] >= 2
+
+    asyncio.run(scenario())
+
+
+def test_stalled_send_is_evicted_after_timeout():
+    async def scenario():
+        manager = ConnectionManager(queue_size=8, send_timeout=0.1)
+        slow = FakeSocket(stalled=True)
+        await manager.connect(slow)
+        await manager.broadcast_json({"type": "events_changed"})
+        await asyncio.sleep(0.3)
+        assert slow.closed_with == WS_CLOSE_TRY_AGAIN_LATER
+        assert manager.stats()["connections"] == 0
+
+    asyncio.run(scenario())
+
+
+def test_publish_reaches_only_subscribed_topics():
+    async def scenario():
+        manager = ConnectionManager(queue_size=8)
+        calendar, finance, both = FakeSocket(), FakeSocket(), FakeSocket()
+        await manager.connect(calendar, ["calendar", user_topic(1)])
+        await manager.connect(finance, ["finance", user_topic(2)])
+        await manager.connect(both, ["calendar", "finance", user_topic(3)])
+
+        assert manager.publish({"type": "events_changed"}, ["calendar", user_topic(2)]) == 3
+        assert manager.publish({"type": "finance_attention"}, ["finance"]) == 2
+        assert manager.publish({"type": "nobody"}, ["approvers"]) == 0
+        await _settle()
+        assert [m["type"] for m in calendar.sent] == ["events_changed"]
+        assert [m["type"] for m in finance.sent] == ["events_changed", "finance_attention"]
+        assert [m["type"] for m in both.sent] == ["events_changed", "finance_attention"]
+
+        await manager.disconnect(finance)
+        assert manager.publish({"type": "finance_attention"}, ["finance"]) == 1
+        assert manager.stats()["topics"] == 4
+
+    asyncio.run(scenario())
+
+
+def test_heartbeat_pings_live_clients_and_closes_silent_ones():
+    async def scenario():
+        manager = ConnectionManager(queue_size=8, heartbeat_seconds=0.05, idle_timeout=0.12)
+        live, silent = FakeSocket(), FakeSocket()
+        await manager.connect(live, user_id=1)
+        await manager.connect(silent, user_id=2)
+
+        for _ in range(6):
+            await asyncio.sleep(0.05)
+            manager.touch(live, '{"type":"pong"}')
+        await _settle()
+
+        assert {"type": "ping"} in live.sent
+        assert live.closed_with is None
+        assert silent.closed_with == WS_CLOSE_IDLE_TIMEOUT
+        stats = manager.stats()
+        assert (stats["connections"], stats["idle_closed_total"], stats["closed_total"]) == (1, 1, 1)
+        assert stats["pings_total"] >= 2
+        assert stats["longest_lifetime_seconds"] > 0
+
+        manager.touch(live, '{"type":"ping"}')
+        await _settle()
+        assert live.sent[-1] == {"type": "pong"}
+
+    asyncio.run(scenario())
+
+
+def test_connections_beyond_the_per_user_cap_are_refused():
+    async def scenario():
+        manager = ConnectionManager(max_per_user=2)
+        sockets = [FakeSocket() for _ in range(3)]
+        assert [await manager.connect(ws, user_id=5) for ws in sockets] == [True, True, False]
+        assert sockets[2].closed_with == WS_CLOSE_TRY_AGAIN_LATER
+        assert await manager.connect(FakeSocket(), user_id=6)
+
+        await manager.disconnect(sockets[0])
+        assert await manager.connect(FakeSocket(), user_id=5)
+        stats = manager.stats()
+        assert (stats["users"], stats["max_connections_per_user"], stats["rejected_total"]) == (2, 2, 1)
+
+    asyncio.run(scenario())
+
+
+def test_socket_topics_follow_role_and_requested_narrowing():
+    finance = User(id=7, role="finance", department="Accounts")
+    assert set(main._ws_topics_for(finance)) == {"calendar", "user:7", "role:finance", "department:accounts", "finance"}
+    assert main._ws_topics_for(finance, "finance") == ["user:7", "finance"]
+    employee = User(id=8, role="employee", department=None)
+    assert main._ws_topics_for(employee, "finance,approvers") == ["user:8"]
+
+
+def test_ws_endpoint_subscribes_authenticated_socket(api_client):
+    token = create_access_token(BENCH_EMPLOYEE_EMAIL)
+    with api_client.websocket_connect(f"ws://localhost/ws?token={token}&topics=calendar"):
+        (conn,) = main.ws_manager._connections.values()
+        assert TOPIC_CALENDAR in conn.topics
+        assert all(topic == TOPIC_CALENDAR or topic.startswith("user:") for topic in conn.topics)
+        assert conn.user_id is not None
@@ -17,7 +17,7 @@ import PerformanceManagementPage from "./PerformanceManagementPage";
 import IndividualGoalsPage from "./IndividualGoalsPage";
 import ForgotPasswordPage from "./ForgotPasswordPage";
 import ResetPasswordPage from "./ResetPasswordPage";
-import { clearToken, logout, getFinanceAttention, getPayrollAttention, getPayrollAdminAttention, me, updateTheme } from "./api";
+import { clearToken, logout, getFinanceAttention, getPayrollAttention, getPayrollAdminAttention, getWsUrl, me, updateTheme } from "./api";
 import { ToastProvider, useToast } from "./ToastProvider";
 
 const THEME_OPTIONS = [
@@ -133,106 +133,102 @@ function Shell({ onLogout, theme, setTheme, background, setBackground }) {
     }
   }, []);
 
+  // Badge counters: fetched once per (re)connect, then pushed by the server when they change.
   useEffect(() => {
-    const role = (user?.role || "").toLowerCase();
-    if (!["finance", "admin", "ceo"].includes(role)) {
-      setFinanceAttentionTotal(0);
-      return;
-    }
+    if (!user) return;
+    const financeRole = ["finance", "admin", "ceo"].includes((user.role || "").toLowerCase());
+    const last = { finance: 0, payroll: 0, payrollAdmin: 0 };
     let cancelled = false;
-    let lastTotal = 0;
-    async function loadAttention() {
-      try {
-        const data = await getFinanceAttention();
-        const newTotal = Number(data?.total || 0);
-        if (!cancelled) {
-          if (newTotal > lastTotal && lastTotal > 0 && Notification.permission === "granted") {
-            const diff = newTotal - lastTotal;
-            new Notification("Finance Request Attention", {
-              body: `${diff} new finance request(s) need your attention`,
-              icon: "/favicon.ico",
-            });
-          }
-          lastTotal = newTotal;
-          setFinanceAttentionTotal(newTotal);
-        }
-      } catch {
-        if (!cancelled) setFinanceAttentionTotal(0);
+    let ws = null;
+    let tries = 0;
+    let reconnectTimer = null;
+    let watchdog = null;
+
+    function notifyIncrease(key, newTotal, title, body) {
+      if (newTotal > last[key] && last[key] > 0 && "Notification" in window && Notification.permission === "granted") {
+        new Notification(title, { body: body(newTotal - last[key]), icon: "/favicon.ico" });
       }
+      last[key] = newTotal;
     }
-    loadAttention();
-    const timer = setInterval(loadAttention, 30000);
-    return () => {
-      cancelled = true;
-      clearInterval(timer);
-    };
-  }, [user?.role]);
 
-  useEffect(() => {
-    if (!user) return;
-    let cancelled = false;
-    let lastTotal = 0;
-    async function loadAttention() {
-      try {
-        const data = await getPayrollAttention();
-        const newTotal = Number(data?.pending_confirmation || 0);
-        if (!cancelled) {
-          if (newTotal > lastTotal && lastTotal > 0 && Notification.permission === "granted") {
-            const diff = newTotal - lastTotal;
-            new Notification("Payroll Confirmation Needed", {
-              body: `${diff} payroll run(s) need your confirmation`,
-              icon: "/favicon.ico",
-            });
-          }
-          lastTotal = newTotal;
-          setPayrollAttentionTotal(newTotal);
-        }
-      } catch {
-        if (!cancelled) setPayrollAttentionTotal(0);
-      }
+    function applyFinance(data) {
+      const newTotal = Number(data?.total || 0);
+      notifyIncrease("finance", newTotal, "Finance Request Attention", (diff) => `${diff} new finance request(s) need your attention`);
+      setFinanceAttentionTotal(newTotal);
     }
-    loadAttention();
-    const timer = setInterval(loadAttention, 30000);
-    return () => {
-      cancelled = true;
-      clearInterval(timer);
-    };
-  }, [user]);
 
-  useEffect(() => {
-    const role = (user?.role || "").toLowerCase();
-    if (!["finance", "admin", "ceo"].includes(role)) {
-      setPayrollAdminAttentionTotal(0);
-      return;
+    function applyPayroll(data) {
+      const newTotal = Number(data?.pending_confirmation || 0);
+      notifyIncrease("payroll", newTotal, "Payroll Confirmation Needed", (diff) => `${diff} payroll run(s) need your confirmation`);
+      setPayrollAttentionTotal(newTotal);
     }
-    let cancelled = false;
-    let lastTotal = 0;
+
+    function applyPayrollAdmin(data) {
+      const newTotal = Number(data?.confirmed_pending_payment || 0);
+      notifyIncrease("payrollAdmin", newTotal, "Payroll Confirmed by Employee", (diff) => `${diff} payroll run(s) confirmed and ready for payment`);
+      setPayrollAdminAttentionTotal(newTotal);
+    }
+
     async function loadAttention() {
-      try {
-        const data = await getPayrollAdminAttention();
-        const newTotal = Number(data?.confirmed_pending_payment || 0);
-        if (!cancelled) {
-          if (newTotal > lastTotal && lastTotal > 0 && Notification.permission === "granted") {
-            const diff = newTotal - lastTotal;
-            new Notification("Payroll Confirmed by Employee", {
-              body: `${diff} payroll run(s) confirmed and ready for payment`,
-              icon: "/favicon.ico",
-            });
-          }
-          lastTotal = newTotal;
-          setPayrollAdminAttentionTotal(newTotal);
-        }
-      } catch {
-        if (!cancelled) setPayrollAdminAttentionTotal(0);
+      const loads = [getPayrollAttention().then(applyPayroll).catch(() => setPayrollAttentionTotal(0))];
+      if (financeRole) {
+        loads.push(getFinanceAttention().then(applyFinance).catch(() => setFinanceAttentionTotal(0)));
+        loads.push(getPayrollAdminAttention().then(applyPayrollAdmin).catch(() => setPayrollAdminAttentionTotal(0)));
+      } else {
+        setFinanceAttentionTotal(0);
+        setPayrollAdminAttentionTotal(0);
+      }
+      await Promise.all(loads);
+    }
+
+    function connect() {
+      const url = getWsUrl(financeRole ? ["role", "finance"] : ["role"]);
+      if (cancelled) return;
+      if (!url) {
+        loadAttention();
+        return;
       }
+      ws = new WebSocket(url);
+      const armWatchdog = () => {
+        clearTimeout(watchdog);
+        watchdog = setTimeout(() => ws.close(), 70000);
+      };
+      ws.onopen = () => {
+        tries = 0;
+        armWatchdog();
+        // Counts may have changed while disconnected.
+        if (!cancelled) loadAttention();
+      };
+      ws.onmessage = (ev) => {
+        armWatchdog();
+        let msg;
+        try {
+          msg = JSON.parse(ev.data);
+        } catch {
+          return;
+        }
+        if (cancelled) return;
+        if (msg?.type === "ping") ws.send(JSON.stringify({ type: "pong" }));
+        else if (msg?.type === "finance_attention" && financeRole) applyFinance(msg);
+        else if (msg?.type === "payroll_admin_attention" && financeRole) applyPayrollAdmin(msg);
+        else if (msg?.type === "payroll_attention") applyPayroll(msg);
+      };
+      ws.onclose = () => {
+        clearTimeout(watchdog);
+        if (cancelled) return;
+        tries += 1;
+        reconnectTimer = setTimeout(connect, Math.min(10000, 500 * Math.pow(2, Math.min(tries, 5))));
+      };
     }
-    loadAttention();
-    const timer = setInterval(loadAttention, 30000);
+
+    connect();
     return () => {
       cancelled = true;
-      clearInterval(timer);
+      clearTimeout(reconnectTimer);
+      clearTimeout(watchdog);
+      if (ws) ws.close();
     };
-  }, [user]);
+  }, [user?.id, user?.role]);
 
   return (
     <div className={`app-shell${sidebarCollapsed ? " sidebar-collapsed" : ""}`}>
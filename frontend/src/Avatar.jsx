@@ -1,6 +1,17 @@
 import React from "react";
 import { resolveAvatarUrl } from "./api";
 
+// Must match AVATAR_THUMBNAIL_SIZES in backend/app/thumbnails.py.
+const THUMBNAIL_SIZES = [32, 64, 128];
+
+function thumbnailUrl(url, size) {
+  if (!url || !url.includes("/avatars/")) return url;
+  const ratio = typeof window !== "undefined" ? window.devicePixelRatio || 1 : 1;
+  const variant = THUMBNAIL_SIZES.find((s) => s >= size * ratio);
+  if (!variant) return url;
+  return `${url}${url.includes("?") ? "&" : "?"}size=${variant}`;
+}
+
 function initials(name = "") {
   const trimmed = String(name || "").trim();
   if (!trimmed) return "?";
@@ -11,7 +22,7 @@ function initials(name = "") {
 }
 
 export default function Avatar({ name, url, size = 32, className = "", alt = "avatar" }) {
-  const resolved = resolveAvatarUrl(url);
+  const resolved = thumbnailUrl(resolveAvatarUrl(url), size);
   const style = { width: size, height: size };
 
   if (resolved) {
@@ -24,6 +24,7 @@ import { useToast } from "./ToastProvider";
 import Avatar from "./Avatar";
 
 const PUBLIC_HOLIDAY_TYPE = "Public Holiday";
+const WS_SILENCE_TIMEOUT_MS = 70000;
 
 function typeLabel(t) {
   if ((t || "").toLowerCase() === "public holiday") return PUBLIC_HOLIDAY_TYPE;
@@ -313,6 +314,8 @@ export default function CalendarPage() {
   const [events, setEvents] = useState([]);
   const [holidayByDate, setHolidayByDate] = useState({});
   const [range, setRange] = useState({ start: null, end: null });
+  const rangeRef = useRef(range);
+  rangeRef.current = range;
   const [error, setError] = useState("");
 
   // Filtering
@@ -334,7 +337,7 @@ export default function CalendarPage() {
 
   // WebSocket
   const wsRef = useRef(null);
-  const reconnectRef = useRef({ tries: 0, timer: null });
+  const reconnectRef = useRef({ tries: 0, timer: null, watchdog: null });
   const [live, setLive] = useState(false);
 
   // Leave balance (shown when selecting Leave)
@@ -454,6 +457,19 @@ export default function CalendarPage() {
     }
   }
 
+  function toCalendarEvent(e) {
+    return {
+      id: String(e.id),
+      title: `${e.user.name} • ${typeLabel(e.type)}`,
+      start: e.start_ts,
+      end: e.end_ts,
+      allDay: e.all_day,
+      backgroundColor: colorByType(e.type),
+      borderColor: colorByType(e.type),
+      extendedProps: { api: e },
+    };
+  }
+
   async function loadEvents(startISO, endISO) {
     if (filters.start_date && filters.end_date && filters.start_date > filters.end_date) {
       setError("Filter error: Start Date cannot be after End Date.");
@@ -483,16 +499,7 @@ export default function CalendarPage() {
     const onlyHolidays = filters.type === PUBLIC_HOLIDAY_TYPE;
     const data = onlyHolidays ? [] : await listEvents(queryStart, queryEnd, f);
 
-    const mapped = data.map((e) => ({
-      id: String(e.id),
-      title: `${e.user.name} • ${typeLabel(e.type)}`,
-      start: e.start_ts,
-      end: e.end_ts,
-      allDay: e.all_day,
-      backgroundColor: colorByType(e.type),
-      borderColor: colorByType(e.type),
-      extendedProps: { api: e },
-    }));
+    const mapped = data.map(toCalendarEvent);
 
     const includePublicHolidays = !filters.type || filters.type === PUBLIC_HOLIDAY_TYPE;
     const holidayEntries = includePublicHolidays ? buildKenyaHolidayEntries(queryStart, queryEnd) : [];
@@ -581,6 +588,50 @@ export default function CalendarPage() {
     }
   }
 
+  // Merge a change message that carries the events themselves instead of refetching.
+  // Returns false when the view cannot be patched safely and needs a refresh.
+  function applyChange(msg) {
+    if (!Array.isArray(msg.events) || msg.truncated || msg.resync) return false;
+    if (filters.user_id || filters.department || filters.start_date || filters.end_date) return false;
+    if (!range.start || !range.end) return false;
+    const visibleStart = new Date(range.start);
+    const visibleEnd = new Date(range.end);
+    const shown = (e) =>
+      filters.type !== PUBLIC_HOLIDAY_TYPE &&
+      (!filters.type || e.type === filters.type) &&
+      new Date(e.start_ts) < visibleEnd &&
+      new Date(e.end_ts) > visibleStart;
+
+    const removed = new Set((msg.event_ids || []).map(String));
+    const upserts = msg.events.filter(shown).map(toCalendarEvent);
+    setEvents((prev) =>
+      [...prev.filter((ev) => !removed.has(String(ev.id))), ...upserts].sort(
+        (a, b) => Number(new Date(a.start)) - Number(new Date(b.start))
+      )
+    );
+
+    const deleted = new Set((msg.changes?.deleted || []).map(String));
+    const ownLeave = (e) => e && e.user_id === user?.id && isLeaveLikeType(e.type);
+    const touchesOwnLeave =
+      msg.events.some(ownLeave) || events.some((ev) => deleted.has(String(ev.id)) && ownLeave(ev.extendedProps?.api));
+    if (touchesOwnLeave) {
+      getLeaveBalance().then(setDashboardBalance).catch(() => {});
+    }
+    return true;
+  }
+
+  // The socket outlives renders; always refresh with the current range and filters.
+  const refreshRef = useRef(refresh);
+  refreshRef.current = refresh;
+  const applyChangeRef = useRef(applyChange);
+  applyChangeRef.current = applyChange;
+
+  // Batched change messages carry the date span they touch; skip refetching when it is off-screen.
+  function changeTouchesRange(msg, visible) {
+    if (!msg.start || !msg.end || !visible.start || !visible.end) return true;
+    return new Date(msg.start) < new Date(visible.end) && new Date(msg.end) > new Date(visible.start);
+  }
+
   // WebSocket connect / reconnect
   function connectWs() {
     if (reconnectRef.current.timer) {
@@ -589,7 +640,7 @@ export default function CalendarPage() {
     }
 
     try {
-      const url = getWsUrl();
+      const url = getWsUrl(["calendar"]);
       if (!url) {
         setLive(false);
         return;
@@ -597,16 +648,28 @@ export default function CalendarPage() {
       const ws = new WebSocket(url);
       wsRef.current = ws;
 
+      // The server pings every ~25s; a socket that stays silent much longer is half-open.
+      const armWatchdog = () => {
+        clearTimeout(reconnectRef.current.watchdog);
+        reconnectRef.current.watchdog = setTimeout(() => ws.close(), WS_SILENCE_TIMEOUT_MS);
+      };
+
       ws.onopen = () => {
         reconnectRef.current.tries = 0;
         setLive(true);
+        armWatchdog();
       };
 
       ws.onmessage = async (ev) => {
+        armWatchdog();
         try {
           const msg = JSON.parse(ev.data);
-          if (msg?.type === "events_changed") {
-            await refresh();
+          if (msg?.type === "ping") {
+            ws.send(JSON.stringify({ type: "pong" }));
+            return;
+          }
+          if (msg?.type === "events_changed" && changeTouchesRange(msg, rangeRef.current)) {
+            if (!applyChangeRef.current(msg)) await refreshRef.current();
           }
         } catch {
           // ignore parse errors
@@ -614,6 +677,7 @@ export default function CalendarPage() {
       };
 
       ws.onclose = () => {
+        clearTimeout(reconnectRef.current.watchdog);
         setLive(false);
         scheduleReconnect();
       };
@@ -630,7 +694,7 @@ export default function CalendarPage() {
     const tries = (reconnectRef.current.tries += 1);
     const delay = Math.min(10000, 500 * Math.pow(2, Math.min(tries, 5))); // up to 10s
     reconnectRef.current.timer = setTimeout(() => {
-      const url = getWsUrl();
+      const url = getWsUrl(["calendar"]);
       if (!url) {
         setLive(false);
         return;
@@ -650,6 +714,7 @@ export default function CalendarPage() {
     connectWs();
     return () => {
       if (reconnectRef.current.timer) clearTimeout(reconnectRef.current.timer);
+      clearTimeout(reconnectRef.current.watchdog);
       if (wsRef.current) wsRef.current.close();
     };
     // eslint-disable-next-line react-hooks/exhaustive-deps
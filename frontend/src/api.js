@@ -376,16 +376,17 @@ export function adminGetUserLeaveBalance(userId, asOfYYYYMMDD) {
   return request(`/admin/users/${userId}/leave/balance${qs}`);
 }
 
-// WebSocket URL helper
-export function getWsUrl() {
+// WebSocket URL helper; `topics` narrows what the socket is sent (e.g. ["calendar"]).
+export function getWsUrl(topics = []) {
+  const qs = topics.length ? `?topics=${encodeURIComponent(topics.join(","))}` : "";
   if (IS_ABSOLUTE_API_BASE) {
     const u = new URL(API_BASE);
     const proto = u.protocol === "https:" ? "wss:" : "ws:";
-    return `${proto}//${u.host}/ws`;
+    return `${proto}//${u.host}/ws${qs}`;
   }
 
   const proto = window.location.protocol === "https:" ? "wss:" : "ws:";
-  return `${proto}//${window.location.host}/ws`;
+  return `${proto}//${window.location.host}/ws${qs}`;
 }
 
 export function listLibraryDocuments(category = "") {
@@ -731,6 +732,31 @@ export function getFinanceAttention() {
   return request("/finance/attention");
 }
 
+// One page of pending finance requests across all workflows; pass the returned next_cursor for the next page.
+export function listFinanceInbox(params = {}) {
+  const qs = new URLSearchParams();
+  for (const [key, value] of Object.entries(params)) {
+    if (value !== undefined && value !== null && value !== "") qs.set(key, String(value));
+  }
+  const suffix = qs.toString() ? `?${qs.toString()}` : "";
+  return request(`/finance/inbox${suffix}`);
+}
+
+const FINANCE_BULK_DECISION_PATHS = {
+  cash_reimbursement: "/finance/reimbursements/bulk-decision",
+  cash_requisition: "/finance/requisitions/bulk-decision",
+  authority_to_incur: "/finance/authority-to-incur/bulk-decision",
+  salary_advance: "/finance/salary-advances/bulk-decision",
+};
+
+// Approve or reject many requests of one inbox kind at once; the result lists each id's outcome.
+export function decideFinanceRequestsInBulk(kind, ids, approve, comment) {
+  return request(FINANCE_BULK_DECISION_PATHS[kind], {
+    method: "POST",
+    body: { ids, approve: !!approve, comment: comment || null },
+  });
+}
+
 export function submitCashRequisition(payload) {
   return request("/finance/requisitions", { method: "POST", body: payload });
 }